@@ -10,6 +10,7 @@ import joblib
 import numpy as np
 import pandas as pd
 from data.data_prep import DataPrep
+from pipelines.column_usage import minimal_input_columns
 from pipelines.pipeline import get_features_and_model_pipeline
 from pipelines.preprocessing import get_preprocess_pipeline
 from scipy.stats import randint
@@ -17,6 +18,8 @@ from sklearn.model_selection import BaseCrossValidator, RandomizedSearchCV
 from sklearn.pipeline import Pipeline
 from strategy.betting_logic import BettingLogic
 
+from db_utils import dump_profile, enable_profiling, profile_summary
+
 warnings.simplefilter(action="ignore", category=FutureWarning)
 warnings.simplefilter(action="ignore", category=UserWarning)
 warnings.simplefilter(action="ignore", category=pd.errors.SettingWithCopyWarning)
@@ -195,17 +198,53 @@ if __name__ == "__main__":
     python src/cfb/backtest.py
     python src/cfb/backtest.py --name "baseline"
     python src/cfb/backtest.py --name "baseline" --betting_fnc "spread_probs"
+    python src/cfb/backtest.py --no_cache
+    python src/cfb/backtest.py --incremental
+    python src/cfb/backtest.py --prune_columns
+    python src/cfb/backtest.py --profile --explain --profile_json "profile.json"
     """
     start = time.time()
 
     parser = argparse.ArgumentParser()
     parser.add_argument("--name", type=str, help="Model file name to save.")
     parser.add_argument("--betting_fnc", type=str, help="Betting function to apply.")
+    parser.add_argument(
+        "--no_cache", action="store_true", help="Bypass the local table cache."
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Rebuild only the games changed since the persisted master frame.",
+    )
+    parser.add_argument(
+        "--prune_columns",
+        action="store_true",
+        help="Load only the columns the pipelines read or pass to the model.",
+    )
+    parser.add_argument(
+        "--profile", action="store_true", help="Profile every database call."
+    )
+    parser.add_argument(
+        "--explain",
+        action="store_true",
+        help="Capture EXPLAIN (ANALYZE, BUFFERS) of reads when profiling.",
+    )
+    parser.add_argument(
+        "--profile_json", type=str, help="File to dump the database profile to."
+    )
     args = parser.parse_args()
+    profiling = args.profile or args.explain or args.profile_json is not None
+    if profiling:
+        enable_profiling(explain=args.explain)
 
     print("Step 1: Loading data...")
-    data_prep = DataPrep(dataset="cfb")
-    raw_data = data_prep.get_data()
+    data_prep = DataPrep(
+        dataset="cfb", use_cache=not args.no_cache, incremental=args.incremental
+    )
+    columns = None
+    if args.prune_columns:
+        columns = minimal_input_columns(data_prep.output_columns())
+    raw_data = data_prep.get_data(columns=columns)
 
     print("Step 2: Preprocess and separate odds, X, and y...")
     preprocessed_data = get_preprocess_pipeline().fit_transform(raw_data)
@@ -234,6 +273,12 @@ if __name__ == "__main__":
         cross_val_kwargs["betting_fnc"] = args.betting_fnc
     model, odds_df = cross_validate(X, y, pipeline, odds_df, **cross_val_kwargs)
 
+    if profiling:
+        with pd.option_context("display.max_columns", None, "display.width", 200):
+            print(profile_summary())
+        if args.profile_json:
+            dump_profile(args.profile_json)
+
     end = time.time()
     print("Success!")
     print(f"Total elapsed time: {end - start:.1f} seconds")
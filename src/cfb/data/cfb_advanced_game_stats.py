@@ -1,14 +1,77 @@
-import os
-import pickle as pkl
-import time
+from functools import partial
 
 import cfbd
 import pandas as pd
 from cfb_base import CFBBase
-from cfbd.models.advanced_game_stat import AdvancedGameStat
 from cfbd.rest import ApiException
-
-from db_utils import insert_data_to_db
+from raw_store import to_raw_table
+
+from db_utils import copy_data_to_db, update_watermark
+
+# Raw columns in cfb.advanced_game_stats column order
+ADVANCED_GAME_STATS_COLUMNS = [
+    "game_id",
+    "season",
+    "week",
+    "team",
+    "opponent",
+    "offense_passing_plays_explosiveness",
+    "offense_passing_plays_success_rate",
+    "offense_passing_plays_total_ppa",
+    "offense_passing_plays_ppa",
+    "offense_rushing_plays_explosiveness",
+    "offense_rushing_plays_success_rate",
+    "offense_rushing_plays_total_ppa",
+    "offense_rushing_plays_ppa",
+    "offense_passing_downs_explosiveness",
+    "offense_passing_downs_success_rate",
+    "offense_passing_downs_ppa",
+    "offense_standard_downs_explosiveness",
+    "offense_standard_downs_success_rate",
+    "offense_standard_downs_ppa",
+    "offense_open_field_yards_total",
+    "offense_open_field_yards",
+    "offense_second_level_yards_total",
+    "offense_second_level_yards",
+    "offense_line_yards_total",
+    "offense_line_yards",
+    "offense_stuff_rate",
+    "offense_power_success",
+    "offense_explosiveness",
+    "offense_success_rate",
+    "offense_total_ppa",
+    "offense_ppa",
+    "offense_drives",
+    "offense_plays",
+    "defense_passing_plays_explosiveness",
+    "defense_passing_plays_success_rate",
+    "defense_passing_plays_total_ppa",
+    "defense_passing_plays_ppa",
+    "defense_rushing_plays_explosiveness",
+    "defense_rushing_plays_success_rate",
+    "defense_rushing_plays_total_ppa",
+    "defense_rushing_plays_ppa",
+    "defense_passing_downs_explosiveness",
+    "defense_passing_downs_success_rate",
+    "defense_passing_downs_ppa",
+    "defense_standard_downs_explosiveness",
+    "defense_standard_downs_success_rate",
+    "defense_standard_downs_ppa",
+    "defense_open_field_yards_total",
+    "defense_open_field_yards",
+    "defense_second_level_yards_total",
+    "defense_second_level_yards",
+    "defense_line_yards_total",
+    "defense_line_yards",
+    "defense_stuff_rate",
+    "defense_power_success",
+    "defense_explosiveness",
+    "defense_success_rate",
+    "defense_total_ppa",
+    "defense_ppa",
+    "defense_drives",
+    "defense_plays",
+]
 
 
 class CFBAdvancedGameStats(CFBBase):
@@ -19,164 +82,118 @@ class CFBAdvancedGameStats(CFBBase):
         super().__init__()
         self.api = cfbd.StatsApi(self.api_client)
 
-    def _get_pkl_path(self, year: int) -> str:
-        """
-        Returns file path to pkl for a given year.
-
-        Args:
-            year (int): Year of interest.
-
-        Returns:
-            str: Path to pkl file.
+    def fetch_and_store_advanced_game_stats_at_year(self, year: int) -> None:
         """
-        return os.path.join(
-            self.project_root,
-            f"src/cfb/data/pkl_files/advanced_game_{year}.pkl",
-        )
-
-    def fetch_and_pickle_advanced_game_stats_at_year(self, year: int) -> None:
-        """
-        Calls the API for advanced game stats and pickles at a given year, errors if it exists already.
+        Calls the API for advanced game stats and stores it at a given year, errors if it exists already.
 
         Args:
             year (int): Season.
 
         Raises:
-            Exception: Path already exists.
+            Exception: Season already exists in the raw store.
         """
-        path = self._get_pkl_path(year)
-        if os.path.isfile(path):
-            raise Exception(f"{path} already exists.")
+        if self.raw_store.exists("advanced_game_stats", year):
+            raise Exception(
+                f"advanced_game_stats {year} already exists in the raw store."
+            )
         try:
-            advanced_stats = self.api.get_advanced_game_stats(year=year)
-            with open(path, "wb") as f:
-                pkl.dump(advanced_stats, f)
-            print(f"Successfully pickled to {path}.")
+            advanced_stats = self.scheduler.call(
+                self.api.get_advanced_game_stats, year=year
+            )
+            self.raw_store.write(
+                "advanced_game_stats",
+                to_raw_table("advanced_game_stats", advanced_stats),
+                season=year,
+            )
         except ApiException as e:
             print(f"Error fetching games for {year}: {e}")
 
-    def _ags_expand_to_df(self, ags: AdvancedGameStat) -> pd.DataFrame:
+    def load_advanced_game_stats_from_raw_at_year(self, year: int) -> pd.DataFrame:
         """
-        Expands AdvancedGameStat to a DataFrame.
+        Loads the game team stats from the raw store, reading only the uploaded columns.
 
         Args:
-            ags (AdvancedGameStat): Input AdvancedGameStat object.
+            year (int): Season.
 
         Returns:
-            pd.DataFrame: AdvancedGameStat object as DataFrame.
+            pd.DataFrame: Raw data in DataFrame form.
         """
-        flat_df = pd.json_normalize(ags.dict(), sep="_")
-        return flat_df
+        if not self.raw_store.exists("advanced_game_stats", year):
+            self.fetch_and_store_advanced_game_stats_at_year(year)
 
-    def load_advanced_game_stats_from_pkl_at_year(self, year: int) -> pd.DataFrame:
+        year_df = self.raw_store.read(
+            "advanced_game_stats",
+            columns=ADVANCED_GAME_STATS_COLUMNS,
+            seasons=[year],
+        )
+        return year_df
+
+    def refresh_advanced_game_stats_at_year_weeks(
+        self, year: int, weeks: list[int]
+    ) -> int:
         """
-        Loads the game team stats directly from the pkl.
+        Re-fetches some weeks of a season, replaces them in the raw store, and upserts the rows that
+        changed, i.e. the trailing weeks in-season as results and markets finalize.
 
         Args:
             year (int): Season.
+            weeks (list[int]): Weeks to refresh.
+
+        Raises:
+            Exception: The upsert failed, before the watermark is moved.
 
         Returns:
-            pd.DataFrame: Pickled data in DataFrame form.
+            int: Rows inserted or updated.
         """
-        path = self._get_pkl_path(year)
-        if not os.path.isfile(path):
-            self.fetch_and_pickle_advanced_game_stats_at_year(year)
-
-        with open(path, "rb") as f:
-            advanced_game_stat_list = pkl.load(f)
-
-        year_df = pd.concat(
-            [self._ags_expand_to_df(ags) for ags in advanced_game_stat_list]
-        ).applymap(lambda x: None if pd.isna(x) else x)
-
-        # Organize order of columns
-        year_df = year_df[
-            [
-                "game_id",
-                "season",
-                "week",
-                "team",
-                "opponent",
-                "offense_passing_plays_explosiveness",
-                "offense_passing_plays_success_rate",
-                "offense_passing_plays_total_ppa",
-                "offense_passing_plays_ppa",
-                "offense_rushing_plays_explosiveness",
-                "offense_rushing_plays_success_rate",
-                "offense_rushing_plays_total_ppa",
-                "offense_rushing_plays_ppa",
-                "offense_passing_downs_explosiveness",
-                "offense_passing_downs_success_rate",
-                "offense_passing_downs_ppa",
-                "offense_standard_downs_explosiveness",
-                "offense_standard_downs_success_rate",
-                "offense_standard_downs_ppa",
-                "offense_open_field_yards_total",
-                "offense_open_field_yards",
-                "offense_second_level_yards_total",
-                "offense_second_level_yards",
-                "offense_line_yards_total",
-                "offense_line_yards",
-                "offense_stuff_rate",
-                "offense_power_success",
-                "offense_explosiveness",
-                "offense_success_rate",
-                "offense_total_ppa",
-                "offense_ppa",
-                "offense_drives",
-                "offense_plays",
-                "defense_passing_plays_explosiveness",
-                "defense_passing_plays_success_rate",
-                "defense_passing_plays_total_ppa",
-                "defense_passing_plays_ppa",
-                "defense_rushing_plays_explosiveness",
-                "defense_rushing_plays_success_rate",
-                "defense_rushing_plays_total_ppa",
-                "defense_rushing_plays_ppa",
-                "defense_passing_downs_explosiveness",
-                "defense_passing_downs_success_rate",
-                "defense_passing_downs_ppa",
-                "defense_standard_downs_explosiveness",
-                "defense_standard_downs_success_rate",
-                "defense_standard_downs_ppa",
-                "defense_open_field_yards_total",
-                "defense_open_field_yards",
-                "defense_second_level_yards_total",
-                "defense_second_level_yards",
-                "defense_line_yards_total",
-                "defense_line_yards",
-                "defense_stuff_rate",
-                "defense_power_success",
-                "defense_explosiveness",
-                "defense_success_rate",
-                "defense_total_ppa",
-                "defense_ppa",
-                "defense_drives",
-                "defense_plays",
-            ]
+        records = [
+            stat
+            for week in weeks
+            for stat in self.scheduler.call(
+                self.api.get_advanced_game_stats, year=year, week=week
+            )
         ]
-        return year_df
+        self.raw_store.replace_weeks(
+            "advanced_game_stats",
+            to_raw_table("advanced_game_stats", records),
+            season=year,
+            weeks=weeks,
+        )
+        data = self.raw_store.read(
+            "advanced_game_stats",
+            columns=ADVANCED_GAME_STATS_COLUMNS,
+            seasons=[year],
+            weeks=weeks,
+        )
+        rows = copy_data_to_db("cfb.advanced_game_stats", data, on_conflict="update")
+        update_watermark("advanced_game_stats", year, max(weeks), rows)
+        return rows
 
     def upload_advanced_game_stats_to_db(
         self, start: int = 2013, end: int = 2025
     ) -> None:
         """
-        Uploads the game data from pkl to PostgreSQL.
+        Uploads the game data from the raw store to PostgreSQL.
 
         Args:
             start (int): Start season.
             end (int): Ending season, not included.
         """
-        query = """
-            INSERT INTO cfb.advanced_game_stats
-            VALUES %s
-            ON CONFLICT DO NOTHING
-        """
+        self.scheduler.run(
+            {
+                f"advanced game stats {year}": partial(
+                    self.fetch_and_store_advanced_game_stats_at_year, year
+                )
+                for year in range(start, end)
+                if not self.raw_store.exists("advanced_game_stats", year)
+            }
+        )
+        rows, data = 0, pd.DataFrame()
         for year in range(start, end):
             print(f"Uploading advanced game stats for {year}...")
-            data = self.load_advanced_game_stats_from_pkl_at_year(year)
-            insert_data_to_db(query, data)
-            time.sleep(0.5)
+            data = self.load_advanced_game_stats_from_raw_at_year(year)
+            rows += copy_data_to_db("cfb.advanced_game_stats", data)
+        if not data.empty:
+            update_watermark("advanced_game_stats", year, data["week"].max(), rows)
 
 
 if __name__ == "__main__":
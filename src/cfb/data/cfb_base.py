@@ -3,16 +3,46 @@ import warnings
 
 import cfbd
 from dotenv import load_dotenv
+from fetch_scheduler import DEFAULT_FETCH_CONFIG, get_shared_scheduler
+from http_cache import DEFAULT_HTTP_CACHE_CONFIG, CachingApiClient, get_shared_cache
+from raw_store import RawStore
+
+from db_utils import load_config
 
 
 class CFBBase:
     def __init__(self):
-        """Base class to load API keys and set up the CFBD API connection."""
+        """
+        Base class to load API keys and set up the CFBD API connection. CFBD_HOST can point the
+        client elsewhere, i.e. a local stub server. API calls go through a scheduler shared by every
+        loader, sized by the optional `cfbd` section of the config, and are answered from an on-disk
+        response cache where fresh, see the optional `http_cache` section. Responses land in the
+        partitioned raw store.
+        """
         load_dotenv()
         warnings.simplefilter(action="ignore", category=FutureWarning)
+        config = load_config()
+        fetch_config = {**DEFAULT_FETCH_CONFIG, **(config.get("cfbd") or {})}
+        cache_config = {
+            **DEFAULT_HTTP_CACHE_CONFIG,
+            **(config.get("http_cache") or {}),
+        }
         self.configuration = cfbd.Configuration(
-            host="https://apinext.collegefootballdata.com",
+            host=os.getenv("CFBD_HOST", "https://apinext.collegefootballdata.com"),
             access_token=os.getenv("CFBD_API_KEY"),
         )
+        # Let every worker hold its own connection
+        self.configuration.connection_pool_maxsize = max(
+            self.configuration.connection_pool_maxsize, fetch_config["max_workers"]
+        )
         self.project_root = os.getenv("PROJECT_ROOT", os.getcwd())
-        self.api_client = cfbd.ApiClient(self.configuration)
+        self.scheduler = get_shared_scheduler(**fetch_config)
+        if cache_config.pop("enabled"):
+            self.api_client = CachingApiClient(
+                self.configuration,
+                get_shared_cache(**cache_config),
+                rate_limit=self.scheduler.bucket.acquire,
+            )
+        else:
+            self.api_client = cfbd.ApiClient(self.configuration)
+        self.raw_store = RawStore()
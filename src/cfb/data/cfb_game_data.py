@@ -1,13 +1,49 @@
-import os
-import pickle as pkl
-import time
+from functools import partial
 
 import cfbd
 import pandas as pd
 from cfb_base import CFBBase
 from cfbd.rest import ApiException
-
-from db_utils import insert_data_to_db
+from raw_store import to_raw_table
+
+from db_utils import copy_data_to_db, update_watermark
+
+# Raw columns in cfb.games column order
+GAME_COLUMNS = [
+    "id",
+    "season",
+    "week",
+    "seasonType",
+    "startDate",
+    "startTimeTBD",
+    "completed",
+    "neutralSite",
+    "conferenceGame",
+    "attendance",
+    "venueId",
+    "venue",
+    "homeId",
+    "homeTeam",
+    "homeConference",
+    "homeClassification",
+    "homePoints",
+    "homeLineScores",
+    "homePostgameWinProbability",
+    "homePregameElo",
+    "homePostgameElo",
+    "awayId",
+    "awayTeam",
+    "awayConference",
+    "awayClassification",
+    "awayPoints",
+    "awayLineScores",
+    "awayPostgameWinProbability",
+    "awayPregameElo",
+    "awayPostgameElo",
+    "excitementIndex",
+    "highlights",
+    "notes",
+]
 
 
 class CFBGameData(CFBBase):
@@ -18,120 +54,96 @@ class CFBGameData(CFBBase):
         super().__init__()
         self.api = cfbd.GamesApi(self.api_client)
 
-    def _get_pkl_path(self, year: int) -> str:
-        # NOTE: The 2020 season uniquely had a week 20.
+    def fetch_and_store_games_at_year(self, year: int) -> None:
         """
-        Returns file path to pkl for a given year.
+        Calls the API for game data and stores it at a given year, errors if it exists already.
 
         Args:
-            year (int): Year of interest.
+            year (int): Season.
 
-        Returns:
-            str: Path to pkl file.
+        Raises:
+            Exception: Season already exists in the raw store.
         """
-        return os.path.join(
-            self.project_root, f"src/cfb/data/pkl_files/games_{year}.pkl"
-        )
+        if self.raw_store.exists("games", year):
+            raise Exception(f"games {year} already exists in the raw store.")
+        try:
+            games = self.scheduler.call(self.api.get_games, year=year)
+            self.raw_store.write("games", to_raw_table("games", games), season=year)
+        except ApiException as e:
+            print(f"Error fetching games for {year}: {e}")
 
-    def fetch_and_pickle_games_at_year(self, year: int) -> None:
+    def load_games_from_raw_at_year(self, year: int) -> pd.DataFrame:
         """
-        Calls the API for game data and pickles at a given year, errors if it exists already.
+        Loads the games from the raw store, reading only the uploaded columns.
 
         Args:
             year (int): Season.
 
-        Raises:
-            Exception: Path already exists.
+        Returns:
+            pd.DataFrame: Raw data in DataFrame form.
         """
-        path = self._get_pkl_path(year)
-        if os.path.isfile(path):
-            raise Exception(f"{path} already exists.")
-        try:
-            games = self.api.get_games(year=year)
-            with open(path, "wb") as f:
-                pkl.dump(games, f)
-            print(f"Successfully pickled to {path}.")
-        except ApiException as e:
-            print(f"Error fetching games for {year}: {e}")
+        if not self.raw_store.exists("games", year):
+            self.fetch_and_store_games_at_year(year)
+
+        year_df = self.raw_store.read(
+            "games",
+            columns=GAME_COLUMNS,
+            seasons=[year],
+        )
+        return year_df
 
-    def load_games_from_pkl_at_year(self, year: int) -> pd.DataFrame:
+    def refresh_games_at_year_weeks(self, year: int, weeks: list[int]) -> int:
         """
-        Loads the games directly from the pkl.
+        Re-fetches some weeks of a season, replaces them in the raw store, and upserts the rows that
+        changed, i.e. the trailing weeks in-season as results and markets finalize.
 
         Args:
             year (int): Season.
+            weeks (list[int]): Weeks to refresh.
+
+        Raises:
+            Exception: The upsert failed, before the watermark is moved.
 
         Returns:
-            pd.DataFrame: Pickled data in DataFrame form.
+            int: Rows inserted or updated.
         """
-        path = self._get_pkl_path(year)
-        if not os.path.isfile(path):
-            self.fetch_and_pickle_games_at_year(year)
-
-        with open(path, "rb") as f:
-            game_list = pkl.load(f)
-
-        game_df_list = [pd.DataFrame([game.to_dict()]) for game in game_list]
-        year_df = pd.concat(game_df_list)
-
-        # Organize order of columns
-        year_df = year_df[
-            [
-                "id",
-                "season",
-                "week",
-                "seasonType",
-                "startDate",
-                "startTimeTBD",
-                "completed",
-                "neutralSite",
-                "conferenceGame",
-                "attendance",
-                "venueId",
-                "venue",
-                "homeId",
-                "homeTeam",
-                "homeConference",
-                "homeClassification",
-                "homePoints",
-                "homeLineScores",
-                "homePostgameWinProbability",
-                "homePregameElo",
-                "homePostgameElo",
-                "awayId",
-                "awayTeam",
-                "awayConference",
-                "awayClassification",
-                "awayPoints",
-                "awayLineScores",
-                "awayPostgameWinProbability",
-                "awayPregameElo",
-                "awayPostgameElo",
-                "excitementIndex",
-                "highlights",
-                "notes",
-            ]
+        records = [
+            game
+            for week in weeks
+            for game in self.scheduler.call(self.api.get_games, year=year, week=week)
         ]
-        return year_df
+        self.raw_store.replace_weeks(
+            "games", to_raw_table("games", records), season=year, weeks=weeks
+        )
+        data = self.raw_store.read(
+            "games", columns=GAME_COLUMNS, seasons=[year], weeks=weeks
+        )
+        rows = copy_data_to_db("cfb.games", data, on_conflict="update")
+        update_watermark("games", year, max(weeks), rows)
+        return rows
 
     def upload_games_to_db(self, start: int = 2013, end: int = 2025) -> None:
         """
-        Uploads the game data from pkl to PostgreSQL.
+        Uploads the game data from the raw store to PostgreSQL.
 
         Args:
             start (int): Start season.
             end (int): Ending season, not included.
         """
-        query = """
-            INSERT INTO cfb.games
-            VALUES %s
-            ON CONFLICT DO NOTHING
-        """
+        self.scheduler.run(
+            {
+                f"games {year}": partial(self.fetch_and_store_games_at_year, year)
+                for year in range(start, end)
+                if not self.raw_store.exists("games", year)
+            }
+        )
+        rows, data = 0, pd.DataFrame()
         for year in range(start, end):
             print(f"Uploading games data for {year}...")
-            data = self.load_games_from_pkl_at_year(year)
-            insert_data_to_db(query, data)
-            time.sleep(0.5)
+            data = self.load_games_from_raw_at_year(year)
+            rows += copy_data_to_db("cfb.games", data)
+        if not data.empty:
+            update_watermark("games", year, data["week"].max(), rows)
 
 
 if __name__ == "__main__":
@@ -1,14 +1,54 @@
-import os
-import pickle as pkl
-import time
+from functools import partial
 
 import cfbd
 import pandas as pd
 from cfb_base import CFBBase
-from cfbd.models.game_team_stats import GameTeamStats
 from cfbd.rest import ApiException
+from raw_store import to_raw_table
+from upload_pipeline import pipelined_upload
 
-from db_utils import insert_data_to_db
+from db_utils import copy_data_to_db, update_watermark
+
+# Stat categories in cfb.game_team_stats column order, not every game reports every category
+STAT_COLUMNS = [
+    "completionAttempts",
+    "firstDowns",
+    "fourthDownEff",
+    "fumblesLost",
+    "fumblesRecovered",
+    "interceptionTDs",
+    "interceptionYards",
+    "interceptions",
+    "kickReturnTDs",
+    "kickReturnYards",
+    "kickReturns",
+    "kickingPoints",
+    "netPassingYards",
+    "passesIntercepted",
+    "passingTDs",
+    "possessionTime",
+    "rushingAttempts",
+    "rushingTDs",
+    "rushingYards",
+    "thirdDownEff",
+    "totalPenaltiesYards",
+    "totalYards",
+    "turnovers",
+    "yardsPerPass",
+    "yardsPerRushAttempt",
+    "puntReturnTDs",
+    "puntReturnYards",
+    "puntReturns",
+]
+# Stats stored as text, i.e. "5-12" or "31:20"
+TEXT_STATS = [
+    "completionAttempts",
+    "fourthDownEff",
+    "possessionTime",
+    "thirdDownEff",
+    "totalPenaltiesYards",
+]
+FLOAT_STATS = ["yardsPerPass", "yardsPerRushAttempt"]
 
 
 class CFBGameTeamData(CFBBase):
@@ -19,163 +59,205 @@ class CFBGameTeamData(CFBBase):
         super().__init__()
         self.api = cfbd.GamesApi(self.api_client)
 
-    def _get_pkl_path(self, year: int, week: int) -> str:
+    def fetch_and_store_game_team_stats_at_year_week(
+        self, year: int, week: int, overwrite: bool = False
+    ) -> bool:
         """
-        Returns file path to pkl for a given year and week.
+        Calls the API for game team stats and stores them at a given year and week, errors if they exist already.
 
         Args:
-            year (int): Year of interest.
+            year (int): Season.
             week (int): Week of interest.
+            overwrite (bool, optional): Whether to re-fetch a stored week, i.e. to refresh it in-season. Defaults to False.
+
+        Raises:
+            Exception: Week already exists in the raw store.
 
         Returns:
-            str: Path to pkl file.
+            bool: Whether the week was fetched and stored, as API errors are reported and skipped.
         """
-        return os.path.join(
-            self.project_root, f"src/cfb/data/pkl_files/game_team_{year}_{week}.pkl"
-        )
+        if not overwrite and self.raw_store.exists("game_team_stats", year, week):
+            raise Exception(
+                f"game_team_stats {year}, week {week} already exists in the raw store."
+            )
+        try:
+            games = self.scheduler.call(
+                self.api.get_game_team_stats, year=year, week=week
+            )
+            self.raw_store.write(
+                "game_team_stats",
+                to_raw_table("game_team_stats", games),
+                season=year,
+                week=week,
+            )
+        except ApiException as e:
+            print(f"Error fetching games for {year}, week {week}: {e}")
+            return False
+        return True
 
-    def fetch_and_pickle_game_team_stats_at_year_week(
-        self, year: int, week: int
-    ) -> None:
+    def _weeks(self, year: int) -> list[int]:
         """
-        Calls the API for game team stats and pickles at a given year and week, errors if it exists already.
+        Returns the weeks with game team stats in a season.
 
         Args:
             year (int): Season.
-            week (int): Week of interest.
 
-        Raises:
-            Exception: Path already exists.
+        Returns:
+            list[int]: Weeks of interest.
         """
-        path = self._get_pkl_path(year, week)
-        if os.path.isfile(path):
-            raise Exception(f"{path} already exists.")
-        try:
-            games = self.api.get_game_team_stats(year=year, week=week)
-            with open(path, "wb") as f:
-                pkl.dump(games, f)
-            print(f"Successfully pickled to {path}.")
-        except ApiException as e:
-            print(f"Error fetching games for {year}, week {week}: {e}")
+        # 2020 had an additional week 20, but inexplicably does not exist in the API
+        # 2015 week 16 is also inexplicably missing
+        if year in [2015, 2016, 2017, 2018, 2019, 2021, 2022, 2023]:
+            return list(range(1, 16))
+        return list(range(1, 17))
 
-    def _gts_expand_to_df(self, gts: GameTeamStats) -> pd.DataFrame:
+    def _gts_to_df(self, long_df: pd.DataFrame) -> pd.DataFrame:
         """
-        Expands GameTeamStats to a DataFrame.
+        Reshapes game team stats from long (one row per category) to wide (one column per category),
+        once over the whole frame. Optional categories missing from every game become null columns.
 
         Args:
-            gts (GameTeamStats): Input GameTeamStats object.
+            long_df (pd.DataFrame): Rows of id, teamId, team, category, and stat, see game_team_stat_rows.
 
         Returns:
-            pd.DataFrame: GameTeamStats object as DataFrame.
+            pd.DataFrame: One typed row per game and team.
         """
-        teams_df = pd.json_normalize(gts.to_dict(), record_path=["teams"], meta="id")
-        teams_df = teams_df.explode("stats").reset_index(drop=True)
-        stats_df = pd.json_normalize(teams_df["stats"], meta="id")
-        final_df = pd.concat([teams_df.drop(columns="stats"), stats_df], axis=1)
-        flat_df = final_df.pivot(
+        long_df = long_df.reindex(
+            columns=["id", "teamId", "team", "category", "stat"]
+        ).drop_duplicates(subset=["id", "teamId", "team", "category"], keep="last")
+        wide_df = long_df.pivot(
             index=["id", "teamId", "team"], columns="category", values="stat"
-        ).reset_index()
-        return flat_df
+        ).reindex(columns=STAT_COLUMNS)
+        for col in STAT_COLUMNS:
+            if col in FLOAT_STATS:
+                wide_df[col] = pd.to_numeric(wide_df[col], errors="coerce")
+            elif col not in TEXT_STATS:
+                wide_df[col] = pd.to_numeric(wide_df[col], errors="coerce").astype(
+                    "Int64"
+                )
+        wide_df.columns.name = None
+        return wide_df.reset_index()
+
+    def _read_raw(self, year: int, weeks: list[int]) -> pd.DataFrame:
+        """
+        Reads the long game team stats of some weeks, fetching missing weeks first.
+
+        Args:
+            year (int): Season.
+            weeks (list[int]): Weeks of interest.
+
+        Returns:
+            pd.DataFrame: Long game team stats.
+        """
+        for week in weeks:
+            if not self.raw_store.exists("game_team_stats", year, week):
+                self.fetch_and_store_game_team_stats_at_year_week(year, week)
+        return self.raw_store.read(
+            "game_team_stats",
+            columns=["id", "teamId", "team", "category", "stat"],
+            seasons=[year],
+            weeks=weeks,
+        )
 
-    def load_game_team_stats_from_pkl_at_year_week(
+    def load_game_team_stats_from_raw_at_year_week(
         self, year: int, week: int
     ) -> pd.DataFrame:
         """
-        Loads the game team stats directly from the pkl.
+        Loads the game team stats of a week from the raw store.
 
         Args:
             year (int): Season.
             week (int): Week of interest.
 
         Returns:
-            pd.DataFrame: Pickled data in DataFrame form.
-        """
-        path = self._get_pkl_path(year, week)
-        if not os.path.isfile(path):
-            self.fetch_and_pickle_game_team_stats_at_year_week(year, week)
-
-        with open(path, "rb") as f:
-            game_team_stats_list = pkl.load(f)
-
-        year_df = pd.concat(
-            [self._gts_expand_to_df(gts) for gts in game_team_stats_list]
-        ).applymap(lambda x: None if pd.isna(x) else x)
-
-        for col in [
-            "interceptionTDs",
-            "interceptionYards",
-            "passesIntercepted",
-            "puntReturnTDs",
-            "puntReturnYards",
-            "puntReturns",
-        ]:
-            if col not in year_df.columns:
-                year_df[col] = None
-
-        # Organize order of columns
-        year_df = year_df[
-            [
-                "id",
-                "teamId",
-                "team",
-                "completionAttempts",
-                "firstDowns",
-                "fourthDownEff",
-                "fumblesLost",
-                "fumblesRecovered",
-                "interceptionTDs",
-                "interceptionYards",
-                "interceptions",
-                "kickReturnTDs",
-                "kickReturnYards",
-                "kickReturns",
-                "kickingPoints",
-                "netPassingYards",
-                "passesIntercepted",
-                "passingTDs",
-                "possessionTime",
-                "rushingAttempts",
-                "rushingTDs",
-                "rushingYards",
-                "thirdDownEff",
-                "totalPenaltiesYards",
-                "totalYards",
-                "turnovers",
-                "yardsPerPass",
-                "yardsPerRushAttempt",
-                "puntReturnTDs",
-                "puntReturnYards",
-                "puntReturns",
-            ]
-        ]
-        return year_df
-
-    def upload_game_team_stats_to_db(self, start: int = 2013, end: int = 2025) -> None:
-        """
-        Uploads the game data from pkl to PostgreSQL.
+            pd.DataFrame: Raw data in DataFrame form.
+        """
+        return self._gts_to_df(self._read_raw(year, [week]))
+
+    def load_game_team_stats_from_raw_at_year(self, year: int) -> pd.DataFrame:
+        """
+        Loads a whole season of game team stats from the weekly partitions, reshaped in one pass.
+
+        Args:
+            year (int): Season.
+
+        Returns:
+            pd.DataFrame: Raw data in DataFrame form.
+        """
+        return self._gts_to_df(self._read_raw(year, self._weeks(year)))
+
+    def upload_game_team_stats_to_db(
+        self, start: int = 2013, end: int = 2025, processes: int = None
+    ) -> None:
+        """
+        Uploads the game data from the raw store to PostgreSQL, one season at a time. Seasons are
+        reshaped in parallel processes and written in order.
 
         Args:
             start (int): Start season.
             end (int): Ending season, not included.
+            processes (int, optional): Worker processes reshaping seasons. Defaults to the number of CPUs.
         """
-        query = """
-            INSERT INTO cfb.game_team_stats
-            VALUES %s
-            ON CONFLICT DO NOTHING
-        """
-        for year in range(start, end):
-            # 2020 had an additional week 20, but inexplicably does not exist in the API
-            for week in range(1, 17):
-                # 2015 week 16 is also inexplicably missing
-                if (
-                    year in [2015, 2016, 2017, 2018, 2019, 2021, 2022, 2023]
-                    and week == 16
-                ):
-                    continue
-                print(f"Uploading game team stats for {year}, week {week}...")
-                data = self.load_game_team_stats_from_pkl_at_year_week(year, week)
-                insert_data_to_db(query, data)
-                time.sleep(0.5)
+        self.scheduler.run(
+            {
+                f"game team stats {year} week {week}": partial(
+                    self.fetch_and_store_game_team_stats_at_year_week, year, week
+                )
+                for year in range(start, end)
+                for week in self._weeks(year)
+                if not self.raw_store.exists("game_team_stats", year, week)
+            }
+        )
+        summary = pipelined_upload(
+            "cfb.game_team_stats",
+            type(self),
+            "load_game_team_stats_from_raw_at_year",
+            [(year,) for year in range(start, end)],
+            processes=processes,
+            on_written=lambda year, _: print(
+                f"Uploaded game team stats for {year[0]}."
+            ),
+        )
+        if start < end:
+            update_watermark(
+                "game_team_stats", end - 1, self._weeks(end - 1)[-1], summary["merged"]
+            )
+
+    def refresh_game_team_stats_at_year_weeks(self, year: int, weeks: list[int]) -> int:
+        """
+        Re-fetches some weeks of a season, overwrites them in the raw store, and upserts the rows
+        that changed.
+
+        Args:
+            year (int): Season.
+            weeks (list[int]): Weeks to refresh.
+
+        Raises:
+            Exception: A week failed to fetch, or the upsert failed, before the watermark is moved.
+
+        Returns:
+            int: Rows inserted or updated.
+        """
+        fetched = self.scheduler.run(
+            {
+                f"game team stats {year} week {week}": partial(
+                    self.fetch_and_store_game_team_stats_at_year_week,
+                    year,
+                    week,
+                    overwrite=True,
+                )
+                for week in weeks
+            }
+        )
+        # Failed jobs are left out of the results, and API errors fetch nothing
+        if sum(fetched.values()) < len(weeks):
+            raise Exception(
+                f"Failed fetching {len(weeks) - sum(fetched.values())} of {year}'s weeks {weeks}."
+            )
+        data = self._gts_to_df(self._read_raw(year, weeks))
+        rows = copy_data_to_db("cfb.game_team_stats", data, on_conflict="update")
+        update_watermark("game_team_stats", year, max(weeks), rows)
+        return rows
 
 
 if __name__ == "__main__":
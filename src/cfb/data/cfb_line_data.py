@@ -1,14 +1,57 @@
-import os
-import pickle as pkl
-import time
+from functools import partial
 
 import cfbd
 import pandas as pd
 from cfb_base import CFBBase
-from cfbd.models.betting_game import BettingGame
 from cfbd.rest import ApiException
+from raw_store import to_raw_table
 
-from db_utils import insert_data_to_db
+from db_utils import (
+    copy_data_to_db,
+    get_connection,
+    pull_from_db,
+    pull_required_from_db,
+    update_watermark,
+)
+
+# Raw columns in cfb.lines column order
+LINE_COLUMNS = [
+    "id",
+    "season",
+    "season_type",
+    "week",
+    "start_date",
+    "home_team",
+    "home_conference",
+    "home_classification",
+    "home_score",
+    "away_team",
+    "away_conference",
+    "away_classification",
+    "away_score",
+    "provider",
+    "spread",
+    "formatted_spread",
+    "spread_open",
+    "over_under",
+    "over_under_open",
+    "home_moneyline",
+    "away_moneyline",
+]
+# cfb.line_snapshots columns, and the values whose change is recorded
+LINE_SNAPSHOT_COLUMNS = [
+    "season",
+    "id",
+    "provider",
+    "captured_at",
+    "week",
+    "kickoff",
+    "spread",
+    "over_under",
+    "home_moneyline",
+    "away_moneyline",
+]
+LINE_SNAPSHOT_VALUES = ["spread", "over_under", "home_moneyline", "away_moneyline"]
 
 
 # TODO: This is only using major markets. Future work necessarily must involve derivative markets (i.e. NCAAF halves).
@@ -20,120 +63,213 @@ class CFBLineData(CFBBase):
         super().__init__()
         self.api = cfbd.BettingApi(self.api_client)
 
-    def _get_pkl_path(self, year: int) -> str:
+    def fetch_and_store_lines_at_year(self, year: int) -> None:
+        """
+        Calls the API for game data and stores it at a given year, errors if it exists already.
+
+        Args:
+            year (int): Season.
+
+        Raises:
+            Exception: Season already exists in the raw store.
+        """
+        if self.raw_store.exists("lines", year):
+            raise Exception(f"lines {year} already exists in the raw store.")
+        try:
+            lines = self.scheduler.call(self.api.get_lines, year=year)
+            self.raw_store.write("lines", to_raw_table("lines", lines), season=year)
+        except ApiException as e:
+            print(f"Error fetching lines for {year}: {e}")
+
+    def load_lines_from_raw_at_year(self, year: int) -> pd.DataFrame:
         """
-        Returns file path to pkl for a given year.
+        Loads the lines from the raw store, reading only the uploaded columns.
 
         Args:
-            year (int): Year of interest.
+            year (int): Season.
 
         Returns:
-            str: Path to pkl file.
+            pd.DataFrame: Raw data in DataFrame form.
         """
-        return os.path.join(
-            self.project_root, f"src/cfb/data/pkl_files/lines_{year}.pkl"
+        if not self.raw_store.exists("lines", year):
+            self.fetch_and_store_lines_at_year(year)
+
+        year_df = self.raw_store.read(
+            "lines",
+            columns=LINE_COLUMNS,
+            seasons=[year],
         )
+        return year_df
 
-    def fetch_and_pickle_lines_at_year(self, year: int) -> None:
+    def refresh_lines_at_year_weeks(self, year: int, weeks: list[int]) -> int:
         """
-        Calls the API for game data and pickles at a given year, errors if it exists already.
+        Re-fetches some weeks of a season, replaces them in the raw store, and upserts the rows that
+        changed, i.e. the trailing weeks in-season as results and markets finalize.
 
         Args:
             year (int): Season.
+            weeks (list[int]): Weeks to refresh.
 
         Raises:
-            Exception: Path already exists.
+            Exception: The upsert or the snapshots failed, before the watermark is moved.
+
+        Returns:
+            int: Rows inserted or updated.
         """
-        path = self._get_pkl_path(year)
-        if os.path.isfile(path):
-            raise Exception(f"{path} already exists.")
-        try:
-            lines = self.api.get_lines(year=year)
-            with open(path, "wb") as f:
-                pkl.dump(lines, f)
-            print(f"Successfully pickled to {path}.")
-        except ApiException as e:
-            print(f"Error fetching lines for {year}: {e}")
+        records = [
+            line
+            for week in weeks
+            for line in self.scheduler.call(self.api.get_lines, year=year, week=week)
+        ]
+        self.raw_store.replace_weeks(
+            "lines", to_raw_table("lines", records), season=year, weeks=weeks
+        )
+        data = self.raw_store.read(
+            "lines", columns=LINE_COLUMNS, seasons=[year], weeks=weeks
+        )
+        rows = copy_data_to_db("cfb.lines", data, on_conflict="update")
+        self.append_line_snapshots(data)
+        update_watermark("lines", year, max(weeks), rows)
+        return rows
 
-    def _bg_expand_to_df(self, bg: BettingGame) -> pd.DataFrame:
+    def append_line_snapshots(
+        self, data: pd.DataFrame, captured_at: pd.Timestamp = None
+    ) -> int:
         """
-        Expands BettingGame to a DataFrame.
+        Appends to cfb.line_snapshots the lines that are new or moved since their latest snapshot,
+        so unchanged lines cost nothing however often they are fetched.
 
         Args:
-            bg (BettingGame): Input BettingGame object.
+            data (pd.DataFrame): Lines as read from the raw store, see LINE_COLUMNS.
+            captured_at (pd.Timestamp, optional): When the lines were fetched, in UTC. Defaults to now.
+
+        Raises:
+            Exception: The latest snapshots failed to read, rather than appending every line again.
 
         Returns:
-            pd.DataFrame: BettingGame object as DataFrame.
+            int: Snapshots appended.
         """
-        bg_dict = pd.DataFrame(bg.dict())
-        expanded_lines = pd.json_normalize(bg_dict["lines"])
-        return pd.concat([bg_dict.drop("lines", axis=1), expanded_lines], axis=1)
+        if data.empty:
+            return 0
+        if captured_at is None:
+            captured_at = pd.Timestamp.now(tz="UTC").tz_localize(None)
+        snapshots = (
+            data.rename(columns={"start_date": "kickoff"})
+            .assign(
+                # Snapshot times are naive UTC, as copies take zoned values in the session timezone
+                kickoff=lambda df: pd.to_datetime(
+                    df["kickoff"], utc=True
+                ).dt.tz_localize(None),
+                captured_at=captured_at.floor("s"),
+            )
+            .dropna(subset=["season", "id", "provider"])
+            .drop_duplicates(subset=["season", "id", "provider"], keep="last")
+            .reindex(columns=LINE_SNAPSHOT_COLUMNS)
+        )
+        seasons = sorted(int(season) for season in snapshots["season"].unique())
+        with get_connection() as conn:
+            with conn.cursor() as cursor:
+                for season in seasons:
+                    cursor.execute(
+                        "SELECT cfb.ensure_line_snapshot_partition(%s)", (season,)
+                    )
+
+        keys = ["season", "id", "provider"]
+        latest = pull_required_from_db(
+            """
+            SELECT DISTINCT ON (season, id, provider)
+                season, id, provider, spread, over_under, home_moneyline, away_moneyline
+            FROM cfb.line_snapshots
+            WHERE season = ANY(%(seasons)s)
+            ORDER BY season, id, provider, captured_at DESC
+            """,
+            {"seasons": seasons},
+        )
+        if not latest.empty:
+            merged = snapshots.merge(
+                latest, on=keys, how="left", suffixes=("", "_latest"), indicator=True
+            )
+            moved = merged["_merge"] == "left_only"
+            for col in LINE_SNAPSHOT_VALUES:
+                new = pd.to_numeric(merged[col], errors="coerce")
+                old = pd.to_numeric(merged[f"{col}_latest"], errors="coerce")
+                moved |= ~((new == old) | (new.isna() & old.isna()))
+            snapshots = snapshots[moved.to_numpy()]
+        if snapshots.empty:
+            print("No line moved since the latest snapshots.")
+            return 0
+        return copy_data_to_db("cfb.line_snapshots", snapshots)
 
-    def load_lines_from_pkl_at_year(self, year: int) -> pd.DataFrame:
+    def snapshot_lines_at_year_weeks(self, year: int, weeks: list[int]) -> int:
         """
-        Loads the lines directly from the pkl.
+        Fetches the current lines of some weeks, i.e. upcoming ones, and appends those that moved to
+        cfb.line_snapshots, without touching the raw store or cfb.lines.
 
         Args:
             year (int): Season.
+            weeks (list[int]): Weeks to snapshot.
 
         Returns:
-            pd.DataFrame: Pickled data in DataFrame form.
+            int: Snapshots appended.
         """
-        path = self._get_pkl_path(year)
-        if not os.path.isfile(path):
-            self.fetch_and_pickle_lines_at_year(year)
-
-        with open(path, "rb") as f:
-            line_list = pkl.load(f)
-
-        year_df = pd.concat([self._bg_expand_to_df(bg) for bg in line_list])
-
-        # Organize order of columns
-        year_df = year_df[
-            [
-                "id",
-                "season",
-                "season_type",
-                "week",
-                "start_date",
-                "home_team",
-                "home_conference",
-                "home_classification",
-                "home_score",
-                "away_team",
-                "away_conference",
-                "away_classification",
-                "away_score",
-                "provider",
-                "spread",
-                "formatted_spread",
-                "spread_open",
-                "over_under",
-                "over_under_open",
-                "home_moneyline",
-                "away_moneyline",
-            ]
+        records = [
+            line
+            for week in weeks
+            for line in self.scheduler.call(self.api.get_lines, year=year, week=week)
         ]
-        return year_df
+        if not records:
+            return 0
+        data = to_raw_table("lines", records).to_pandas()
+        return self.append_line_snapshots(data.reindex(columns=LINE_COLUMNS))
+
+    def get_line_movement(
+        self, at_time: pd.Timestamp = None, seasons: list[int] = None
+    ) -> pd.DataFrame:
+        """
+        Reads the opening, closing, and as-of lines of every game and provider, see
+        cfb.line_movement in cfb_line_snapshots.sql.
+
+        Args:
+            at_time (pd.Timestamp, optional): Time of the as-of lines, in UTC. Defaults to None, leaving them null.
+            seasons (list[int], optional): Seasons of interest. Defaults to all.
+
+        Returns:
+            pd.DataFrame: One row per game and provider.
+        """
+        return pull_from_db(
+            "SELECT * FROM cfb.line_movement(%(at_time)s, %(seasons)s)",
+            {
+                "at_time": (
+                    None if at_time is None else pd.Timestamp(at_time).to_pydatetime()
+                ),
+                "seasons": (
+                    None if seasons is None else [int(season) for season in seasons]
+                ),
+            },
+        )
 
     def upload_lines_to_db(self, start: int = 2013, end: int = 2025) -> None:
         """
-        Uploads the game data from pkl to PostgreSQL.
+        Uploads the game data from the raw store to PostgreSQL.
 
         Args:
             start (int): Start season.
             end (int): Ending season, not included.
         """
-        query = """
-            INSERT INTO cfb.lines
-            VALUES %s
-            ON CONFLICT DO NOTHING
-        """
+        self.scheduler.run(
+            {
+                f"lines {year}": partial(self.fetch_and_store_lines_at_year, year)
+                for year in range(start, end)
+                if not self.raw_store.exists("lines", year)
+            }
+        )
+        rows, data = 0, pd.DataFrame()
         for year in range(start, end):
             print(f"Uploading lines data for {year}...")
-            data = self.load_lines_from_pkl_at_year(year)
-            insert_data_to_db(query, data)
-            time.sleep(0.5)
+            data = self.load_lines_from_raw_at_year(year)
+            rows += copy_data_to_db("cfb.lines", data)
+        if not data.empty:
+            update_watermark("lines", year, data["week"].max(), rows)
 
 
 if __name__ == "__main__":
@@ -1,15 +1,49 @@
-import os
-import pickle as pkl
 import time
+from functools import partial
+from typing import Iterator
 
 import cfbd
-import numpy as np
 import pandas as pd
+import pyarrow as pa
 from cfb_base import CFBBase
-from cfbd.models.play import Play
 from cfbd.rest import ApiException
+from raw_store import to_raw_table
+from stream_pipeline import run_stream
+from upload_pipeline import pipelined_upload
 
-from db_utils import insert_data_to_db
+from db_utils import copy_data_to_db, get_connection, update_watermark
+
+# Raw columns in cfb.play_by_play column order
+PLAY_BY_PLAY_COLUMNS = [
+    "id",
+    "drive_id",
+    "game_id",
+    "drive_number",
+    "play_number",
+    "offense",
+    "offense_conference",
+    "offense_score",
+    "defense",
+    "home",
+    "away",
+    "defense_conference",
+    "defense_score",
+    "period",
+    "offense_timeouts",
+    "defense_timeouts",
+    "yardline",
+    "yards_to_goal",
+    "down",
+    "distance",
+    "yards_gained",
+    "scoring",
+    "play_type",
+    "play_text",
+    "ppa",
+    "wallclock",
+    "clock_minutes",
+    "clock_seconds",
+]
 
 
 class CFBPlayByPlayData(CFBBase):
@@ -20,144 +54,247 @@ class CFBPlayByPlayData(CFBBase):
         super().__init__()
         self.api = cfbd.PlaysApi(self.api_client)
 
-    def _get_pkl_path(self, year: int, week: int) -> str:
+    def _weeks(self, year: int) -> list[int]:
         """
-        Returns file path to pkl for a given year and week.
+        Returns the weeks with play-by-play in a season.
 
         Args:
-            year (int): Year of interest.
-            week (int): Week of interest.
+            year (int): Season.
 
         Returns:
-            str: Path to pkl file.
+            list[int]: Weeks of interest.
         """
-        return os.path.join(
-            self.project_root, f"src/cfb/data/pkl_files/play_by_play_{year}_{week}.pkl"
-        )
+        if year in [2015, 2016, 2017, 2018, 2019, 2021, 2022, 2023]:
+            return list(range(1, 16))
+        return list(range(1, 17))
 
-    def fetch_and_pickle_play_by_play_at_year_week(self, year: int, week: int) -> None:
+    def fetch_and_store_play_by_play_at_year_week(
+        self, year: int, week: int, overwrite: bool = False
+    ) -> bool:
         """
-        Calls the API for play by play stats and pickles at a given year and week, errors if it exists already.
+        Calls the API for play by play stats and stores them at a given year and week, errors if they exist already.
 
         Args:
             year (int): Season.
             week (int): Week of interest.
+            overwrite (bool, optional): Whether to re-fetch a stored week, i.e. to refresh it in-season. Defaults to False.
 
         Raises:
-            Exception: Path already exists.
+            Exception: Week already exists in the raw store.
+
+        Returns:
+            bool: Whether the week was fetched and stored, as API errors are reported and skipped.
         """
-        path = self._get_pkl_path(year, week)
-        if os.path.isfile(path):
-            raise Exception(f"{path} already exists.")
+        if not overwrite and self.raw_store.exists("play_by_play", year, week):
+            raise Exception(
+                f"play_by_play {year}, week {week} already exists in the raw store."
+            )
         try:
-            plays = self.api.get_plays(year=year, week=week)
-            with open(path, "wb") as f:
-                pkl.dump(plays, f)
-            print(f"Successfully pickled to {path}.")
+            plays = self.scheduler.call(self.api.get_plays, year=year, week=week)
+            self.raw_store.write(
+                "play_by_play",
+                to_raw_table("play_by_play", plays),
+                season=year,
+                week=week,
+            )
         except ApiException as e:
             print(f"Error fetching games for {year}, week {week}: {e}")
+            return False
+        return True
 
-    def _pbp_expand_to_df(self, play: Play) -> pd.DataFrame:
+    def load_play_by_play_from_raw_at_year_week(
+        self, year: int, week: int
+    ) -> pd.DataFrame:
         """
-        Expands Play to a DataFrame.
+        Loads the play-by-play stats from the raw store, reading only the uploaded columns.
 
         Args:
-            play (Play): Input Play object.
+            year (int): Season.
+            week (int): Week of interest.
 
         Returns:
-            pd.DataFrame: Play object as DataFrame.
+            pd.DataFrame: Raw data in DataFrame form.
         """
-        play_dict = play.dict()
-        play_dict["clock_minutes"] = play_dict["clock"]["minutes"]
-        play_dict["clock_seconds"] = play_dict["clock"]["seconds"]
-        del play_dict["clock"]
-        return pd.DataFrame([play_dict])
+        if not self.raw_store.exists("play_by_play", year, week):
+            self.fetch_and_store_play_by_play_at_year_week(year, week)
 
-    def load_play_by_play_from_pkl_at_year_week(
-        self, year: int, week: int
-    ) -> pd.DataFrame:
+        year_df = self.raw_store.read(
+            "play_by_play",
+            columns=PLAY_BY_PLAY_COLUMNS,
+            seasons=[year],
+            weeks=[week],
+        )
+        return year_df
+
+    def refresh_play_by_play_aggregates(self, game_ids: list[int] = None) -> None:
         """
-        Loads the play-by-play stats directly from the pkl.
+        Recomputes the per team-game aggregates in cfb_play_by_play_aggregates.sql.
 
         Args:
-            year (int): Season.
-            week (int): Week of interest.
+            game_ids (list[int], optional): Games to refresh. Defaults to all games.
+        """
+        start_time = time.time()
+        with get_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute(
+                    "SELECT cfb.refresh_pbp_aggregates(%s::INT[])", (game_ids,)
+                )
+        refreshed = "all" if game_ids is None else len(game_ids)
+        print(
+            f"Refreshed play-by-play aggregates for {refreshed} games in {time.time() - start_time:.2f} seconds."
+        )
+
+    def stream_play_by_play_to_db(
+        self,
+        year_weeks: list[tuple[int, int]],
+        on_conflict: str = "nothing",
+        batch_size: int = 50_000,
+        max_pending: int = 2,
+        table: str = "cfb.play_by_play",
+    ) -> tuple[int, set[int]]:
+        """
+        Streams stored weeks into PostgreSQL in fixed-size batches, read, then flattened into the
+        table's columns, then copied, each stage on its own thread behind a bounded queue. Memory
+        stays flat however many seasons are loaded, and each batch commits on its own.
+
+        Args:
+            year_weeks (list[tuple[int, int]]): Weeks to load, already fetched, in load order.
+            on_conflict (str, optional): Conflict handling of copy_data_to_db. Defaults to "nothing".
+            batch_size (int, optional): Most plays per batch. Defaults to 50,000.
+            max_pending (int, optional): Batches queued between two stages. Defaults to 2.
+            table (str, optional): Target table, i.e. a benchmark copy. Defaults to "cfb.play_by_play".
+
+        Raises:
+            Exception: A batch failed to read, flatten, or copy. Batches copied before it stay committed.
 
         Returns:
-            pd.DataFrame: Pickled data in DataFrame form.
+            tuple[int, set[int]]: Rows inserted or updated, and the games of the batches written.
         """
-        path = self._get_pkl_path(year, week)
-        if not os.path.isfile(path):
-            self.fetch_and_pickle_play_by_play_at_year_week(year, week)
-
-        with open(path, "rb") as f:
-            play_list = pkl.load(f)
-
-        year_df = pd.concat(
-            [self._pbp_expand_to_df(play) for play in play_list]
-        ).applymap(lambda x: None if pd.isna(x) else x)
-
-        year_df = year_df.replace({np.nan: None})
-
-        # Organize order of columns
-        year_df = year_df[
-            [
-                "id",
-                "drive_id",
-                "game_id",
-                "drive_number",
-                "play_number",
-                "offense",
-                "offense_conference",
-                "offense_score",
-                "defense",
-                "home",
-                "away",
-                "defense_conference",
-                "defense_score",
-                "period",
-                "offense_timeouts",
-                "defense_timeouts",
-                "yardline",
-                "yards_to_goal",
-                "down",
-                "distance",
-                "yards_gained",
-                "scoring",
-                "play_type",
-                "play_text",
-                "ppa",
-                "wallclock",
-                "clock_minutes",
-                "clock_seconds",
-            ]
-        ]
-        return year_df
+        merged, game_ids = 0, set()
+
+        def read() -> Iterator:
+            for year, week in year_weeks:
+                yield from self.raw_store.iter_batches(
+                    "play_by_play",
+                    columns=PLAY_BY_PLAY_COLUMNS,
+                    seasons=[year],
+                    weeks=[week],
+                    batch_size=batch_size,
+                )
+
+        def flatten(batch: pa.RecordBatch) -> pd.DataFrame:
+            return batch.to_pandas().reindex(columns=PLAY_BY_PLAY_COLUMNS)
+
+        def copy(data: pd.DataFrame) -> None:
+            nonlocal merged
+            # Raises on a failed write, stopping the stream before the batch's games are recorded
+            rows = copy_data_to_db(table, data, on_conflict=on_conflict)
+            merged += rows
+            game_ids.update(int(game_id) for game_id in data["game_id"].dropna())
 
-    def upload_play_by_play_to_db(self, start: int = 2013, end: int = 2025) -> None:
+        run_stream(
+            read(),
+            [("flatten", flatten), ("copy", copy)],
+            max_pending=max_pending,
+            name="play-by-play",
+        )
+        return merged, game_ids
+
+    def upload_play_by_play_to_db(
+        self,
+        start: int = 2013,
+        end: int = 2025,
+        processes: int = None,
+        batch_size: int = 50_000,
+    ) -> None:
         """
-        Uploads the play-by-play data from pkl to PostgreSQL.
+        Uploads the play-by-play data from the raw store to PostgreSQL, then refreshes the aggregates of the
+        games uploaded. Plays are streamed in batches, see stream_play_by_play_to_db, unless processes
+        is given, in which case whole weeks are loaded in parallel processes and written in order.
 
         Args:
             start (int): Start season.
             end (int): Ending season, not included.
+            processes (int, optional): Worker processes loading whole weeks. Defaults to streaming batches instead.
+            batch_size (int, optional): Most plays per streamed batch. Defaults to 50,000.
+        """
+        year_weeks = [
+            (year, week) for year in range(start, end) for week in self._weeks(year)
+        ]
+        self.scheduler.run(
+            {
+                f"play-by-play {year} week {week}": partial(
+                    self.fetch_and_store_play_by_play_at_year_week, year, week
+                )
+                for year, week in year_weeks
+                if not self.raw_store.exists("play_by_play", year, week)
+            }
+        )
+
+        if processes is None:
+            merged, game_ids = self.stream_play_by_play_to_db(
+                year_weeks, batch_size=batch_size
+            )
+        else:
+            game_ids = set()
+
+            def on_written(year_week: tuple, data: pd.DataFrame) -> None:
+                print(
+                    f"Uploaded play-by-play stats for {year_week[0]}, week {year_week[1]}."
+                )
+                game_ids.update(int(game_id) for game_id in data["game_id"].dropna())
+
+            merged = pipelined_upload(
+                "cfb.play_by_play",
+                type(self),
+                "load_play_by_play_from_raw_at_year_week",
+                year_weeks,
+                processes=processes,
+                on_written=on_written,
+            )["merged"]
+        if game_ids:
+            self.refresh_play_by_play_aggregates(sorted(game_ids))
+        if year_weeks:
+            update_watermark("play_by_play", *year_weeks[-1], merged)
+
+    def refresh_play_by_play_at_year_weeks(self, year: int, weeks: list[int]) -> int:
         """
-        query = """
-            INSERT INTO cfb.play_by_play
-            VALUES %s
-            ON CONFLICT DO NOTHING
+        Re-fetches some weeks of a season, overwrites them in the raw store, upserts the plays that
+        changed, and refreshes the aggregates of their games.
+
+        Args:
+            year (int): Season.
+            weeks (list[int]): Weeks to refresh.
+
+        Raises:
+            Exception: A week failed to fetch, or the upsert failed, before the watermark is moved.
+
+        Returns:
+            int: Rows inserted or updated.
         """
-        for year in range(start, end):
-            for week in range(1, 17):
-                if (
-                    year in [2015, 2016, 2017, 2018, 2019, 2021, 2022, 2023]
-                    and week == 16
-                ):
-                    continue
-                print(f"Uploading play-by-play stats for {year}, week {week}...")
-                data = self.load_play_by_play_from_pkl_at_year_week(year, week)
-                insert_data_to_db(query, data)
-                time.sleep(0.5)
+        fetched = self.scheduler.run(
+            {
+                f"play-by-play {year} week {week}": partial(
+                    self.fetch_and_store_play_by_play_at_year_week,
+                    year,
+                    week,
+                    overwrite=True,
+                )
+                for week in weeks
+            }
+        )
+        # Failed jobs are left out of the results, and API errors fetch nothing
+        if sum(fetched.values()) < len(weeks):
+            raise Exception(
+                f"Failed fetching {len(weeks) - sum(fetched.values())} of {year}'s weeks {weeks}."
+            )
+        rows, game_ids = self.stream_play_by_play_to_db(
+            [(year, week) for week in weeks], on_conflict="update"
+        )
+        if game_ids:
+            self.refresh_play_by_play_aggregates(sorted(game_ids))
+        update_watermark("play_by_play", year, max(weeks), rows)
+        return rows
 
 
 if __name__ == "__main__":
@@ -0,0 +1,182 @@
+import argparse
+import datetime as dt
+import time
+from typing import Optional
+
+import cfbd
+from cfb_advanced_game_stats import CFBAdvancedGameStats
+from cfb_base import CFBBase
+from cfb_game_data import CFBGameData
+from cfb_game_team_data import CFBGameTeamData
+from cfb_line_data import CFBLineData
+from cfb_play_by_play_data import CFBPlayByPlayData
+
+from db_utils import get_watermark
+
+# Loader and refresh method per raw dataset, in dependency order
+REFRESHERS = {
+    "games": (CFBGameData, "refresh_games_at_year_weeks"),
+    "lines": (CFBLineData, "refresh_lines_at_year_weeks"),
+    "advanced_game_stats": (
+        CFBAdvancedGameStats,
+        "refresh_advanced_game_stats_at_year_weeks",
+    ),
+    "game_team_stats": (CFBGameTeamData, "refresh_game_team_stats_at_year_weeks"),
+    "play_by_play": (CFBPlayByPlayData, "refresh_play_by_play_at_year_weeks"),
+}
+
+
+def current_season(today: Optional[dt.date] = None) -> int:
+    """
+    Returns the season in progress, bowls in January belonging to the previous season.
+
+    Args:
+        today (Optional[dt.date], optional): Date of interest. Defaults to today.
+
+    Returns:
+        int: Season.
+    """
+    today = today or dt.date.today()
+    return today.year if today.month >= 8 else today.year - 1
+
+
+def current_week(season: int) -> int:
+    """
+    Returns the latest regular season week whose first game has kicked off, from the CFBD calendar.
+
+    Args:
+        season (int): Season.
+
+    Returns:
+        int: Week in progress, 1 before the season starts.
+    """
+    base = CFBBase()
+    calendar = base.scheduler.call(
+        cfbd.GamesApi(base.api_client).get_calendar, year=season
+    )
+    now = dt.datetime.now(dt.timezone.utc)
+    started = [
+        week.week
+        for week in calendar
+        if week.season_type == "regular"
+        and week.first_game_start is not None
+        and week.first_game_start <= now
+    ]
+    return max(started, default=1)
+
+
+def refresh_window(
+    season: Optional[int] = None,
+    week: Optional[int] = None,
+    n_weeks: int = 2,
+    datasets: Optional[list[str]] = None,
+    snapshot_weeks_ahead: int = 1,
+) -> dict[str, int]:
+    """
+    Re-pulls the trailing weeks of a season and upserts only the rows that changed, rather than
+    reloading the whole history. Lines of the upcoming weeks are snapshotted too, as their markets
+    move before kickoff.
+
+    Args:
+        season (Optional[int], optional): Season to refresh. Defaults to the season in progress.
+        week (Optional[int], optional): Last week of the window. Defaults to the week in progress.
+        n_weeks (int, optional): Weeks in the window, ending at week, widened back to a dataset's watermark in the season. Defaults to 2.
+        datasets (Optional[list[str]], optional): Datasets to refresh, keys of REFRESHERS. Defaults to all.
+        snapshot_weeks_ahead (int, optional): Weeks after the window whose lines are appended to cfb.line_snapshots. Defaults to 1.
+
+    Raises:
+        Exception: Some datasets failed to fetch or write, once the others are refreshed. Their watermarks are left as they were.
+
+    Returns:
+        dict[str, int]: Rows inserted or updated per dataset, and line snapshots appended.
+    """
+    season = season or current_season()
+    week = week or current_week(season)
+    weeks = list(range(max(1, week - n_weeks + 1), week + 1))
+    datasets = datasets or list(REFRESHERS)
+    assert all(
+        dataset in REFRESHERS for dataset in datasets
+    ), f"Pick datasets in {list(REFRESHERS)}"
+
+    rows, failed = {}, []
+    for dataset in datasets:
+        watermark = get_watermark(dataset)
+        dataset_weeks = weeks
+        if watermark is not None:
+            print(
+                f"{dataset} last ingested through {watermark['season']}, week "
+                f"{watermark['week']}, at {watermark['fetched_at']}."
+            )
+            # Reaches back to the weeks after the watermark, so the weeks of failed runs are retried
+            if (
+                watermark["season"] == season
+                and watermark["week"] is not None
+                and watermark["week"] + 1 < weeks[0]
+            ):
+                dataset_weeks = list(range(watermark["week"] + 1, week + 1))
+        print(f"Refreshing {dataset} for {season}, weeks {dataset_weeks}...")
+        start_time = time.time()
+        loader, method = REFRESHERS[dataset]
+        try:
+            rows[dataset] = getattr(loader(), method)(season, dataset_weeks)
+        except Exception as e:
+            # Fetches and writes raise before the watermark moves
+            failed.append(dataset)
+            print(f"Failed refreshing {dataset}, its watermark is unchanged: {e}")
+            continue
+        print(
+            f"Refreshed {dataset}, {rows[dataset]} rows merged in "
+            f"{time.time() - start_time:.1f} seconds."
+        )
+    if "lines" in datasets and snapshot_weeks_ahead > 0:
+        ahead = list(range(week + 1, week + 1 + snapshot_weeks_ahead))
+        try:
+            rows["line_snapshots"] = CFBLineData().snapshot_lines_at_year_weeks(
+                season, ahead
+            )
+        except Exception as e:
+            failed.append("line_snapshots")
+            print(f"Failed snapshotting lines of weeks {ahead}: {e}")
+    if failed:
+        raise Exception(f"Failed refreshing {failed}, their watermarks are unchanged.")
+    return rows
+
+
+if __name__ == "__main__":
+    # python src/cfb/data/cfb_refresh.py --n_weeks 2
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--season", type=int, default=None, help="Defaults to the season in progress."
+    )
+    parser.add_argument(
+        "--week",
+        type=int,
+        default=None,
+        help="Last week of the window. Defaults to the week in progress.",
+    )
+    parser.add_argument(
+        "--n_weeks", type=int, default=2, help="Trailing weeks to re-pull."
+    )
+    parser.add_argument(
+        "--datasets",
+        nargs="+",
+        default=None,
+        choices=list(REFRESHERS),
+        help="Datasets to refresh. Defaults to all.",
+    )
+    parser.add_argument(
+        "--snapshot_weeks_ahead",
+        type=int,
+        default=1,
+        help="Upcoming weeks whose lines are snapshotted.",
+    )
+    args = parser.parse_args()
+    print(
+        refresh_window(
+            args.season,
+            args.week,
+            args.n_weeks,
+            args.datasets,
+            args.snapshot_weeks_ahead,
+        )
+    )
@@ -1,58 +1,47 @@
-import os
-import pickle as pkl
-
 import cfbd
 import pandas as pd
+from cfb_base import CFBBase
 from cfbd.rest import ApiException
+from raw_store import to_raw_table
 
-from db_utils import insert_data_to_db
+from db_utils import copy_data_to_db, update_watermark
 
 
-class CFBVenueData:
+class CFBVenueData(CFBBase):
     """Handles fetching, storing, and uploading CFB venue data. Also retrieves from PostgreSQL."""
 
     def __init__(self):
         """Loads the API keys, as well as configures the API connection to CFBD."""
         super().__init__()
-        self._pkl_path = os.path.join(
-            self.project_root, f"src/cfb/data/pkl_files/venues.pkl"
-        )
         self.api = cfbd.VenuesApi(self.api_client)
 
-    def fetch_and_pickle_venues(self) -> None:
+    def fetch_and_store_venues(self) -> None:
         """
-        Generates pkl file from CFDB for venue data.
+        Stores venue data from CFDB in the raw store.
 
         Raises:
-            Exception: To not overload the API, checks if the file exists.
+            Exception: To not overload the API, checks if the venues are stored already.
         """
-        if os.path.isfile(self._pkl_path):
-            raise Exception(f"{self._pkl_path} already exists.")
+        if self.raw_store.exists("venues"):
+            raise Exception("venues already exists in the raw store.")
         try:
-            venues = self.api.get_venues()
-            with open(self._pkl_path, "wb") as f:
-                pkl.dump(venues, f)
-            print(f"Successfully pickled to {self._pkl_path}.")
+            venues = self.scheduler.call(self.api.get_venues)
+            self.raw_store.write("venues", to_raw_table("venues", venues))
         except ApiException as e:
             print(f"Error fetching venues: {e}")
 
-    def load_venues_from_pkl(self) -> pd.DataFrame:
+    def load_venues_from_raw(self) -> pd.DataFrame:
         """
-        Gets the venue data from the pkl file in a DataFrame.
+        Gets the venue data from the raw store in a DataFrame.
 
         Returns:
             pd.DataFrame: DataFrame with venue data and information.
         """
-        if not os.path.isfile(self._pkl_path):
-            self.fetch_and_pickle_venues()
-        with open(self._pkl_path, "rb") as f:
-            venue_list = pkl.load(f)
-        venue_df_list = [pd.DataFrame([game.to_dict()]) for game in venue_list]
-        venue_df = pd.concat(venue_df_list)
-
-        # Organizes order of columns
-        venue_df = venue_df[
-            [
+        if not self.raw_store.exists("venues"):
+            self.fetch_and_store_venues()
+        venue_df = self.raw_store.read(
+            "venues",
+            columns=[
                 "id",
                 "name",
                 "city",
@@ -67,22 +56,18 @@ class CFBVenueData:
                 "elevation",
                 "constructionYear",
                 "grass",
-            ]
-        ]
+            ],
+        )
         return venue_df
 
     def upload_venues_to_db(self) -> None:
         """
         Uploads venue data into PostgreSQL.
         """
-        query = """
-            INSERT INTO cfb.venues
-            VALUES %s
-            ON CONFLICT DO NOTHING
-        """
         print(f"Inserting venue data.")
-        data = self.load_venues_from_pkl()
-        insert_data_to_db(query, data)
+        data = self.load_venues_from_raw()
+        rows = copy_data_to_db("cfb.venues", data)
+        update_watermark("venues", rows_merged=rows)
 
 
 if __name__ == "__main__":
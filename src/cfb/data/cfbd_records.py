@@ -0,0 +1,145 @@
+from typing import Any, Iterable, Optional
+
+import pandas as pd
+import pyarrow as pa
+
+
+def flatten_record(record: dict, sep: str = "_", prefix: str = "") -> dict:
+    """
+    Flattens nested dicts into one level, i.e. {"clock": {"minutes": 1}} to {"clock_minutes": 1}.
+    Lists are kept as values, i.e. line scores.
+
+    Args:
+        record (dict): Possibly nested record.
+        sep (str, optional): Separator between parent and child keys. Defaults to "_".
+        prefix (str, optional): Key prefix of the current level. Defaults to "".
+
+    Returns:
+        dict: Flat record.
+    """
+    flat = {}
+    for key, value in record.items():
+        name = f"{prefix}{sep}{key}" if prefix else key
+        if isinstance(value, dict):
+            flat.update(flatten_record(value, sep, name))
+        else:
+            flat[name] = value
+    return flat
+
+
+def records_to_rows(
+    records: Iterable[Any],
+    by_alias: bool = False,
+    explode: Optional[str] = None,
+    sep: str = "_",
+) -> list[dict]:
+    """
+    Turns cfbd model objects into flat row dicts in a single pass.
+
+    Args:
+        records (Iterable[Any]): cfbd model objects, or plain dicts.
+        by_alias (bool, optional): Whether to key by the API's camelCase names. Defaults to False.
+        explode (Optional[str], optional): List-of-dicts field to expand into one row per element, i.e. "lines". Records without any are dropped. Defaults to None.
+        sep (str, optional): Separator of nested keys. Defaults to "_".
+
+    Returns:
+        list[dict]: One flat dict per row.
+    """
+    rows = []
+    for record in records:
+        record_dict = (
+            record if isinstance(record, dict) else record.dict(by_alias=by_alias)
+        )
+        if explode is None:
+            rows.append(flatten_record(record_dict, sep))
+            continue
+        record_dict = dict(record_dict)
+        children = record_dict.pop(explode, None) or []
+        parent = flatten_record(record_dict, sep)
+        for child in children:
+            child_dict = (
+                child if isinstance(child, dict) else child.dict(by_alias=by_alias)
+            )
+            rows.append({**parent, **flatten_record(child_dict, sep)})
+    return rows
+
+
+def records_to_df(
+    records: Iterable[Any],
+    columns: Optional[list[str]] = None,
+    by_alias: bool = False,
+    explode: Optional[str] = None,
+    sep: str = "_",
+) -> pd.DataFrame:
+    """
+    Builds one DataFrame from cfbd model objects, rather than concatenating one frame per object.
+
+    Args:
+        records (Iterable[Any]): cfbd model objects, or plain dicts.
+        columns (Optional[list[str]], optional): Columns to keep, in order. Missing ones are filled with nulls. Defaults to all.
+        by_alias (bool, optional): Whether to key by the API's camelCase names. Defaults to False.
+        explode (Optional[str], optional): List-of-dicts field to expand into one row per element. Defaults to None.
+        sep (str, optional): Separator of nested keys. Defaults to "_".
+
+    Returns:
+        pd.DataFrame: Flattened records.
+    """
+    df = pd.DataFrame.from_records(
+        records_to_rows(records, by_alias=by_alias, explode=explode, sep=sep)
+    )
+    if columns is not None:
+        df = df.reindex(columns=columns)
+    return df
+
+
+def records_to_arrow(
+    records: Iterable[Any],
+    columns: Optional[list[str]] = None,
+    by_alias: bool = False,
+    explode: Optional[str] = None,
+    sep: str = "_",
+) -> pa.Table:
+    """
+    Builds one Arrow table from cfbd model objects.
+
+    Args:
+        records (Iterable[Any]): cfbd model objects, or plain dicts.
+        columns (Optional[list[str]], optional): Columns to keep, in order. Missing ones are filled with nulls. Defaults to all.
+        by_alias (bool, optional): Whether to key by the API's camelCase names. Defaults to False.
+        explode (Optional[str], optional): List-of-dicts field to expand into one row per element. Defaults to None.
+        sep (str, optional): Separator of nested keys. Defaults to "_".
+
+    Returns:
+        pa.Table: Flattened records.
+    """
+    rows = records_to_rows(records, by_alias=by_alias, explode=explode, sep=sep)
+    if columns is None:
+        columns = list(dict.fromkeys(key for row in rows for key in row))
+    return pa.table({col: [row.get(col) for row in rows] for col in columns})
+
+
+def game_team_stat_rows(records: Iterable[Any]) -> list[dict]:
+    """
+    Turns GameTeamStats into long rows, one per game, team, and stat category.
+
+    Args:
+        records (Iterable[Any]): GameTeamStats objects.
+
+    Returns:
+        list[dict]: One dict per game, team, and category.
+    """
+    return [
+        {
+            "id": gts.id,
+            "teamId": team.team_id,
+            "team": team.team,
+            "conference": team.conference,
+            "homeAway": team.home_away,
+            "points": team.points,
+            "category": stat.category,
+            "stat": stat.stat,
+        }
+        for gts in records
+        for team in gts.teams
+        for stat in team.stats
+    ]
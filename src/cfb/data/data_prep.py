@@ -1,8 +1,72 @@
+import hashlib
+import math
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Callable, Iterable, Optional, Union
 
 import pandas as pd
+import pyarrow as pa
+from data.dtype_registry import apply_dtypes, get_dtype_registry, memory_report
+from data.schema import make_schemas_tables
+from data.table_cache import TableCache
+from pipelines.history import required_history_games
+from psycopg2 import sql
 
-from db_utils import execute_sql_script, pull_from_db, retrieve_data
+from db_utils import execute_sql_script, pull_required_from_db, retrieve_data
+
+# Columns each table must keep under projection, as load_data joins on them
+JOIN_COLUMNS = {
+    "venues": ["id", "name"],
+    "games": [
+        "id",
+        "season",
+        "week",
+        "venue_id",
+        "venue",
+        "home_id",
+        "away_id",
+        "home_team",
+        "away_team",
+    ],
+    "lines": ["id", "over_under", "spread"],
+    "game_team_stats": ["game_id", "team_id", "team"],
+    "advanced_game_stats": ["game_id", "team"],
+    "pbp_explosive_plays": ["game_id", "team"],
+}
+# Tables joined by load_data, and under the cfb.game_wide view
+GAME_WIDE_TABLES = [
+    "venues",
+    "games",
+    "lines",
+    "game_team_stats",
+    "advanced_game_stats",
+    "pbp_explosive_plays",
+]
+# Version in the comment of cfb.game_wide, bumped with cfb_game_wide.sql
+GAME_WIDE_VERSION = 1
+# Version of the persisted master frame, bumped whenever _join_frames changes its output
+MASTER_FRAME_VERSION = 1
+# Share of the master frame's games past which an incremental load rebuilds in full
+MAX_SPLICE_SHARE = 0.5
+# Regular-season games of a team, to turn the games of history features need into seasons
+GAMES_PER_SEASON = 12
+# Joined columns of no use downstream, dropped by remove_columns
+REMOVED_COLUMNS = [
+    "start_time_tbd",
+    "completed",
+    "home_id",
+    "away_id",
+    "highlights",
+    "notes",
+    "id_venue",
+    "name",
+    "city",
+    "state",
+    "zip",
+    "countrycode",
+]
 
 
 class DataPrep:
@@ -10,25 +74,37 @@ class DataPrep:
     Class whose function is solely to generate the desired data. Does not manipulate, only provides the necessary raw data, except for cases of obviously erroneous data.
     """
 
-    def __init__(self, dataset="cfb"):
+    def __init__(
+        self,
+        dataset="cfb",
+        use_cache: bool = True,
+        compact_dtypes: bool = True,
+        use_view: bool = False,
+        incremental: bool = False,
+    ):
         """
         Initializes which data to load.
 
         Args:
             dataset (str, optional): The type of sport. Defaults to "cfb".
+            use_cache (bool, optional): Whether to read through the local table cache. Defaults to True.
+            compact_dtypes (bool, optional): Whether to cast reads to the dtypes derived from the DDL. Defaults to True.
+            use_view (bool, optional): Whether to read the joined cfb.game_wide view instead of joining the tables here. Defaults to False.
+            incremental (bool, optional): Whether unfiltered loads keep a persisted master frame and rebuild only the games changed since, see cfb_game_changes.sql. Defaults to False.
         """
         self.project_root = os.getenv("PROJECT_ROOT", os.getcwd())
         self.dataset = dataset
+        self.cache = TableCache(enabled=use_cache)
+        self.compact_dtypes = compact_dtypes
+        self.use_view = use_view
+        self.incremental = incremental
+        self.load_timings = {}
+        self.memory_before, self.memory_after = {}, {}
         self.df = None
 
-    # TODO: Fix the ordering
     def make_schemas_tables(self):
-        """Generates all the schemas and tables, if they don't already exist."""
-        queries_path = os.path.join(self.project_root, f"src/cfb/data/sql_queries/")
-        if os.path.isdir(queries_path):
-            for patch_file in os.listdir(queries_path):
-                patch_path = os.path.join(queries_path, patch_file)
-                execute_sql_script(patch_path)
+        """Generates all the schemas and tables, if they don't already exist, in dependency order."""
+        make_schemas_tables(os.path.join(self.project_root, "src/cfb/data/sql_queries"))
 
     def load_and_patch_errors(self):
         """
@@ -46,16 +122,231 @@ class DataPrep:
                 patch_path = os.path.join(patches_path, patch_file)
                 execute_sql_script(patch_path)
 
-    def load_data(self):
-        """Fetch game, venue, and odds data from the database or other sources."""
-        venue_df = retrieve_data(self.dataset, "venues")
-        game_df = retrieve_data(self.dataset, "games")
-        line_df = retrieve_data(self.dataset, "lines")
-        game_team_stat_df = retrieve_data(self.dataset, "game_team_stats")
-        advanced_game_stat_df = retrieve_data(self.dataset, "advanced_game_stats")
+    def _retrieve(
+        self,
+        table: str,
+        columns: Optional[dict[str, list[str]]],
+        cached: bool = True,
+        **filters,
+    ) -> pd.DataFrame:
+        """
+        Retrieves one table, projecting to the requested columns plus the join keys.
+
+        Args:
+            table (str): Table to retrieve.
+            columns (Optional[dict[str, list[str]]]): Columns to keep per table. Tables not listed are loaded in full.
+            cached (bool, optional): Whether to read through the table cache, if enabled. Defaults to True.
+            **filters: Season, week, and game filters for retrieve_data.
+
+        Returns:
+            pd.DataFrame: Table data.
+        """
+        table_columns = None
+        if columns and table in columns:
+            table_columns = list(
+                dict.fromkeys(JOIN_COLUMNS[table] + list(columns[table]))
+            )
+
+        def load() -> pd.DataFrame:
+            df = retrieve_data(self.dataset, table, table_columns, **filters)
+            if not self.compact_dtypes or df is None:
+                return df
+            compact_df = apply_dtypes(df, f"{self.dataset}.{table}")
+            self.memory_before[table], self.memory_after[table] = df, compact_df
+            return compact_df
+
+        if not cached:
+            return load()
+        return self.cache.get_or_load(
+            self.dataset,
+            table,
+            load,
+            spec=repr((table_columns, filters, self.compact_dtypes)),
+        )
+
+    def _empty_frames(
+        self, columns: Optional[dict[str, list[str]]]
+    ) -> dict[str, pd.DataFrame]:
+        """
+        Builds zero-row frames of the tables in GAME_WIDE_TABLES, with the columns and dtypes
+        _retrieve would read, so that _join_frames gives the names and dtypes of the joined data.
+
+        Args:
+            columns (Optional[dict[str, list[str]]]): Columns to keep per table. Tables not listed are kept in full.
+
+        Returns:
+            dict[str, pd.DataFrame]: Empty frame of each table.
+        """
+        table_columns = pull_required_from_db(
+            """
+            SELECT table_name, column_name
+            FROM information_schema.columns
+            WHERE table_schema = %(schema)s AND table_name = ANY(%(tables)s)
+            ORDER BY table_name, ordinal_position
+            """,
+            {"schema": self.dataset, "tables": GAME_WIDE_TABLES},
+        )
+        registry = get_dtype_registry()
+        frames = {}
+        for table in GAME_WIDE_TABLES:
+            if columns and table in columns:
+                keep = list(dict.fromkeys(JOIN_COLUMNS[table] + list(columns[table])))
+            else:
+                keep = list(
+                    table_columns.loc[
+                        table_columns["table_name"] == table, "column_name"
+                    ]
+                )
+            dtypes = registry.get(f"{self.dataset}.{table}", {})
+            frames[table] = pd.DataFrame(
+                {
+                    col: pd.Series(
+                        dtype=(dtypes.get(col) if self.compact_dtypes else None)
+                        or object
+                    )
+                    for col in keep
+                }
+            )
+        return frames
+
+    def _retrieve_game_wide(
+        self,
+        columns: Optional[dict[str, list[str]]],
+        cached: bool = True,
+        **filters,
+    ) -> pd.DataFrame:
+        """
+        Reads the joined data from the cfb.game_wide view, so the database does the joins and
+        only one result set is transferred. Same columns and dtypes as _join_frames gives.
+
+        Args:
+            columns (Optional[dict[str, list[str]]]): Columns to keep per table, join keys are always kept.
+            cached (bool, optional): Whether to read through the table cache, if enabled. Defaults to True.
+            **filters: Season, week, and game filters for retrieve_data.
+
+        Raises:
+            Exception: The view is missing or older than GAME_WIDE_VERSION.
+
+        Returns:
+            pd.DataFrame: Joined data.
+        """
+        version = pull_required_from_db(
+            "SELECT obj_description(to_regclass(%(view)s), 'pg_class') AS version",
+            {"view": f"{self.dataset}.game_wide"},
+        )["version"].iloc[0]
+        if version != f"version {GAME_WIDE_VERSION}":
+            raise Exception(
+                f"{self.dataset}.game_wide is at {version}, expected version {GAME_WIDE_VERSION}. "
+                "Run make_schemas_tables to rebuild it."
+            )
+        template = self._join_frames(self._empty_frames(columns))
+
+        def load() -> pd.DataFrame:
+            start_time = time.time()
+            df = retrieve_data(
+                self.dataset, "game_wide", list(template.columns), **filters
+            )
+            self.load_timings = {"game_wide": time.time() - start_time}
+            print(
+                f"Loaded game_wide in {self.load_timings['game_wide']:.2f} seconds..."
+            )
+            if not self.compact_dtypes or df is None:
+                return df
+            compact_df = df.copy()
+            for col, dtype in template.dtypes.items():
+                if dtype == object:
+                    continue
+                if isinstance(dtype, pd.CategoricalDtype):
+                    compact_df[col] = compact_df[col].astype("category")
+                elif pd.api.types.is_datetime64_dtype(dtype):
+                    compact_df[col] = pd.to_datetime(compact_df[col])
+                elif pd.api.types.is_extension_array_dtype(dtype):
+                    compact_df[col] = pd.to_numeric(compact_df[col]).astype(dtype)
+                elif (
+                    pd.api.types.is_integer_dtype(dtype)
+                    and compact_df[col].isna().any()
+                ):
+                    # Unmatched rows of a left merge turn integers to floats in _join_frames
+                    compact_df[col] = compact_df[col].astype("float64")
+                else:
+                    compact_df[col] = compact_df[col].astype(dtype)
+            print(memory_report({"game_wide": df}, {"game_wide": compact_df}))
+            return compact_df
+
+        if not cached:
+            return load()
+        return self.cache.get_or_load(
+            self.dataset,
+            "game_wide",
+            load,
+            spec=repr(
+                (
+                    GAME_WIDE_VERSION,
+                    list(template.columns),
+                    filters,
+                    self.compact_dtypes,
+                )
+            ),
+            depends_on=GAME_WIDE_TABLES,
+        )
+
+    def _fetch_concurrently(
+        self, reads: dict[str, Callable[[], pd.DataFrame]]
+    ) -> dict[str, pd.DataFrame]:
+        """
+        Runs independent reads in parallel on pooled connections and reports each read's time.
+
+        Args:
+            reads (dict[str, Callable[[], pd.DataFrame]]): Read functions by name.
+
+        Returns:
+            dict[str, pd.DataFrame]: Results by name, once all have arrived.
+        """
+
+        def timed(read: Callable[[], pd.DataFrame]) -> tuple[pd.DataFrame, float]:
+            start_time = time.time()
+            return read(), time.time() - start_time
+
+        start_time = time.time()
+        with ThreadPoolExecutor(max_workers=len(reads)) as executor:
+            futures = {
+                name: executor.submit(timed, read) for name, read in reads.items()
+            }
+            results = {name: future.result() for name, future in futures.items()}
+        elapsed = time.time() - start_time
+
+        self.load_timings = {
+            name: read_time for name, (_, read_time) in results.items()
+        }
+        for name, read_time in sorted(
+            self.load_timings.items(), key=lambda item: -item[1]
+        ):
+            print(f"Loaded {name} in {read_time:.2f} seconds...")
+        print(
+            f"Loaded {len(reads)} reads in {elapsed:.2f} seconds "
+            f"({sum(self.load_timings.values()):.2f} seconds sequential)."
+        )
+        return {name: data for name, (data, _) in results.items()}
+
+    def _join_frames(self, frames: dict[str, pd.DataFrame]) -> pd.DataFrame:
+        """
+        Joins the tables read by load_data into one row per game, with home and away columns.
+
+        Args:
+            frames (dict[str, pd.DataFrame]): Frame of each table in GAME_WIDE_TABLES.
+
+        Returns:
+            pd.DataFrame: Joined data.
+        """
+        venue_df = frames["venues"]
+        game_df = frames["games"]
+        line_df = frames["lines"]
+        game_team_stat_df = frames["game_team_stats"]
+        advanced_game_stat_df = frames["advanced_game_stats"]
+        pbp_df = frames["pbp_explosive_plays"]
 
         # Merge game and venue data on venue_id
-        self.df = pd.merge(
+        df = pd.merge(
             game_df,
             venue_df,
             how="left",
@@ -69,84 +360,346 @@ class DataPrep:
             {"over_under": ["min", "max"], "spread": ["min", "max"]}
         )
         bet_df.columns = ["min_ou", "max_ou", "min_spread", "max_spread"]
-        self.df = pd.merge(self.df, bet_df, how="left", on="id")
+        df = pd.merge(df, bet_df, how="left", on="id")
 
         # Merge box score data
         for side in ["home", "away"]:
             side_gts = game_team_stat_df.add_prefix(f"{side}_")
-            self.df = self.df.merge(
+            df = df.merge(
                 side_gts,
                 how="left",
                 left_on=["id", f"{side}_id", f"{side}_team"],
                 right_on=[f"{side}_game_id", f"{side}_team_id", f"{side}_team"],
             )
 
-        # Get necessary stats from play-by-play
-        pbp_query = """
-            SELECT
-                game_id,
-                offense AS team,
-                COUNT(CASE WHEN yards_gained >= 30 THEN 1 END) AS plays_30_plus,
-                COUNT(CASE WHEN yards_gained >= 35 THEN 1 END) AS plays_35_plus,
-                COUNT(CASE WHEN yards_gained >= 40 THEN 1 END) AS plays_40_plus
-            FROM
-                cfb.play_by_play
-            GROUP BY
-                game_id,
-                offense
-            ORDER BY
-                game_id,
-                offense;
-            """
-        pbp_df = pull_from_db(pbp_query)
         pbp_cols = [col for col in pbp_df.columns if col not in ("game_id", "team")]
 
         for side in ["home", "away"]:
-            self.df = self.df.merge(
+            df = df.merge(
                 pbp_df,
                 how="left",
                 left_on=["id", f"{side}_team"],
                 right_on=["game_id", "team"],
             )
             for col in pbp_cols:
-                self.df.rename(columns={col: f"{side}_{col}"}, inplace=True)
-            self.df.drop(columns=["team", "game_id"], inplace=True)
+                df.rename(columns={col: f"{side}_{col}"}, inplace=True)
+            df.drop(columns=["team", "game_id"], inplace=True)
 
         # Need to make everything into one row (home, away), then merge on game_id.
-        advanced_game_stat_df.drop(columns=["opponent", "season", "week"], inplace=True)
+        advanced_game_stat_df.drop(
+            columns=["opponent", "season", "week"], inplace=True, errors="ignore"
+        )
         for side in ["home", "away"]:
             side_ags = advanced_game_stat_df.add_prefix(f"{side}_")
             side_ags.rename(columns={f"{side}_game_id": "game_id"}, inplace=True)
-            self.df = self.df.merge(
+            df = df.merge(
                 side_ags,
                 how="left",
                 left_on=["id", f"{side}_team"],
                 right_on=["game_id", f"{side}_team"],
             ).drop(columns=["game_id"])
+        return df
+
+    def output_columns(self) -> list[str]:
+        """
+        Lists the columns get_data returns when loading everything, without reading any rows.
+
+        Returns:
+            list[str]: Joined columns, after remove_columns.
+        """
+        template = self._join_frames(self._empty_frames(None))
+        return [col for col in template.columns if col not in REMOVED_COLUMNS]
+
+    def table_columns(self, columns: Iterable[str]) -> dict[str, list[str]]:
+        """
+        Maps joined columns, as named by _join_frames, back to the table columns they come from,
+        so that load_data reads only what is asked for. Home and away columns of a table come from
+        the same table column, so asking for either loads both.
+
+        Args:
+            columns (Iterable[str]): Joined columns to keep.
+
+        Raises:
+            Exception: The mapping no longer covers what _join_frames returns.
+
+        Returns:
+            dict[str, list[str]]: Columns to keep per table, for load_data.
+        """
+        frames = self._empty_frames(None)
+        game_cols = set(frames["games"].columns)
+        # Columns each table adds to the join, and the joined names of each
+        excluded = {
+            "games": set(),
+            "venues": set(),
+            "lines": set(frames["lines"].columns),
+            "game_team_stats": {"team"},
+            "advanced_game_stats": {"game_id", "team", "opponent", "season", "week"},
+            "pbp_explosive_plays": {"game_id", "team"},
+        }
+        sources = {}
+        for table, df in frames.items():
+            for col in df.columns:
+                if col in excluded[table]:
+                    continue
+                if table == "games":
+                    names = [col]
+                elif table == "venues":
+                    names = [f"{col}_venue" if col in game_cols else col]
+                else:
+                    names = [f"{side}_{col}" for side in ["home", "away"]]
+                sources[(table, col)] = names
+
+        joined = set(self._join_frames(frames).columns)
+        mapped = {name for names in sources.values() for name in names}
+        mapped |= {"min_ou", "max_ou", "min_spread", "max_spread"}
+        if mapped != joined:
+            raise Exception(
+                f"table_columns is out of date with _join_frames: {sorted(mapped ^ joined)}"
+            )
+
+        columns = set(columns)
+        table_columns = {table: [] for table in GAME_WIDE_TABLES}
+        for (table, col), names in sources.items():
+            if columns.intersection(names):
+                table_columns[table].append(col)
+        return table_columns
+
+    def load_data(
+        self,
+        seasons: Optional[Iterable[int]] = None,
+        weeks: Optional[Iterable[int]] = None,
+        game_ids: Optional[Iterable[int]] = None,
+        columns: Optional[Union[dict[str, list[str]], Iterable[str]]] = None,
+        through: Optional[tuple[int, int]] = None,
+    ):
+        """
+        Fetch game, venue, and odds data from the database or other sources.
+
+        Args:
+            seasons (Optional[Iterable[int]], optional): Seasons to load. Defaults to all.
+            weeks (Optional[Iterable[int]], optional): Weeks to load. Defaults to all.
+            game_ids (Optional[Iterable[int]], optional): Games to load. Defaults to all.
+            columns (Optional[Union[dict[str, list[str]], Iterable[str]]], optional): Columns to keep per table, or joined columns to keep, see table_columns. Join keys are always kept. Defaults to all.
+            through (Optional[tuple[int, int]], optional): Last season and regular-season week to load, i.e. (2025, 6). Defaults to all.
+        """
+        if columns is not None and not isinstance(columns, dict):
+            columns = self.table_columns(columns)
+        filters = {
+            name: None if values is None else [int(value) for value in values]
+            for name, values in [
+                ("seasons", seasons),
+                ("weeks", weeks),
+                ("game_ids", game_ids),
+            ]
+        }
+        filters["through"] = None if through is None else tuple(map(int, through))
+        unfiltered = all(values is None for values in filters.values())
+        if self.incremental and columns is None and unfiltered:
+            self.df = self._load_incremental()
+            return
+        self.df = self._load_joined(columns, **filters)
+
+    def _load_joined(
+        self,
+        columns: Optional[dict[str, list[str]]],
+        cached: bool = True,
+        **filters,
+    ) -> pd.DataFrame:
+        """
+        Reads and joins the tables, in pandas or through the cfb.game_wide view.
+
+        Args:
+            columns (Optional[dict[str, list[str]]]): Columns to keep per table, join keys are always kept.
+            cached (bool, optional): Whether to read through the table cache, if enabled. Defaults to True.
+            **filters: Season, week, and game filters for retrieve_data.
+
+        Returns:
+            pd.DataFrame: Joined data.
+        """
+        # Only the line aggregates below are used from lines
+        columns = {"lines": [], **(columns or {})}
+        if self.use_view:
+            return self._retrieve_game_wide(columns, cached, **filters)
+        reads = {
+            table: partial(self._retrieve, table, columns, cached, **filters)
+            for table in GAME_WIDE_TABLES
+        }
+        self.memory_before, self.memory_after = {}, {}
+        frames = self._fetch_concurrently(reads)
+        if self.memory_after:
+            print(memory_report(self.memory_before, self.memory_after))
+            self.memory_before, self.memory_after = {}, {}
+        return self._join_frames(frames)
+
+    def _schema_signature(self) -> str:
+        """
+        Fingerprints what the master frame is built from, i.e. the columns and types of the joined
+        tables, so that a schema change rebuilds it in full.
+
+        Returns:
+            str: Signature of the joined tables and the master frame's settings.
+        """
+        table_columns = pull_required_from_db(
+            """
+            SELECT table_name, column_name, data_type
+            FROM information_schema.columns
+            WHERE table_schema = %(schema)s AND table_name = ANY(%(tables)s)
+            ORDER BY table_name, ordinal_position
+            """,
+            {"schema": self.dataset, "tables": GAME_WIDE_TABLES},
+        )
+        signature = repr(
+            (
+                MASTER_FRAME_VERSION,
+                self.compact_dtypes,
+                table_columns.values.tolist(),
+            )
+        )
+        return hashlib.md5(signature.encode()).hexdigest()
+
+    def _load_incremental(self) -> pd.DataFrame:
+        """
+        Returns every game from the persisted master frame, after rebuilding only the games
+        logged in cfb.game_changes past its watermark and splicing them in. Rebuilds in full when
+        there is no master frame, the schema changed, a table was truncated, the change log is
+        missing, or most games changed.
+
+        Returns:
+            pd.DataFrame: Joined data of every game, sorted by id.
+        """
+        name = f"{self.dataset}.master"
+        if not self.compact_dtypes:
+            name += "-raw"
+        signature = self._schema_signature()
+        logged = pull_required_from_db(
+            "SELECT to_regclass(%(log)s) IS NOT NULL AS logged",
+            {"log": f"{self.dataset}.game_changes"},
+        )["logged"].iloc[0]
+        if not logged:
+            print(
+                f"{self.dataset}.game_changes is missing, loading in full. "
+                "Run make_schemas_tables to log changes."
+            )
+            return self._load_joined(None)
+
+        # Watermark first, so changes written during the load are picked up next time. Entries
+        # of transactions still running can commit below the highest seq, so the watermark is the
+        # oldest running transaction, and entries from it onwards are read again next time
+        watermark = pull_required_from_db(
+            "SELECT pg_snapshot_xmin(pg_current_snapshot())::text::bigint AS xmin"
+        )["xmin"].iloc[0]
+        meta = {"xmin": int(watermark), "signature": signature}
+
+        master = self.cache.read_frame(name)
+        reason = None
+        if master is None:
+            reason = "no master frame"
+        elif master[1].get("signature") != signature:
+            reason = "schema changed"
+        elif "xmin" not in master[1]:
+            reason = "no transaction watermark"
+        else:
+            master_df, master_meta = master
+            changes = pull_required_from_db(
+                sql.SQL(
+                    "SELECT DISTINCT game_id FROM {} WHERE xact_id >= %(since)s::text::xid8"
+                ).format(sql.Identifier(self.dataset, "game_changes")),
+                {"since": str(master_meta["xmin"])},
+            )
+            changed_ids = changes["game_id"]
+            if changed_ids.isna().any():
+                reason = "a table was truncated"
+            elif len(changed_ids) > MAX_SPLICE_SHARE * len(master_df):
+                reason = f"{len(changed_ids)} games changed"
+
+        start_time = time.time()
+        if reason is not None:
+            print(f"Rebuilding the master frame in full, {reason}...")
+            df = self._load_joined(None, cached=False)
+        elif changed_ids.empty:
+            print(f"Master frame is current through transaction {master_meta['xmin']}.")
+            return master_df
+        else:
+            changed_ids = [int(game_id) for game_id in changed_ids]
+            changed_df = self._load_joined(None, cached=False, game_ids=changed_ids)
+            df = pd.concat(
+                [master_df[~master_df["id"].isin(changed_ids)], changed_df],
+                ignore_index=True,
+            )
+            # Concatenating categoricals with different categories leaves objects
+            for col, dtype in master_df.dtypes.items():
+                if isinstance(dtype, pd.CategoricalDtype) and col in df.columns:
+                    df[col] = df[col].astype("category")
+            print(
+                f"Spliced {len(changed_df)} rebuilt rows of {len(changed_ids)} changed games "
+                f"into the master frame in {time.time() - start_time:.2f} seconds."
+            )
+
+        df = df.sort_values("id", kind="stable").reset_index(drop=True)
+        try:
+            self.cache.write_frame(name, df, meta)
+        except (pa.ArrowInvalid, pa.ArrowTypeError) as e:
+            print(f"Unable to persist the master frame: {e}")
+        return df
 
     def remove_columns(self):
         """Remove truly unnecessary columns to simplify the dataset."""
-        useless_cols = [
-            "start_time_tbd",
-            "completed",
-            "home_id",
-            "away_id",
-            "highlights",
-            "notes",
-            "id_venue",
-            "name",
-            "city",
-            "state",
-            "zip",
-            "countrycode",
-        ]
         self.df.drop(
-            columns=[col for col in useless_cols if col in self.df.columns],
+            columns=[col for col in REMOVED_COLUMNS if col in self.df.columns],
             inplace=True,
         )
 
-    def get_data(self):
-        """Returns the un-processed data for further transformations."""
-        self.load_data()
+    def history_seasons(
+        self, seasons: Iterable[int], history_games: Optional[int] = None
+    ) -> list[int]:
+        """
+        Adds to the seasons those before them holding the history the temporal features need.
+
+        Args:
+            seasons (Iterable[int]): Seasons wanted.
+            history_games (Optional[int], optional): Prior games needed per team. Defaults to required_history_games().
+
+        Returns:
+            list[int]: Seasons to load, sorted.
+        """
+        if history_games is None:
+            history_games = required_history_games()
+        lookback = math.ceil(history_games / GAMES_PER_SEASON)
+        return sorted(
+            {int(season) - back for season in seasons for back in range(lookback + 1)}
+        )
+
+    def get_data(
+        self,
+        seasons: Optional[Iterable[int]] = None,
+        through_week: Optional[int] = None,
+        history_games: Optional[int] = None,
+        **load_kwargs,
+    ):
+        """
+        Returns the un-processed data for further transformations. Selecting seasons also loads
+        the seasons before them whose games the rolling and Kalman features look back on, keep
+        df["season"].isin(seasons) after feature engineering to leave them out.
+
+        Args:
+            seasons (Optional[Iterable[int]], optional): Seasons wanted, i.e. [2024, 2025]. Defaults to all.
+            through_week (Optional[int], optional): Last regular-season week of the last season, i.e. the week before the one predicted. Defaults to all.
+            history_games (Optional[int], optional): Prior games needed per team. Defaults to required_history_games().
+            **load_kwargs: Week, game, and column selections passed to load_data.
+        """
+        through = None
+        if through_week is not None:
+            if seasons is not None:
+                last_season = max(int(season) for season in seasons)
+            else:
+                last_season = pull_required_from_db(
+                    sql.SQL("SELECT MAX(season) AS season FROM {}").format(
+                        sql.Identifier(self.dataset, "games")
+                    )
+                )["season"].iloc[0]
+            through = (last_season, through_week)
+        if seasons is not None:
+            seasons = self.history_seasons(seasons, history_games)
+        self.load_data(seasons=seasons, through=through, **load_kwargs)
         self.remove_columns()
         return self.df
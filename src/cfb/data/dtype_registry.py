@@ -0,0 +1,203 @@
+import glob
+import os
+import re
+from functools import lru_cache
+from typing import Optional
+
+import pandas as pd
+
+# Low-cardinality text columns, i.e. teams, conferences, and venues
+CATEGORICAL_PATTERN = re.compile(
+    r"(^|_)(team|conference|classification|venue|offense|defense|home|away|opponent|provider|season_type|play_type)$"
+)
+# Integer columns with a known small range
+SMALL_INT_DTYPES = {
+    "week": "Int8",
+    "down": "Int8",
+    "period": "Int8",
+    "offense_timeouts": "Int8",
+    "defense_timeouts": "Int8",
+    "clock_minutes": "Int8",
+    "clock_seconds": "Int8",
+    "yardline": "Int8",
+    "yards_to_goal": "Int8",
+    "distance": "Int8",
+    "season": "Int16",
+    "drive_number": "Int16",
+    "play_number": "Int16",
+    "yards_gained": "Int16",
+    "offense_score": "Int16",
+    "defense_score": "Int16",
+}
+
+
+def _split_top_level(body: str) -> list[str]:
+    """
+    Splits a CREATE TABLE body on commas outside of parentheses, i.e. not inside DECIMAL(8, 8).
+
+    Args:
+        body (str): Text between the outer parentheses.
+
+    Returns:
+        list[str]: Column and constraint definitions.
+    """
+    items, depth, current = [], 0, []
+    for char in body:
+        if char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+        if char == "," and depth == 0:
+            items.append("".join(current))
+            current = []
+        else:
+            current.append(char)
+    items.append("".join(current))
+    return [item.strip() for item in items if item.strip()]
+
+
+def parse_ddl(ddl: str) -> dict[str, dict[str, str]]:
+    """
+    Parses the column types out of CREATE TABLE statements.
+
+    Args:
+        ddl (str): SQL text.
+
+    Returns:
+        dict[str, dict[str, str]]: Column to Postgres type, per schema-qualified table.
+    """
+    tables = {}
+    for match in re.finditer(
+        r"CREATE\s+TABLE\s+(?:IF\s+NOT\s+EXISTS\s+)?([\w.]+)\s*\((.*?)\)\s*;",
+        ddl,
+        flags=re.IGNORECASE | re.DOTALL,
+    ):
+        table, body = match.group(1).lower(), match.group(2)
+        columns = {}
+        for item in _split_top_level(body):
+            name, _, rest = item.partition(" ")
+            if name.upper() in ["PRIMARY", "FOREIGN", "UNIQUE", "CONSTRAINT", "CHECK"]:
+                continue
+            pg_type = re.split(
+                r"\s+(?:NULL|NOT|PRIMARY|DEFAULT|REFERENCES)\b",
+                rest.strip(),
+                flags=re.IGNORECASE,
+            )[0]
+            # Unquoted identifiers are folded to lower case by Postgres
+            columns[name.lower()] = pg_type.strip().upper()
+        tables[table] = columns
+    return tables
+
+
+def pandas_dtype(column: str, pg_type: str) -> Optional[str]:
+    """
+    Picks the compact pandas dtype for a column. Stats become float32 so that imputing and
+    averaging need no casts; identifiers and small counters become nullable integers.
+
+    Args:
+        column (str): Column name.
+        pg_type (str): Postgres type from the DDL.
+
+    Returns:
+        Optional[str]: Pandas dtype, None to leave the column as read.
+    """
+    if pg_type.endswith("[]") or pg_type == "BOOLEAN":
+        return None
+    if pg_type.startswith(("DATE", "TIMESTAMP")):
+        return "datetime64[ns]"
+    if pg_type.startswith(("VARCHAR", "TEXT")):
+        return "category" if CATEGORICAL_PATTERN.search(column) else None
+    if column in SMALL_INT_DTYPES:
+        return SMALL_INT_DTYPES[column]
+    if pg_type == "BIGINT":
+        return "Int64"
+    if pg_type == "INT" and column == "id":
+        # Primary keys are never null, and end up as the index
+        return "int32"
+    if pg_type == "INT" and column.endswith("_id"):
+        return "Int32"
+    if pg_type.startswith(("INT", "FLOAT", "DECIMAL", "NUMERIC", "REAL")):
+        return "float32"
+    return None
+
+
+@lru_cache(maxsize=None)
+def get_dtype_registry(sql_dir: str = None) -> dict[str, dict[str, str]]:
+    """
+    Builds the compact dtype of every column from the DDL in sql_queries.
+
+    Args:
+        sql_dir (str, optional): Directory of the DDL. Defaults to src/cfb/data/sql_queries.
+
+    Returns:
+        dict[str, dict[str, str]]: Column to pandas dtype, per schema-qualified table.
+    """
+    if sql_dir is None:
+        project_root = os.getenv("PROJECT_ROOT", os.getcwd())
+        sql_dir = os.path.join(project_root, "src/cfb/data/sql_queries")
+    registry = {}
+    for sql_path in sorted(glob.glob(os.path.join(sql_dir, "*.sql"))):
+        with open(sql_path, "r") as file:
+            for table, columns in parse_ddl(file.read()).items():
+                registry[table] = {
+                    column: dtype
+                    for column, pg_type in columns.items()
+                    if (dtype := pandas_dtype(column, pg_type)) is not None
+                }
+    return registry
+
+
+def apply_dtypes(df: pd.DataFrame, table: str) -> pd.DataFrame:
+    """
+    Casts the columns of a frame read from a table to their compact dtypes.
+
+    Args:
+        df (pd.DataFrame): Frame as read from the database.
+        table (str): Schema-qualified table, i.e. "cfb.games".
+
+    Returns:
+        pd.DataFrame: Frame with compact dtypes.
+    """
+    dtypes = get_dtype_registry().get(table, {})
+    df = df.copy()
+    for col in df.columns:
+        dtype = dtypes.get(col)
+        if dtype is None:
+            continue
+        if dtype.startswith("datetime64"):
+            df[col] = pd.to_datetime(df[col])
+        elif dtype.startswith("Int"):
+            df[col] = pd.to_numeric(df[col]).astype(dtype)
+        else:
+            df[col] = df[col].astype(dtype)
+    return df
+
+
+def memory_report(
+    before: dict[str, pd.DataFrame], after: dict[str, pd.DataFrame]
+) -> pd.DataFrame:
+    """
+    Compares the deep memory usage of frames before and after compacting.
+
+    Args:
+        before (dict[str, pd.DataFrame]): Frames as read, by table.
+        after (dict[str, pd.DataFrame]): Compacted frames, by table.
+
+    Returns:
+        pd.DataFrame: Memory in MB before and after, and the reduction, per table.
+    """
+    report = pd.DataFrame(
+        {
+            "before_mb": {
+                table: df.memory_usage(deep=True).sum() / 2**20
+                for table, df in before.items()
+            },
+            "after_mb": {
+                table: df.memory_usage(deep=True).sum() / 2**20
+                for table, df in after.items()
+            },
+        }
+    )
+    report.loc["total"] = report.sum()
+    report["reduction"] = 1 - report["after_mb"] / report["before_mb"]
+    return report.round(3)
@@ -0,0 +1,196 @@
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Callable, Optional
+
+import urllib3
+from cfbd.rest import ApiException
+
+# Defaults for the optional `cfbd` section of config.yaml
+DEFAULT_FETCH_CONFIG = {
+    "max_workers": 4,
+    "requests_per_second": 5.0,
+    "burst": 5,
+    "max_retries": 5,
+    "backoff_base": 1.0,
+    "backoff_max": 60.0,
+}
+
+_shared_scheduler = None
+_shared_scheduler_lock = threading.Lock()
+
+
+class TokenBucket:
+    """Thread-safe token bucket, refilled continuously at a fixed rate up to a burst capacity."""
+
+    def __init__(self, rate: float, capacity: int = 1):
+        """
+        Initializes a full bucket.
+
+        Args:
+            rate (float): Tokens added per second.
+            capacity (int, optional): Most tokens held at once, i.e. the allowed burst. Defaults to 1.
+        """
+        self.rate = rate
+        self.capacity = max(1, capacity)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """Takes one token, blocking until one is available."""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(
+                    self.capacity, self.tokens + (now - self.updated) * self.rate
+                )
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class FetchScheduler:
+    """
+    Runs CFBD API calls with bounded concurrency under a shared rate limit, retrying rate-limited
+    (429) and server (5xx) errors with exponential backoff.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = 4,
+        requests_per_second: float = 5.0,
+        burst: int = 5,
+        max_retries: int = 5,
+        backoff_base: float = 1.0,
+        backoff_max: float = 60.0,
+    ):
+        """
+        Initializes the rate limiter and retry policy.
+
+        Args:
+            max_workers (int, optional): Calls in flight at once. Defaults to 4.
+            requests_per_second (float, optional): Sustained request rate, shared by all workers. Defaults to 5.0.
+            burst (int, optional): Requests allowed back to back before the rate applies. Defaults to 5.
+            max_retries (int, optional): Retries of a failing call before giving up. Defaults to 5.
+            backoff_base (float, optional): Seconds before the first retry, doubled each retry. Defaults to 1.0.
+            backoff_max (float, optional): Most seconds between retries. Defaults to 60.0.
+        """
+        self.max_workers = max_workers
+        self.bucket = TokenBucket(requests_per_second, burst)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+    def _retry_delay(self, attempt: int, e: Exception) -> Optional[float]:
+        """
+        Decides whether a failed call is retried, and after how long.
+
+        Args:
+            attempt (int): Retries made so far.
+            e (Exception): Error raised by the call.
+
+        Returns:
+            Optional[float]: Seconds to wait, None to give up.
+        """
+        if attempt >= self.max_retries:
+            return None
+        if isinstance(e, ApiException):
+            if e.status != 429 and not (e.status or 0) >= 500:
+                return None
+            retry_after = (e.headers or {}).get("Retry-After")
+            if retry_after is not None and str(retry_after).isdigit():
+                return min(float(retry_after), self.backoff_max)
+        elif not isinstance(e, urllib3.exceptions.HTTPError):
+            return None
+        delay = min(self.backoff_max, self.backoff_base * 2**attempt)
+        # Jitter so that workers throttled together do not retry together
+        return delay * random.uniform(0.5, 1)
+
+    def call(self, fnc: Callable, *args, **kwargs) -> Any:
+        """
+        Makes one API call under the rate limit, retrying transient errors.
+
+        Args:
+            fnc (Callable): API method, i.e. PlaysApi.get_plays.
+            *args: Positional arguments of the call.
+            **kwargs: Keyword arguments of the call.
+
+        Raises:
+            ApiException: Non-retryable error, or retries exhausted.
+
+        Returns:
+            Any: Result of the call.
+        """
+        # Clients taking a token per network request themselves let cache hits skip the limit
+        api_client = getattr(getattr(fnc, "__self__", None), "api_client", None)
+        throttle = not getattr(api_client, "throttles_requests", False)
+        attempt = 0
+        while True:
+            if throttle:
+                self.bucket.acquire()
+            try:
+                return fnc(*args, **kwargs)
+            except (ApiException, urllib3.exceptions.HTTPError) as e:
+                delay = self._retry_delay(attempt, e)
+                if delay is None:
+                    raise
+                status = getattr(e, "status", type(e).__name__)
+                print(f"Retrying after {status} in {delay:.1f} seconds...")
+                time.sleep(delay)
+                attempt += 1
+
+    def run(self, jobs: dict[str, Callable[[], Any]]) -> dict[str, Any]:
+        """
+        Runs independent jobs concurrently, reporting progress as each finishes.
+
+        Args:
+            jobs (dict[str, Callable[[], Any]]): Jobs by name, each typically a fetch_and_store_* call.
+
+        Returns:
+            dict[str, Any]: Results by name. Failed jobs are reported and left out.
+        """
+        if not jobs:
+            return {}
+        results, failed = {}, []
+        start_time = time.time()
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {executor.submit(job): name for name, job in jobs.items()}
+            for done, future in enumerate(as_completed(futures), start=1):
+                name = futures[future]
+                try:
+                    results[name] = future.result()
+                except Exception as e:
+                    failed.append(name)
+                    print(f"Failed fetching {name}: {e}")
+                print(
+                    f"[{done}/{len(jobs)}] Fetched {name}, "
+                    f"{time.time() - start_time:.1f} seconds elapsed..."
+                )
+        print(
+            f"Fetched {len(jobs) - len(failed)} of {len(jobs)} jobs in "
+            f"{time.time() - start_time:.1f} seconds ({len(failed)} failed)."
+        )
+        return results
+
+
+def get_shared_scheduler(**fetch_config) -> FetchScheduler:
+    """
+    Returns the process-wide scheduler, creating it on first use, so loaders running at the same
+    time share one rate limit rather than each getting their own.
+
+    Args:
+        **fetch_config: FetchScheduler arguments, only used on first use.
+
+    Returns:
+        FetchScheduler: Shared scheduler.
+    """
+    global _shared_scheduler
+    with _shared_scheduler_lock:
+        if _shared_scheduler is None:
+            _shared_scheduler = FetchScheduler(**fetch_config)
+        return _shared_scheduler
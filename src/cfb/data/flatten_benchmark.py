@@ -0,0 +1,181 @@
+import argparse
+import time
+from typing import Callable
+
+import pandas as pd
+from cfb_game_team_data import CFBGameTeamData
+from cfbd_records import game_team_stat_rows, records_to_arrow, records_to_df
+from synthetic_cfbd import (
+    synthetic_advanced_game_stats,
+    synthetic_betting_games,
+    synthetic_game_team_stats,
+    synthetic_games,
+    synthetic_plays,
+    synthetic_venues,
+)
+
+
+def _legacy_venues(venues: list) -> pd.DataFrame:
+    """Former CFBVenueData flattening, one single-row frame per venue."""
+    return pd.concat([pd.DataFrame([venue.to_dict()]) for venue in venues])
+
+
+def _legacy_games(games: list) -> pd.DataFrame:
+    """Former CFBGameData flattening, one single-row frame per game."""
+    return pd.concat([pd.DataFrame([game.to_dict()]) for game in games])
+
+
+def _legacy_lines(betting_games: list) -> pd.DataFrame:
+    """Former CFBLineData flattening, one frame per game expanded by json_normalize."""
+
+    def expand(bg) -> pd.DataFrame:
+        bg_dict = pd.DataFrame(bg.dict())
+        expanded_lines = pd.json_normalize(bg_dict["lines"])
+        return pd.concat([bg_dict.drop("lines", axis=1), expanded_lines], axis=1)
+
+    return pd.concat([expand(bg) for bg in betting_games])
+
+
+def _legacy_advanced_game_stats(advanced_game_stats: list) -> pd.DataFrame:
+    """Former CFBAdvancedGameStats flattening, json_normalize per record then a NaN pass."""
+    return pd.concat(
+        [pd.json_normalize(ags.dict(), sep="_") for ags in advanced_game_stats]
+    ).applymap(lambda x: None if pd.isna(x) else x)
+
+
+def _legacy_plays(plays: list) -> pd.DataFrame:
+    """Former CFBPlayByPlayData flattening, one single-row frame per play then a NaN pass."""
+
+    def expand(play) -> pd.DataFrame:
+        play_dict = play.dict()
+        play_dict["clock_minutes"] = play_dict["clock"]["minutes"]
+        play_dict["clock_seconds"] = play_dict["clock"]["seconds"]
+        del play_dict["clock"]
+        return pd.DataFrame([play_dict])
+
+    return pd.concat([expand(play) for play in plays]).applymap(
+        lambda x: None if pd.isna(x) else x
+    )
+
+
+def _legacy_game_team_stats(game_team_stats: list) -> pd.DataFrame:
+    """Former CFBGameTeamData flattening, a normalize, explode, and pivot per game."""
+
+    def expand(gts) -> pd.DataFrame:
+        teams_df = pd.json_normalize(gts.to_dict(), record_path=["teams"], meta="id")
+        teams_df = teams_df.explode("stats").reset_index(drop=True)
+        stats_df = pd.json_normalize(teams_df["stats"], meta="id")
+        final_df = pd.concat([teams_df.drop(columns="stats"), stats_df], axis=1)
+        return final_df.pivot(
+            index=["id", "teamId", "team"], columns="category", values="stat"
+        ).reset_index()
+
+    return pd.concat([expand(gts) for gts in game_team_stats]).applymap(
+        lambda x: None if pd.isna(x) else x
+    )
+
+
+def _time(fnc: Callable, *args, **kwargs) -> tuple[float, object]:
+    """Times one call."""
+    start_time = time.perf_counter()
+    result = fnc(*args, **kwargs)
+    return time.perf_counter() - start_time, result
+
+
+def _assert_same(legacy_df: pd.DataFrame, batch_df: pd.DataFrame, name: str) -> None:
+    """Checks that the batch flattener gives the legacy frame's values, nulls aside."""
+    legacy_df = legacy_df.reindex(columns=batch_df.columns).reset_index(drop=True)
+    pd.testing.assert_frame_equal(
+        legacy_df.astype(object).where(legacy_df.notna(), None),
+        batch_df.astype(object).where(batch_df.notna(), None),
+        check_dtype=False,
+        obj=name,
+    )
+
+
+def run_benchmark(year: int = 2024, scale: float = 1.0) -> pd.DataFrame:
+    """
+    Times the legacy per-object concatenation against the batch flattener on a synthetic season.
+
+    Args:
+        year (int, optional): Season to synthesize. Defaults to 2024.
+        scale (float, optional): Multiplier on the number of records. Defaults to 1.0.
+
+    Returns:
+        pd.DataFrame: Seconds per loader and approach, and the speedup.
+    """
+    cases = {
+        "venues": (
+            synthetic_venues(int(800 * scale)),
+            _legacy_venues,
+            {"by_alias": True},
+        ),
+        "games": (
+            synthetic_games(year, int(3800 * scale)),
+            _legacy_games,
+            {"by_alias": True},
+        ),
+        "lines": (
+            synthetic_betting_games(year, int(900 * scale)),
+            _legacy_lines,
+            {"explode": "lines"},
+        ),
+        "advanced_game_stats": (
+            synthetic_advanced_game_stats(year, int(1700 * scale)),
+            _legacy_advanced_game_stats,
+            {},
+        ),
+        "play_by_play (one week)": (
+            synthetic_plays(year, 1, int(12000 * scale)),
+            _legacy_plays,
+            {},
+        ),
+    }
+    results = {}
+    # Box scores are reshaped rather than flattened, and typed, so compare them as text
+    game_team_stats = synthetic_game_team_stats(year, int(900 * scale))
+    print(f"Benchmarking game_team_stats ({len(game_team_stats)} records)...")
+    legacy_s, legacy_df = _time(_legacy_game_team_stats, game_team_stats)
+    batch_s, batch_df = _time(
+        lambda records: CFBGameTeamData._gts_to_df(
+            None, pd.DataFrame(game_team_stat_rows(records))
+        ),
+        game_team_stats,
+    )
+    _assert_same(
+        legacy_df.sort_values(["id", "teamId"]).astype(str),
+        batch_df.astype(object).where(batch_df.notna(), None).astype(str),
+        "game_team_stats",
+    )
+    results["game_team_stats"] = {
+        "rows": len(batch_df),
+        "legacy_s": legacy_s,
+        "batch_s": batch_s,
+        "arrow_s": None,
+        "speedup": legacy_s / batch_s,
+    }
+    for name, (records, legacy, kwargs) in cases.items():
+        print(f"Benchmarking {name} ({len(records)} records)...")
+        legacy_s, legacy_df = _time(legacy, records)
+        batch_s, batch_df = _time(records_to_df, records, **kwargs)
+        arrow_s, _ = _time(records_to_arrow, records, **kwargs)
+        _assert_same(legacy_df, batch_df, name)
+        results[name] = {
+            "rows": len(batch_df),
+            "legacy_s": legacy_s,
+            "batch_s": batch_s,
+            "arrow_s": arrow_s,
+            "speedup": legacy_s / batch_s,
+        }
+    return pd.DataFrame(results).T.round(3)
+
+
+if __name__ == "__main__":
+    # python src/cfb/data/flatten_benchmark.py --scale 1
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--year", type=int, default=2024, help="Season to synthesize.")
+    parser.add_argument(
+        "--scale", type=float, default=1.0, help="Multiplier on the number of records."
+    )
+    args = parser.parse_args()
+    print(run_benchmark(args.year, args.scale))
@@ -0,0 +1,85 @@
+import argparse
+import time
+from typing import Iterable, Optional
+
+import pandas as pd
+from data.data_prep import DataPrep
+
+
+def _assert_same(pandas_df: pd.DataFrame, view_df: pd.DataFrame) -> None:
+    """Checks that the view gives the pandas join's columns, dtypes, and values, row order aside."""
+    assert list(pandas_df.columns) == list(
+        view_df.columns
+    ), f"Columns differ: {set(pandas_df.columns) ^ set(view_df.columns)}"
+    dtype_diffs = {
+        col: (str(pandas_df[col].dtype), str(view_df[col].dtype))
+        for col in pandas_df.columns
+        if pandas_df[col].dtype != view_df[col].dtype
+    }
+    assert not dtype_diffs, f"Dtypes differ: {dtype_diffs}"
+    pandas_df = pandas_df.sort_values("id").reset_index(drop=True)
+    view_df = view_df.sort_values("id").reset_index(drop=True)
+    pd.testing.assert_frame_equal(
+        pandas_df.astype(object).where(pandas_df.notna(), None),
+        view_df.astype(object).where(view_df.notna(), None),
+        check_dtype=False,
+        obj="game_wide",
+    )
+
+
+def run_benchmark(
+    seasons: Optional[Iterable[int]] = None,
+    repeats: int = 3,
+    compact_dtypes: bool = True,
+) -> pd.DataFrame:
+    """
+    Loads the same data through the pandas join and through the cfb.game_wide view, uncached,
+    checks that both give the same frame, and times each.
+
+    Args:
+        seasons (Optional[Iterable[int]], optional): Seasons to load. Defaults to all.
+        repeats (int, optional): Loads per path, the fastest is kept. Defaults to 3.
+        compact_dtypes (bool, optional): Whether to cast reads to the dtypes derived from the DDL. Defaults to True.
+
+    Returns:
+        pd.DataFrame: Rows, columns, and fastest seconds per path, and the view's speedup.
+    """
+    load_kwargs = {} if seasons is None else {"seasons": list(seasons)}
+    results, frames = {}, {}
+    for path, use_view in [("pandas", False), ("view", True)]:
+        data_prep = DataPrep(
+            use_cache=False, compact_dtypes=compact_dtypes, use_view=use_view
+        )
+        seconds = []
+        for _ in range(max(1, repeats)):
+            start_time = time.perf_counter()
+            frames[path] = data_prep.get_data(**load_kwargs)
+            seconds.append(time.perf_counter() - start_time)
+        results[path] = {
+            "rows": len(frames[path]),
+            "columns": frames[path].shape[1],
+            "seconds": min(seconds),
+        }
+    _assert_same(frames["pandas"], frames["view"])
+    print("The view matches the pandas join.")
+    results = pd.DataFrame(results).T
+    results["speedup"] = results.loc["pandas", "seconds"] / results["seconds"]
+    return results.round(3)
+
+
+if __name__ == "__main__":
+    # python src/cfb/data/game_wide_benchmark.py --seasons 2022 2023 --repeats 3
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--seasons", type=int, nargs="*", default=None, help="Seasons to load."
+    )
+    parser.add_argument(
+        "--repeats", type=int, default=3, help="Loads per path, the fastest is kept."
+    )
+    parser.add_argument(
+        "--no_compact",
+        action="store_true",
+        help="Compare the frames as read, without the compact dtypes.",
+    )
+    args = parser.parse_args()
+    print(run_benchmark(args.seasons, args.repeats, not args.no_compact))
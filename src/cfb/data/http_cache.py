@@ -0,0 +1,379 @@
+import argparse
+import datetime as dt
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Callable, Optional
+from urllib.parse import parse_qs, urlparse
+
+import cfbd
+from cfbd.rest import ApiException
+
+# Seconds a response stays fresh, by longest matching endpoint prefix
+DEFAULT_ENDPOINT_TTLS = {
+    "/venues": 30 * 86400,
+    "/calendar": 86400,
+    "/games": 3600,
+    "/games/teams": 3600,
+    "/lines": 3600,
+    "/plays": 3600,
+    "/stats/game/advanced": 3600,
+}
+# Defaults for the optional `http_cache` section of config.yaml
+DEFAULT_HTTP_CACHE_CONFIG = {
+    "enabled": True,
+    "max_mb": 2048,
+    "default_ttl": 86400,
+    "past_season_ttl": 30 * 86400,
+    "ttls": {},
+}
+# Response headers kept with each entry
+CACHED_HEADERS = ["content-type", "etag", "last-modified"]
+
+_shared_cache = None
+_shared_cache_lock = threading.Lock()
+
+
+class CachedResponse:
+    """Stored response, read by cfbd.ApiClient the same way as a RESTResponse."""
+
+    def __init__(self, status: int, reason: str, data: bytes, headers: dict):
+        """
+        Initializes the response.
+
+        Args:
+            status (int): HTTP status.
+            reason (str): HTTP reason.
+            data (bytes): Response body.
+            headers (dict): Response headers, keyed in lower case.
+        """
+        self.status = status
+        self.reason = reason
+        self.data = data
+        self.headers = headers
+
+    def getheaders(self) -> dict:
+        """Returns a dictionary of the response headers."""
+        return self.headers
+
+    def getheader(self, name: str, default: Optional[str] = None) -> Optional[str]:
+        """Returns a given response header."""
+        return self.headers.get(name.lower(), default)
+
+
+class ResponseCache:
+    """
+    On-disk store of API responses, keyed by method and URL, i.e. endpoint plus query parameters.
+    Each entry is a body file and a metadata file. Entries expire per endpoint, responses for past
+    seasons live longer, and the least recently used entries are evicted past a size limit.
+    """
+
+    def __init__(
+        self,
+        root: str = None,
+        max_mb: float = 2048,
+        default_ttl: float = 86400,
+        past_season_ttl: float = 30 * 86400,
+        ttls: Optional[dict[str, float]] = None,
+    ):
+        """
+        Initializes the cache directory and measures its size.
+
+        Args:
+            root (str, optional): Directory of the cache. Defaults to src/cfb/data/http_cache.
+            max_mb (float, optional): Most megabytes of bodies kept. Defaults to 2048.
+            default_ttl (float, optional): Seconds fresh for endpoints without a TTL. Defaults to a day.
+            past_season_ttl (float, optional): Seconds fresh for requests of a finished season. Defaults to 30 days.
+            ttls (Optional[dict[str, float]], optional): Seconds fresh by endpoint, over DEFAULT_ENDPOINT_TTLS. Defaults to None.
+        """
+        project_root = os.getenv("PROJECT_ROOT", os.getcwd())
+        self.root = root or os.path.join(project_root, "src/cfb/data/http_cache")
+        self.max_bytes = int(max_mb * 1024**2)
+        self.default_ttl = default_ttl
+        self.past_season_ttl = past_season_ttl
+        self.ttls = {**DEFAULT_ENDPOINT_TTLS, **(ttls or {})}
+        self.stats = {"hits": 0, "misses": 0, "revalidated": 0, "evicted": 0}
+        self.lock = threading.Lock()
+        os.makedirs(self.root, exist_ok=True)
+        self.size = sum(size for _, _, size in self._bodies())
+
+    def _paths(self, key: str) -> tuple[str, str]:
+        """
+        Paths of an entry's metadata and body.
+
+        Args:
+            key (str): Entry key.
+
+        Returns:
+            tuple[str, str]: Metadata and body paths.
+        """
+        return (
+            os.path.join(self.root, f"{key}.json"),
+            os.path.join(self.root, f"{key}.body"),
+        )
+
+    def _bodies(self) -> list[tuple[str, float, int]]:
+        """
+        Lists the stored bodies.
+
+        Returns:
+            list[tuple[str, float, int]]: Key, last use, and bytes of each body.
+        """
+        bodies = []
+        for entry in os.scandir(self.root):
+            if entry.name.endswith(".body"):
+                stat = entry.stat()
+                bodies.append(
+                    (entry.name[: -len(".body")], stat.st_mtime, stat.st_size)
+                )
+        return bodies
+
+    def key(self, method: str, url: str) -> str:
+        """
+        Key of a request.
+
+        Args:
+            method (str): HTTP method.
+            url (str): Full URL, including the query string.
+
+        Returns:
+            str: SHA-256 hex digest.
+        """
+        return hashlib.sha256(f"{method} {url}".encode()).hexdigest()
+
+    def ttl(self, url: str) -> float:
+        """
+        Seconds a response stays fresh. Requests for a season before the one in progress, see
+        cfb_refresh.current_season, no longer change and take past_season_ttl.
+
+        Args:
+            url (str): Full URL, including the query string.
+
+        Returns:
+            float: Seconds fresh.
+        """
+        parsed = urlparse(url)
+        year = parse_qs(parsed.query).get("year", [None])[0]
+        if year is not None and str(year).isdigit():
+            today = dt.date.today()
+            season = today.year if today.month >= 8 else today.year - 1
+            if int(year) < season:
+                return self.past_season_ttl
+        matches = [
+            endpoint
+            for endpoint in self.ttls
+            if parsed.path == endpoint or parsed.path.startswith(f"{endpoint}/")
+        ]
+        if not matches:
+            return self.default_ttl
+        return self.ttls[max(matches, key=len)]
+
+    def get(self, key: str) -> Optional[tuple[dict, bytes]]:
+        """
+        Reads an entry, fresh or not, marking it as recently used.
+
+        Args:
+            key (str): Entry key.
+
+        Returns:
+            Optional[tuple[dict, bytes]]: Metadata and body, None if missing.
+        """
+        meta_path, body_path = self._paths(key)
+        try:
+            with open(meta_path, "r") as file:
+                meta = json.load(file)
+            with open(body_path, "rb") as file:
+                data = file.read()
+            os.utime(body_path)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        return meta, data
+
+    def put(self, key: str, meta: dict, data: Optional[bytes] = None) -> None:
+        """
+        Writes an entry, or only its metadata when revalidated, then evicts past the size limit.
+
+        Args:
+            key (str): Entry key.
+            meta (dict): URL, status, reason, headers, and stored_at of the response.
+            data (Optional[bytes], optional): Response body, None to keep the stored one. Defaults to None.
+        """
+        meta_path, body_path = self._paths(key)
+        if data is not None:
+            previous = os.path.getsize(body_path) if os.path.isfile(body_path) else 0
+            tmp_path = f"{body_path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "wb") as file:
+                file.write(data)
+            os.replace(tmp_path, body_path)
+            with self.lock:
+                self.size += len(data) - previous
+        tmp_path = f"{meta_path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w") as file:
+            json.dump(meta, file)
+        os.replace(tmp_path, meta_path)
+        if self.size > self.max_bytes:
+            self.evict()
+
+    def evict(self) -> None:
+        """Removes the least recently used entries until the cache is back to 90% of its limit."""
+        with self.lock:
+            bodies = sorted(self._bodies(), key=lambda body: body[1])
+            self.size = sum(size for _, _, size in bodies)
+            for key, _, size in bodies:
+                if self.size <= 0.9 * self.max_bytes:
+                    break
+                for path in self._paths(key):
+                    if os.path.isfile(path):
+                        os.remove(path)
+                self.size -= size
+                self.stats["evicted"] += 1
+
+    def clear(self) -> None:
+        """Removes every entry."""
+        with self.lock:
+            for entry in os.scandir(self.root):
+                os.remove(entry.path)
+            self.size = 0
+
+
+class CachingApiClient(cfbd.ApiClient):
+    """
+    cfbd.ApiClient answering GET requests from a ResponseCache. Fresh entries are returned without
+    a request, stale entries are revalidated with If-None-Match or If-Modified-Since when the server
+    sent an ETag or Last-Modified, and anything else goes to the network.
+    """
+
+    # FetchScheduler.call leaves the rate limit to clients taking a token per network request
+    throttles_requests = True
+
+    def __init__(
+        self,
+        configuration: cfbd.Configuration,
+        cache: ResponseCache,
+        rate_limit: Optional[Callable[[], None]] = None,
+    ):
+        """
+        Initializes the client.
+
+        Args:
+            configuration (cfbd.Configuration): API configuration.
+            cache (ResponseCache): Cache of responses.
+            rate_limit (Optional[Callable[[], None]], optional): Blocks until a network request is allowed, i.e. TokenBucket.acquire. Defaults to None.
+        """
+        super().__init__(configuration)
+        self.cache = cache
+        self.rate_limit = rate_limit
+
+    def _network_request(self, *args, **kwargs):
+        """Makes the HTTP request, under the rate limit."""
+        if self.rate_limit is not None:
+            self.rate_limit()
+        return super().request(*args, **kwargs)
+
+    def request(
+        self,
+        method,
+        url,
+        query_params=None,
+        headers=None,
+        post_params=None,
+        body=None,
+        _preload_content=True,
+        _request_timeout=None,
+    ):
+        """Makes the HTTP request, answering GET requests from the cache where fresh."""
+        if method != "GET" or not _preload_content:
+            return self._network_request(
+                method,
+                url,
+                query_params=query_params,
+                headers=headers,
+                post_params=post_params,
+                body=body,
+                _preload_content=_preload_content,
+                _request_timeout=_request_timeout,
+            )
+
+        key = self.cache.key(method, url)
+        cached = self.cache.get(key)
+        headers = dict(headers or {})
+        if cached is not None:
+            meta, data = cached
+            response = CachedResponse(
+                meta["status"], meta["reason"], data, meta["headers"]
+            )
+            if time.time() - meta["stored_at"] < self.cache.ttl(url):
+                self.cache.stats["hits"] += 1
+                return response
+            if meta["headers"].get("etag"):
+                headers["If-None-Match"] = meta["headers"]["etag"]
+            if meta["headers"].get("last-modified"):
+                headers["If-Modified-Since"] = meta["headers"]["last-modified"]
+
+        try:
+            response = self._network_request(
+                method,
+                url,
+                query_params=query_params,
+                headers=headers,
+                post_params=post_params,
+                body=body,
+                _preload_content=_preload_content,
+                _request_timeout=_request_timeout,
+            )
+        except ApiException as e:
+            if e.status != 304 or cached is None:
+                raise
+            self.cache.stats["revalidated"] += 1
+            self.cache.put(key, {**meta, "stored_at": time.time()})
+            return CachedResponse(meta["status"], meta["reason"], data, meta["headers"])
+
+        self.cache.stats["misses"] += 1
+        if response.status == 200:
+            response_headers = {
+                name: response.getheader(name)
+                for name in CACHED_HEADERS
+                if response.getheader(name) is not None
+            }
+            meta = {
+                "url": url,
+                "status": response.status,
+                "reason": response.reason,
+                "headers": response_headers,
+                "stored_at": time.time(),
+            }
+            self.cache.put(key, meta, response.data)
+        return response
+
+
+def get_shared_cache(**cache_config) -> ResponseCache:
+    """
+    Returns the process-wide response cache, creating it on first use, so loaders share one size
+    limit.
+
+    Args:
+        **cache_config: ResponseCache arguments, only used on first use.
+
+    Returns:
+        ResponseCache: Shared cache.
+    """
+    global _shared_cache
+    with _shared_cache_lock:
+        if _shared_cache is None:
+            _shared_cache = ResponseCache(**cache_config)
+        return _shared_cache
+
+
+if __name__ == "__main__":
+    # python src/cfb/data/http_cache.py --clear
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--clear", action="store_true", help="Remove every entry.")
+    args = parser.parse_args()
+    cache = ResponseCache()
+    if args.clear:
+        cache.clear()
+    print(
+        f"{len(cache._bodies())} responses, {cache.size / 1024**2:.1f} MB in {cache.root}."
+    )
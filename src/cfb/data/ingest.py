@@ -0,0 +1,342 @@
+import argparse
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Optional
+
+import pandas as pd
+from cfb_advanced_game_stats import CFBAdvancedGameStats
+from cfb_game_data import CFBGameData
+from cfb_game_team_data import CFBGameTeamData
+from cfb_line_data import CFBLineData
+from cfb_play_by_play_data import CFBPlayByPlayData
+from cfb_venue_data import CFBVenueData
+from raw_store import RAW_DATASETS, RawStore
+from schema import make_schemas_tables, schema_script_paths
+
+from db_utils import execute_sql_script, get_connection, pull_from_db
+
+# Ingest DAG, each node with the nodes it depends on, in a valid run order
+INGEST_NODES = {
+    "schema": [],
+    "venues": ["schema"],
+    "games": ["venues"],
+    "lines": ["games"],
+    "game_team_stats": ["games"],
+    "advanced_game_stats": ["games"],
+    "play_by_play": ["games"],
+    "patches": ["lines", "game_team_stats", "advanced_game_stats", "play_by_play"],
+}
+# Loader and upload method of each node loading seasons of a raw dataset
+NODE_LOADERS = {
+    "games": (CFBGameData, "upload_games_to_db"),
+    "lines": (CFBLineData, "upload_lines_to_db"),
+    "game_team_stats": (CFBGameTeamData, "upload_game_team_stats_to_db"),
+    "advanced_game_stats": (CFBAdvancedGameStats, "upload_advanced_game_stats_to_db"),
+    "play_by_play": (CFBPlayByPlayData, "upload_play_by_play_to_db"),
+}
+
+
+def _patch_paths(project_root: str) -> list[str]:
+    """
+    Lists the manual data patches, in name order.
+
+    Args:
+        project_root (str): Root of the project.
+
+    Returns:
+        list[str]: Paths of the patch scripts.
+    """
+    patches_path = os.path.join(project_root, "src/cfb/data/patches")
+    if not os.path.isdir(patches_path):
+        return []
+    return [
+        os.path.join(patches_path, file)
+        for file in sorted(os.listdir(patches_path))
+        if file.endswith(".sql")
+    ]
+
+
+def _node_runner(node: str, start: int, end: int, project_root: str) -> Callable:
+    """
+    Returns the work of a node.
+
+    Args:
+        node (str): Node of INGEST_NODES.
+        start (int): Start season.
+        end (int): Ending season, not included.
+        project_root (str): Root of the project.
+
+    Returns:
+        Callable: Runs the node.
+    """
+    if node == "schema":
+        return make_schemas_tables
+    if node == "patches":
+        return lambda: [execute_sql_script(path) for path in _patch_paths(project_root)]
+    if node == "venues":
+        return CFBVenueData().upload_venues_to_db
+    loader, method = NODE_LOADERS[node]
+    return lambda: getattr(loader(), method)(start, end)
+
+
+def _missing_partitions(
+    node: str, start: int, end: int, raw_store: RawStore
+) -> list[tuple]:
+    """
+    Lists the raw partitions a node should have fetched but the store lacks, as fetch errors are
+    reported rather than raised and would leave the node's load incomplete.
+
+    Args:
+        node (str): Node of INGEST_NODES.
+        start (int): Start season.
+        end (int): Ending season, not included.
+        raw_store (RawStore): Raw store the loaders read.
+
+    Returns:
+        list[tuple]: Missing (season, week) partitions, with None for unpartitioned keys.
+    """
+    if node not in RAW_DATASETS:
+        return []
+    keys = RAW_DATASETS[node]
+    if not keys:
+        expected = [(None, None)]
+    elif "week" in keys:
+        loader = NODE_LOADERS[node][0]()
+        expected = [
+            (season, week)
+            for season in range(start, end)
+            for week in loader._weeks(season)
+        ]
+    else:
+        expected = [(season, None) for season in range(start, end)]
+    return [
+        (season, week)
+        for season, week in expected
+        if not raw_store.exists(node, season, week)
+    ]
+
+
+def node_checksum(
+    node: str,
+    start: int,
+    end: int,
+    upstream_checksums: dict[str, str],
+    project_root: str,
+    raw_store: RawStore,
+) -> str:
+    """
+    Hashes everything a node's output depends on: the SQL it runs, or the seasons it loads and the
+    raw partitions behind them, plus the checksums of its upstream nodes.
+
+    Args:
+        node (str): Node of INGEST_NODES.
+        start (int): Start season.
+        end (int): Ending season, not included.
+        upstream_checksums (dict[str, str]): Checksums of the node's upstream nodes.
+        project_root (str): Root of the project.
+        raw_store (RawStore): Raw store the loaders read.
+
+    Returns:
+        str: SHA-256 hex digest.
+    """
+    digest = hashlib.sha256(node.encode())
+    if node in ["schema", "patches"]:
+        paths = (
+            schema_script_paths() if node == "schema" else _patch_paths(project_root)
+        )
+        for path in paths:
+            digest.update(os.path.basename(path).encode())
+            with open(path, "rb") as file:
+                digest.update(file.read())
+    else:
+        partitions = raw_store.read_manifest().get(node, {})
+        if RAW_DATASETS[node]:
+            digest.update(f"{start}-{end}".encode())
+            seasons = {f"season={season}" for season in range(start, end)}
+            partitions = {
+                key: entry
+                for key, entry in partitions.items()
+                if key.split("/")[0] in seasons
+            }
+        digest.update(json.dumps(partitions, sort_keys=True).encode())
+    for upstream in sorted(upstream_checksums):
+        digest.update(f"{upstream}:{upstream_checksums[upstream]}".encode())
+    return digest.hexdigest()
+
+
+def _stored_checksums() -> dict[str, str]:
+    """
+    Reads the checksums of the completed nodes.
+
+    Returns:
+        dict[str, str]: Checksum by node.
+    """
+    data = pull_from_db("SELECT node, checksum FROM cfb.ingest_checksums")
+    if data is None:
+        return {}
+    return dict(zip(data["node"], data["checksum"]))
+
+
+def _store_checksum(node: str, checksum: str, seconds: float) -> None:
+    """
+    Records a node as completed with the given inputs.
+
+    Args:
+        node (str): Node of INGEST_NODES.
+        checksum (str): Checksum of the node's inputs.
+        seconds (float): Seconds the node took.
+    """
+    with get_connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute(
+                """
+                INSERT INTO cfb.ingest_checksums (node, checksum, completed_at, seconds)
+                VALUES (%s, %s, now(), %s)
+                ON CONFLICT (node) DO UPDATE
+                SET checksum = EXCLUDED.checksum, completed_at = now(), seconds = EXCLUDED.seconds
+                """,
+                (node, checksum, seconds),
+            )
+
+
+def _with_upstream(nodes: list[str]) -> list[str]:
+    """
+    Adds the upstream nodes of the selected ones, in DAG order.
+
+    Args:
+        nodes (list[str]): Selected nodes.
+
+    Returns:
+        list[str]: Selected nodes and everything they depend on.
+    """
+    selected, stack = set(), list(nodes)
+    while stack:
+        node = stack.pop()
+        if node not in selected:
+            selected.add(node)
+            stack.extend(INGEST_NODES[node])
+    return [node for node in INGEST_NODES if node in selected]
+
+
+def run_ingest(
+    start: int = 2013,
+    end: int = 2025,
+    nodes: Optional[list[str]] = None,
+    max_parallel: int = 4,
+    force: bool = False,
+) -> pd.DataFrame:
+    """
+    Runs the ingest DAG, schema then venues then games, then lines, team stats, advanced stats, and
+    play-by-play in parallel, then patches. Nodes whose inputs match the checksum of their last
+    completed run are skipped, and the nodes downstream of a failure are not run. A node is only
+    recorded as completed once it ran without raising and its raw partitions are all stored.
+
+    Args:
+        start (int, optional): Start season. Defaults to 2013.
+        end (int, optional): Ending season, not included. Defaults to 2025.
+        nodes (Optional[list[str]], optional): Nodes to run, with their upstream nodes. Defaults to all.
+        max_parallel (int, optional): Nodes running at once. Defaults to 4.
+        force (bool, optional): Whether to run nodes even when their checksums match. Defaults to False.
+
+    Returns:
+        pd.DataFrame: Status, seconds, and checksum per node.
+    """
+    project_root = os.getenv("PROJECT_ROOT", os.getcwd())
+    raw_store = RawStore()
+    nodes = _with_upstream(nodes or list(INGEST_NODES))
+    queries_path = os.path.join(project_root, "src/cfb/data/sql_queries")
+    # Checksums are kept in the database, so their table must exist before anything runs
+    for script in ["cfb_schema.sql", "cfb_ingest_checksums.sql"]:
+        execute_sql_script(os.path.join(queries_path, script))
+    stored = _stored_checksums()
+
+    checksums, results = {}, {}
+
+    def run_node(node: str) -> None:
+        upstream = {up: checksums[up] for up in INGEST_NODES[node] if up in checksums}
+        checksum = node_checksum(node, start, end, upstream, project_root, raw_store)
+        if not force and stored.get(node) == checksum:
+            checksums[node] = checksum
+            results[node] = {"status": "skipped", "seconds": 0.0}
+            print(f"Skipping {node}, unchanged since its last run.")
+            return
+        print(f"Running {node}...")
+        start_time = time.time()
+        _node_runner(node, start, end, project_root)()
+        seconds = time.time() - start_time
+        # Runners raise on failed writes and DDL, but fetch errors only leave partitions missing
+        missing = _missing_partitions(node, start, end, raw_store)
+        if missing:
+            raise Exception(
+                f"{len(missing)} raw partitions of {node} are missing, i.e. {missing[:3]}"
+            )
+        # Fetching lands new raw partitions, so hash again once the node is done
+        checksums[node] = node_checksum(
+            node, start, end, upstream, project_root, raw_store
+        )
+        _store_checksum(node, checksums[node], seconds)
+        results[node] = {"status": "ran", "seconds": seconds}
+        print(f"Finished {node} in {seconds:.1f} seconds.")
+
+    start_time = time.time()
+    with ThreadPoolExecutor(max_workers=max_parallel) as executor:
+        running, waiting = {}, list(nodes)
+        while waiting or running:
+            for node in list(waiting):
+                upstream = [up for up in INGEST_NODES[node] if up in nodes]
+                if any(
+                    results.get(up, {}).get("status") in ["failed", "blocked"]
+                    for up in upstream
+                ):
+                    results[node] = {"status": "blocked", "seconds": 0.0}
+                    waiting.remove(node)
+                elif all(up in checksums for up in upstream):
+                    running[executor.submit(run_node, node)] = node
+                    waiting.remove(node)
+            if not running:
+                continue
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                node = running.pop(future)
+                try:
+                    future.result()
+                except Exception as e:
+                    results[node] = {"status": "failed", "seconds": 0.0}
+                    print(f"Failed {node}: {e}")
+
+    summary = pd.DataFrame(
+        [
+            {"node": node, **results[node], "checksum": checksums.get(node, "")[:12]}
+            for node in nodes
+        ]
+    ).set_index("node")
+    print(summary)
+    print(f"Ingest finished in {time.time() - start_time:.1f} seconds.")
+    return summary
+
+
+if __name__ == "__main__":
+    # python src/cfb/data/ingest.py --start 2013 --end 2025
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--start", type=int, default=2013, help="Start season.")
+    parser.add_argument(
+        "--end", type=int, default=2025, help="Ending season, not included."
+    )
+    parser.add_argument(
+        "--nodes",
+        nargs="+",
+        default=None,
+        choices=list(INGEST_NODES),
+        help="Nodes to run, with their upstream nodes. Defaults to all.",
+    )
+    parser.add_argument(
+        "--max_parallel", type=int, default=4, help="Nodes running at once."
+    )
+    parser.add_argument(
+        "--force", action="store_true", help="Run nodes even when unchanged."
+    )
+    args = parser.parse_args()
+    run_ingest(args.start, args.end, args.nodes, args.max_parallel, args.force)
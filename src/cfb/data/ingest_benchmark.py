@@ -0,0 +1,407 @@
+import argparse
+import datetime as dt
+import glob
+import json
+import os
+import shutil
+import subprocess
+import time
+import tracemalloc
+from typing import Callable, Optional
+
+import pandas as pd
+from cfb_advanced_game_stats import CFBAdvancedGameStats
+from cfb_game_data import CFBGameData
+from cfb_game_team_data import CFBGameTeamData
+from cfb_line_data import CFBLineData
+from cfb_play_by_play_data import CFBPlayByPlayData
+from cfb_venue_data import CFBVenueData
+from raw_store import RawStore, to_raw_table
+from schema import make_schemas_tables
+from synthetic_cfbd import (
+    synthetic_advanced_game_stats,
+    synthetic_betting_games,
+    synthetic_game_team_stats,
+    synthetic_games,
+    synthetic_plays,
+    synthetic_venues,
+)
+
+from db_utils import copy_data_to_db, get_connection
+
+# Scratch schema the uploads are timed against, cloned from cfb without foreign keys
+BENCHMARK_SCHEMA = "cfb_benchmark"
+# Loaded table per raw dataset
+BENCHMARK_TABLES = {
+    "venues": "venues",
+    "games": "games",
+    "lines": "lines",
+    "advanced_game_stats": "advanced_game_stats",
+    "game_team_stats": "game_team_stats",
+    "play_by_play": "play_by_play",
+}
+# Slowdown, as a share of the baseline's rows per second, reported as a regression
+REGRESSION_TOLERANCE = 0.1
+
+
+def _git_commit() -> Optional[str]:
+    """Returns the commit being benchmarked, None outside a git checkout."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _measure(fnc: Callable, trace_memory: bool) -> tuple[float, float, object]:
+    """
+    Times one call, tracing its peak Python and NumPy allocations.
+
+    Args:
+        fnc (Callable): Call to measure.
+        trace_memory (bool): Whether to trace allocations, which slows Python-heavy steps.
+
+    Returns:
+        tuple[float, float, object]: Seconds, peak megabytes allocated, and the result.
+    """
+    if trace_memory:
+        tracemalloc.start()
+    start_time = time.perf_counter()
+    result = fnc()
+    seconds = time.perf_counter() - start_time
+    peak_mb = 0.0
+    if trace_memory:
+        peak_mb = tracemalloc.get_traced_memory()[1] / 1024**2
+        tracemalloc.stop()
+    return seconds, peak_mb, result
+
+
+def _make_benchmark_tables() -> None:
+    """Creates empty copies of the loaded tables in BENCHMARK_SCHEMA."""
+    make_schemas_tables()
+    with get_connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute(f"DROP SCHEMA IF EXISTS {BENCHMARK_SCHEMA} CASCADE")
+            cursor.execute(f"CREATE SCHEMA {BENCHMARK_SCHEMA}")
+            for table in BENCHMARK_TABLES.values():
+                cursor.execute(
+                    f"CREATE TABLE {BENCHMARK_SCHEMA}.{table} (LIKE cfb.{table} INCLUDING ALL)"
+                )
+
+
+def _drop_benchmark_tables() -> None:
+    """Drops BENCHMARK_SCHEMA."""
+    with get_connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute(f"DROP SCHEMA IF EXISTS {BENCHMARK_SCHEMA} CASCADE")
+
+
+def _store_synthetic_data(
+    store: RawStore,
+    seasons: list[int],
+    games: int,
+    plays_per_game: int,
+    weeks: dict[int, list[int]],
+) -> dict[str, float]:
+    """
+    Generates synthetic API objects and writes them to the raw store, as fetching would.
+
+    Args:
+        store (RawStore): Raw store of the benchmark.
+        seasons (list[int]): Seasons to generate.
+        games (int): Games per season.
+        plays_per_game (int): Plays per game.
+        weeks (dict[int, list[int]]): Weeks per season, as the loaders read them.
+
+    Returns:
+        dict[str, float]: Seconds writing the raw store, by dataset.
+    """
+    store_s = dict.fromkeys(BENCHMARK_TABLES, 0.0)
+
+    def write(dataset: str, records: list, **partition) -> None:
+        start_time = time.perf_counter()
+        store.write(dataset, to_raw_table(dataset, records), **partition)
+        store_s[dataset] += time.perf_counter() - start_time
+
+    write("venues", synthetic_venues(800))
+    for season in seasons:
+        print(f"Generating synthetic {season} season...")
+        write("games", synthetic_games(season, games, seed=season), season=season)
+        write(
+            "lines",
+            synthetic_betting_games(season, games, seed=season),
+            season=season,
+        )
+        write(
+            "advanced_game_stats",
+            synthetic_advanced_game_stats(season, 2 * games, seed=season),
+            season=season,
+        )
+        games_per_week = -(-games // len(weeks[season]))
+        for week in weeks[season]:
+            game_team_stats = synthetic_game_team_stats(
+                season, games_per_week, seed=week
+            )
+            # Game ids are unique within a call, so offset them by week
+            for i, record in enumerate(game_team_stats):
+                record.id = season * 10000 + (week - 1) * games_per_week + i
+            write("game_team_stats", game_team_stats, season=season, week=week)
+            write(
+                "play_by_play",
+                synthetic_plays(
+                    season, week, games_per_week * plays_per_game, seed=week
+                ),
+                season=season,
+                week=week,
+            )
+    return store_s
+
+
+def run_benchmark(
+    seasons: int = 2,
+    games: int = 800,
+    plays_per_game: int = 180,
+    batch_size: int = 50_000,
+    trace_memory: bool = True,
+    results_path: str = None,
+) -> pd.DataFrame:
+    """
+    Times the ingest of synthetic seasons, from API objects to the raw store, then each loader's
+    load_*_from_raw_* and the COPY into scratch copies of its table, against the database in the
+    config. Results are saved as JSON for compare_results.
+
+    Args:
+        seasons (int, optional): Seasons to generate, i.e. 20 for a full history. Defaults to 2.
+        games (int, optional): Games per season. Defaults to 800.
+        plays_per_game (int, optional): Plays per game. Defaults to 180.
+        batch_size (int, optional): Plays per batch of the streamed play-by-play upload. Defaults to 50,000.
+        trace_memory (bool, optional): Whether to trace peak allocations, slowing Python-heavy steps. Defaults to True.
+        results_path (str, optional): Directory of the results. Defaults to src/cfb/data/benchmark_results.
+
+    Returns:
+        pd.DataFrame: Per loader, rows loaded and merged, seconds storing, loading, and uploading,
+            rows per second, and peak megabytes allocated.
+    """
+    project_root = os.getenv("PROJECT_ROOT", os.getcwd())
+    results_path = results_path or os.path.join(
+        project_root, "src/cfb/data/benchmark_results"
+    )
+    os.makedirs(results_path, exist_ok=True)
+    store_root = os.path.join(results_path, "raw")
+    shutil.rmtree(store_root, ignore_errors=True)
+    store = RawStore(store_root)
+
+    loaders = {
+        "venues": CFBVenueData(),
+        "games": CFBGameData(),
+        "lines": CFBLineData(),
+        "advanced_game_stats": CFBAdvancedGameStats(),
+        "game_team_stats": CFBGameTeamData(),
+        "play_by_play": CFBPlayByPlayData(),
+    }
+    for loader in loaders.values():
+        loader.raw_store = store
+    years = list(range(2025 - seasons, 2025))
+    pbp_weeks = {year: loaders["play_by_play"]._weeks(year) for year in years}
+    gts_weeks = {year: loaders["game_team_stats"]._weeks(year) for year in years}
+    assert pbp_weeks == gts_weeks, "Play-by-play and box score weeks differ"
+    store_s = _store_synthetic_data(store, years, games, plays_per_game, pbp_weeks)
+    year_weeks = [(year, week) for year in years for week in pbp_weeks[year]]
+
+    cases = {
+        "venues": lambda: (loaders["venues"].load_venues_from_raw() for _ in [None]),
+        "games": lambda: (
+            loaders["games"].load_games_from_raw_at_year(year) for year in years
+        ),
+        "lines": lambda: (
+            loaders["lines"].load_lines_from_raw_at_year(year) for year in years
+        ),
+        "advanced_game_stats": lambda: (
+            loaders["advanced_game_stats"].load_advanced_game_stats_from_raw_at_year(
+                year
+            )
+            for year in years
+        ),
+        "game_team_stats": lambda: (
+            loaders["game_team_stats"].load_game_team_stats_from_raw_at_year(year)
+            for year in years
+        ),
+        "play_by_play": lambda: (
+            loaders["play_by_play"].load_play_by_play_from_raw_at_year_week(year, week)
+            for year, week in year_weeks
+        ),
+    }
+
+    _make_benchmark_tables()
+    results = {}
+    try:
+        for dataset, load_partitions in cases.items():
+            print(f"Benchmarking {dataset}...")
+            table = f"{BENCHMARK_SCHEMA}.{BENCHMARK_TABLES[dataset]}"
+            timings = {"rows": 0, "merged": 0, "load_s": 0.0, "upload_s": 0.0}
+
+            def load_and_upload() -> None:
+                partitions = iter(load_partitions())
+                while True:
+                    start_time = time.perf_counter()
+                    data = next(partitions, None)
+                    timings["load_s"] += time.perf_counter() - start_time
+                    if data is None:
+                        break
+                    start_time = time.perf_counter()
+                    timings["rows"] += len(data)
+                    timings["merged"] += copy_data_to_db(table, data)
+                    timings["upload_s"] += time.perf_counter() - start_time
+
+            seconds, peak_mb, _ = _measure(load_and_upload, trace_memory)
+            results[dataset] = {
+                **timings,
+                "store_s": store_s[dataset],
+                "total_s": seconds,
+                "rows_per_s": timings["rows"] / max(seconds, 1e-9),
+                "peak_mb": peak_mb,
+            }
+
+        print("Benchmarking play_by_play (stream)...")
+        table = f"{BENCHMARK_SCHEMA}.play_by_play"
+        with get_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute(f"TRUNCATE {table}")
+        seconds, peak_mb, (rows, _) = _measure(
+            lambda: loaders["play_by_play"].stream_play_by_play_to_db(
+                year_weeks, batch_size=batch_size, table=table
+            ),
+            trace_memory,
+        )
+        results["play_by_play (stream)"] = {
+            "rows": rows,
+            "merged": rows,
+            "load_s": None,
+            "upload_s": None,
+            "store_s": store_s["play_by_play"],
+            "total_s": seconds,
+            "rows_per_s": rows / max(seconds, 1e-9),
+            "peak_mb": peak_mb,
+        }
+    finally:
+        _drop_benchmark_tables()
+        shutil.rmtree(store_root, ignore_errors=True)
+
+    summary = pd.DataFrame(results).T
+    run = {
+        "run_at": dt.datetime.now().isoformat(timespec="seconds"),
+        "commit": _git_commit(),
+        "params": {
+            "seasons": seasons,
+            "games": games,
+            "plays_per_game": plays_per_game,
+            "batch_size": batch_size,
+            "trace_memory": trace_memory,
+        },
+        "results": results,
+    }
+    file_name = f"ingest_{dt.datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    path = os.path.join(results_path, file_name)
+    with open(path, "w") as file:
+        json.dump(run, file, indent=2)
+    print(f"Saved results to {path}.")
+    return summary
+
+
+def compare_results(current_path: str, baseline_path: str) -> pd.DataFrame:
+    """
+    Compares two benchmark runs, flagging loaders whose rows per second fell by more than
+    REGRESSION_TOLERANCE. Runs should share their params.
+
+    Args:
+        current_path (str): Results of the run of interest.
+        baseline_path (str): Results of the run compared against.
+
+    Returns:
+        pd.DataFrame: Per loader, rows per second and peak megabytes of both runs, their ratios, and
+            whether it regressed.
+    """
+    with open(current_path, "r") as file:
+        current = json.load(file)
+    with open(baseline_path, "r") as file:
+        baseline = json.load(file)
+    if current["params"] != baseline["params"]:
+        print(f"Runs differ in params: {current['params']} vs {baseline['params']}")
+
+    current_df = pd.DataFrame(current["results"]).T
+    baseline_df = pd.DataFrame(baseline["results"]).T
+    comparison = pd.DataFrame(
+        {
+            "rows_per_s": current_df["rows_per_s"],
+            "baseline_rows_per_s": baseline_df["rows_per_s"],
+            "peak_mb": current_df["peak_mb"],
+            "baseline_peak_mb": baseline_df["peak_mb"],
+        }
+    ).astype(float)
+    comparison["speed_ratio"] = (
+        comparison["rows_per_s"] / comparison["baseline_rows_per_s"]
+    )
+    comparison["memory_ratio"] = comparison["peak_mb"] / comparison[
+        "baseline_peak_mb"
+    ].clip(lower=1e-9)
+    comparison["regressed"] = comparison["speed_ratio"] < 1 - REGRESSION_TOLERANCE
+    print(
+        f"{current.get('commit')} against {baseline.get('commit')}, "
+        f"{int(comparison['regressed'].sum())} regressions."
+    )
+    return comparison.round(3)
+
+
+if __name__ == "__main__":
+    # python src/cfb/data/ingest_benchmark.py --seasons 20 --games 800 --plays_per_game 180 --compare
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seasons", type=int, default=2, help="Seasons to generate.")
+    parser.add_argument("--games", type=int, default=800, help="Games per season.")
+    parser.add_argument(
+        "--plays_per_game", type=int, default=180, help="Plays per game."
+    )
+    parser.add_argument(
+        "--batch_size",
+        type=int,
+        default=50_000,
+        help="Plays per batch of the streamed upload.",
+    )
+    parser.add_argument(
+        "--no_memory",
+        action="store_true",
+        help="Skip tracing peak allocations, for cleaner timings.",
+    )
+    parser.add_argument(
+        "--compare",
+        nargs="?",
+        const="latest",
+        default=None,
+        help="Compare against a results file, by default the previous run.",
+    )
+    args = parser.parse_args()
+    project_root = os.getenv("PROJECT_ROOT", os.getcwd())
+    results_path = os.path.join(project_root, "src/cfb/data/benchmark_results")
+    previous = sorted(glob.glob(os.path.join(results_path, "ingest_*.json")))
+    print(
+        run_benchmark(
+            args.seasons,
+            args.games,
+            args.plays_per_game,
+            args.batch_size,
+            not args.no_memory,
+        )
+    )
+    if args.compare is not None:
+        baseline_path = args.compare
+        if baseline_path == "latest":
+            assert previous, f"No previous results in {results_path}"
+            baseline_path = previous[-1]
+        current_path = sorted(glob.glob(os.path.join(results_path, "ingest_*.json")))[
+            -1
+        ]
+        print(compare_results(current_path, baseline_path))
@@ -0,0 +1,393 @@
+import argparse
+import datetime as dt
+import glob
+import json
+import os
+import pickle as pkl
+import re
+import threading
+from typing import Any, Iterable, Iterator, Optional
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+from cfbd_records import game_team_stat_rows, records_to_arrow
+
+# Partition keys of each raw dataset, matching how the API is fetched
+RAW_DATASETS = {
+    "venues": [],
+    "games": ["season"],
+    "lines": ["season"],
+    "advanced_game_stats": ["season"],
+    "game_team_stats": ["season", "week"],
+    "play_by_play": ["season", "week"],
+}
+# File names of the former pkl_files, for migrating them
+LEGACY_PKL_PATTERNS = {
+    "venues": r"venues\.pkl",
+    "games": r"games_(\d+)\.pkl",
+    "lines": r"lines_(\d+)\.pkl",
+    "advanced_game_stats": r"advanced_game_(\d+)\.pkl",
+    "game_team_stats": r"game_team_(\d+)_(\d+)\.pkl",
+    "play_by_play": r"play_by_play_(\d+)_(\d+)\.pkl",
+}
+
+_manifest_lock = threading.Lock()
+
+
+def to_raw_table(dataset: str, records: list[Any]) -> pa.Table:
+    """
+    Flattens API records into the columnar shape stored for a dataset.
+
+    Args:
+        dataset (str): Raw dataset, a key of RAW_DATASETS.
+        records (list[Any]): cfbd model objects as returned by the API.
+
+    Returns:
+        pa.Table: Flat table of the records.
+    """
+    if dataset == "game_team_stats":
+        return pa.Table.from_pylist(game_team_stat_rows(records))
+    if dataset == "lines":
+        return records_to_arrow(records, explode="lines")
+    if dataset in ["games", "venues"]:
+        return records_to_arrow(records, by_alias=True)
+    return records_to_arrow(records)
+
+
+class RawStore:
+    """
+    Landing zone of raw API responses, stored as Parquet files partitioned by dataset, season, and
+    week, i.e. raw/play_by_play/season=2024/week=3/data.parquet. A manifest records every partition
+    written, so reads only open the partitions and columns asked for.
+    """
+
+    def __init__(self, root: str = None):
+        """
+        Initializes the store directory.
+
+        Args:
+            root (str, optional): Directory of the store. Defaults to src/cfb/data/raw.
+        """
+        self.project_root = os.getenv("PROJECT_ROOT", os.getcwd())
+        self.root = root or os.path.join(self.project_root, "src/cfb/data/raw")
+        self.manifest_path = os.path.join(self.root, "manifest.json")
+
+    def _partition_key(
+        self, dataset: str, season: Optional[int] = None, week: Optional[int] = None
+    ) -> str:
+        """
+        Relative directory of a partition, i.e. "season=2024/week=3".
+
+        Args:
+            dataset (str): Raw dataset.
+            season (Optional[int], optional): Season of the partition. Defaults to None.
+            week (Optional[int], optional): Week of the partition. Defaults to None.
+
+        Returns:
+            str: Partition directory, relative to the dataset.
+        """
+        assert dataset in RAW_DATASETS, f"Pick dataset in {list(RAW_DATASETS)}"
+        values = {"season": season, "week": week}
+        keys = RAW_DATASETS[dataset]
+        assert all(
+            values[key] is not None for key in keys
+        ), f"{dataset} is partitioned by {keys}"
+        return "/".join(f"{key}={int(values[key])}" for key in keys)
+
+    def read_manifest(self) -> dict:
+        """
+        Reads the manifest of written partitions.
+
+        Returns:
+            dict: Partition metadata, by dataset and partition key.
+        """
+        if not os.path.isfile(self.manifest_path):
+            return {}
+        with open(self.manifest_path, "r") as file:
+            return json.load(file)
+
+    def exists(
+        self, dataset: str, season: Optional[int] = None, week: Optional[int] = None
+    ) -> bool:
+        """
+        Checks whether a partition has been written.
+
+        Args:
+            dataset (str): Raw dataset.
+            season (Optional[int], optional): Season of the partition. Defaults to None.
+            week (Optional[int], optional): Week of the partition. Defaults to None.
+
+        Returns:
+            bool: Whether the partition exists.
+        """
+        key = self._partition_key(dataset, season, week)
+        return key in self.read_manifest().get(dataset, {})
+
+    def write(
+        self,
+        dataset: str,
+        table: pa.Table,
+        season: Optional[int] = None,
+        week: Optional[int] = None,
+        source: str = "api",
+    ) -> str:
+        """
+        Writes one partition, replacing it if present, and records it in the manifest.
+
+        Args:
+            dataset (str): Raw dataset.
+            table (pa.Table): Flat records, see to_raw_table.
+            season (Optional[int], optional): Season of the partition. Defaults to None.
+            week (Optional[int], optional): Week of the partition. Defaults to None.
+            source (str, optional): Where the records came from, i.e. "api" or a migrated pkl. Defaults to "api".
+
+        Returns:
+            str: Path of the Parquet file.
+        """
+        key = self._partition_key(dataset, season, week)
+        path = os.path.join(self.root, dataset, key, "data.parquet")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        pq.write_table(table, tmp_path)
+        os.replace(tmp_path, path)
+
+        with _manifest_lock:
+            manifest = self.read_manifest()
+            manifest.setdefault(dataset, {})[key] = {
+                "path": os.path.relpath(path, self.root),
+                "rows": table.num_rows,
+                "columns": table.column_names,
+                "bytes": os.path.getsize(path),
+                "source": source,
+                "written_at": dt.datetime.now().isoformat(timespec="seconds"),
+            }
+            tmp_manifest = f"{self.manifest_path}.tmp"
+            with open(tmp_manifest, "w") as file:
+                json.dump(manifest, file, indent=2, sort_keys=True)
+            os.replace(tmp_manifest, self.manifest_path)
+        print(f"Successfully stored {table.num_rows} rows to {path}.")
+        return path
+
+    def replace_weeks(
+        self,
+        dataset: str,
+        table: pa.Table,
+        season: int,
+        weeks: Iterable[int],
+        source: str = "api",
+    ) -> str:
+        """
+        Replaces the rows of some weeks within a season partition, keeping the other weeks, i.e. to
+        refresh the trailing weeks of a season-partitioned dataset in-season.
+
+        Args:
+            dataset (str): Raw dataset, partitioned by season only.
+            table (pa.Table): Flat records of the refreshed weeks, see to_raw_table.
+            season (int): Season of the partition.
+            weeks (Iterable[int]): Weeks being replaced.
+            source (str, optional): Where the records came from. Defaults to "api".
+
+        Returns:
+            str: Path of the Parquet file.
+        """
+        assert RAW_DATASETS[dataset] == ["season"], f"{dataset} is not by season only"
+        if self.exists(dataset, season):
+            path = os.path.join(
+                self.root, dataset, self._partition_key(dataset, season)
+            )
+            existing = pq.read_table(os.path.join(path, "data.parquet"))
+            if existing.num_rows:
+                kept = existing.filter(
+                    pc.invert(pc.is_in(existing["week"], pa.array(sorted(weeks))))
+                )
+                table = pa.concat_tables([kept, table], promote_options="permissive")
+        return self.write(dataset, table, season=season, source=source)
+
+    def _select_partitions(
+        self,
+        dataset: str,
+        seasons: Optional[Iterable[int]] = None,
+        weeks: Optional[Iterable[int]] = None,
+    ) -> list[str]:
+        """
+        Paths of the partitions of a dataset within some seasons and weeks, in season and week order.
+
+        Args:
+            dataset (str): Raw dataset.
+            seasons (Optional[Iterable[int]], optional): Seasons to keep. Defaults to all.
+            weeks (Optional[Iterable[int]], optional): Weeks to keep, for datasets partitioned by week. Defaults to all.
+
+        Returns:
+            list[str]: Paths of the Parquet files.
+        """
+        seasons = None if seasons is None else {int(season) for season in seasons}
+        weeks = None if weeks is None else {int(week) for week in weeks}
+        manifest = self.read_manifest().get(dataset, {})
+        partitions = {
+            key: {k: int(v) for k, v in (part.split("=") for part in key.split("/"))}
+            for key in manifest
+            if key
+        }
+        if "" in manifest:
+            partitions[""] = {}
+        paths = []
+        for key, values in sorted(
+            partitions.items(), key=lambda item: tuple(item[1].values())
+        ):
+            if seasons is not None and values.get("season", -1) not in seasons:
+                continue
+            if weeks is not None and "week" in values and values["week"] not in weeks:
+                continue
+            paths.append(os.path.join(self.root, manifest[key]["path"]))
+        return paths
+
+    def _week_filter(
+        self, dataset: str, table: pa.Table, weeks: Optional[Iterable[int]]
+    ) -> pa.Table:
+        """
+        Keeps the rows of some weeks, for datasets partitioned by season only.
+
+        Args:
+            dataset (str): Raw dataset.
+            table (pa.Table): Rows of a partition, or a batch of them.
+            weeks (Optional[Iterable[int]]): Weeks to keep. Defaults to all.
+
+        Returns:
+            pa.Table: Rows within the weeks.
+        """
+        if (
+            weeks is not None
+            and "week" not in RAW_DATASETS[dataset]
+            and "week" in table.column_names
+        ):
+            weeks = pa.array(sorted(int(week) for week in weeks))
+            table = table.filter(pc.is_in(table["week"], weeks))
+        return table
+
+    def read(
+        self,
+        dataset: str,
+        columns: Optional[list[str]] = None,
+        seasons: Optional[Iterable[int]] = None,
+        weeks: Optional[Iterable[int]] = None,
+    ) -> pd.DataFrame:
+        """
+        Reads selected columns of selected partitions. Only those partitions are opened, and only
+        those columns are decoded.
+
+        Args:
+            dataset (str): Raw dataset.
+            columns (Optional[list[str]], optional): Columns to read, missing ones are filled with nulls. Defaults to all.
+            seasons (Optional[Iterable[int]], optional): Seasons to read. Defaults to all.
+            weeks (Optional[Iterable[int]], optional): Weeks to read, by partition or by week column. Defaults to all.
+
+        Returns:
+            pd.DataFrame: Raw records.
+        """
+        frames = []
+        for path in self._select_partitions(dataset, seasons, weeks):
+            read_columns = None
+            if columns is not None:
+                available = pq.ParquetFile(path).schema_arrow.names
+                read_columns = [col for col in columns if col in available]
+            table = pq.read_table(path, columns=read_columns)
+            frames.append(self._week_filter(dataset, table, weeks).to_pandas())
+
+        df = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+        if columns is not None:
+            df = df.reindex(columns=columns)
+        return df
+
+    def iter_batches(
+        self,
+        dataset: str,
+        columns: Optional[list[str]] = None,
+        seasons: Optional[Iterable[int]] = None,
+        weeks: Optional[Iterable[int]] = None,
+        batch_size: int = 50_000,
+    ) -> Iterator[pa.RecordBatch]:
+        """
+        Streams selected columns of selected partitions in record batches of at most batch_size
+        rows, holding one batch in memory at a time rather than whole partitions.
+
+        Args:
+            dataset (str): Raw dataset.
+            columns (Optional[list[str]], optional): Columns to read, missing ones are left out. Defaults to all.
+            seasons (Optional[Iterable[int]], optional): Seasons to read. Defaults to all.
+            weeks (Optional[Iterable[int]], optional): Weeks to read, by partition or by week column. Defaults to all.
+            batch_size (int, optional): Most rows per batch. Defaults to 50,000.
+
+        Yields:
+            pa.RecordBatch: Raw records.
+        """
+        for path in self._select_partitions(dataset, seasons, weeks):
+            parquet_file = pq.ParquetFile(path)
+            read_columns = None
+            if columns is not None:
+                available = parquet_file.schema_arrow.names
+                read_columns = [col for col in columns if col in available]
+            for batch in parquet_file.iter_batches(
+                batch_size=batch_size, columns=read_columns
+            ):
+                batch = self._week_filter(
+                    dataset, pa.Table.from_batches([batch]), weeks
+                )
+                if batch.num_rows:
+                    yield from batch.to_batches()
+
+    def migrate_pickles(self, pkl_dir: str = None, remove: bool = False) -> int:
+        """
+        Converts the former pickled API responses into the store, skipping partitions already written.
+
+        Args:
+            pkl_dir (str, optional): Directory of the pickles. Defaults to src/cfb/data/pkl_files.
+            remove (bool, optional): Whether to delete each pickle once converted. Defaults to False.
+
+        Returns:
+            int: Number of pickles converted.
+        """
+        pkl_dir = pkl_dir or os.path.join(self.project_root, "src/cfb/data/pkl_files")
+        converted = 0
+        for pkl_path in sorted(glob.glob(os.path.join(pkl_dir, "*.pkl"))):
+            file_name = os.path.basename(pkl_path)
+            for dataset, pattern in LEGACY_PKL_PATTERNS.items():
+                match = re.fullmatch(pattern, file_name)
+                if match:
+                    break
+            else:
+                print(f"Skipping unrecognized {file_name}.")
+                continue
+
+            partition = dict(zip(RAW_DATASETS[dataset], map(int, match.groups())))
+            if not self.exists(dataset, **partition):
+                with open(pkl_path, "rb") as f:
+                    records = pkl.load(f)
+                self.write(
+                    dataset,
+                    to_raw_table(dataset, records),
+                    source=file_name,
+                    **partition,
+                )
+                converted += 1
+            if remove:
+                os.remove(pkl_path)
+        print(f"Migrated {converted} pickles into {self.root}.")
+        return converted
+
+
+if __name__ == "__main__":
+    # python src/cfb/data/raw_store.py --migrate
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--migrate", action="store_true", help="Convert pkl_files into the raw store."
+    )
+    parser.add_argument(
+        "--remove_pickles",
+        action="store_true",
+        help="Delete each pickle once it has been converted.",
+    )
+    args = parser.parse_args()
+    if args.migrate:
+        RawStore().migrate_pickles(remove=args.remove_pickles)
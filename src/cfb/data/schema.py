@@ -0,0 +1,55 @@
+import os
+from typing import Optional
+
+from db_utils import execute_sql_script
+
+# DDL in dependency order, tables before the ones referencing them, triggers and views last
+SCHEMA_SCRIPTS = [
+    "cfb_schema.sql",
+    "cfb_venues.sql",
+    "cfb_games.sql",
+    "cfb_lines.sql",
+    "cfb_line_snapshots.sql",
+    "cfb_game_team_stats.sql",
+    "cfb_play_by_play.sql",
+    "cfb.advanced_game_stats.sql",
+    "cfb_play_by_play_aggregates.sql",
+    "cfb_ingest_watermarks.sql",
+    "cfb_ingest_checksums.sql",
+    "cfb_table_versions.sql",
+    "cfb_game_changes.sql",
+    "cfb_game_wide.sql",
+]
+
+
+def schema_script_paths(queries_path: Optional[str] = None) -> list[str]:
+    """
+    Lists the DDL scripts in the order they must run. Scripts not in SCHEMA_SCRIPTS run last,
+    sorted by name.
+
+    Args:
+        queries_path (Optional[str], optional): Directory of the DDL. Defaults to src/cfb/data/sql_queries.
+
+    Returns:
+        list[str]: Paths of the scripts.
+    """
+    if queries_path is None:
+        project_root = os.getenv("PROJECT_ROOT", os.getcwd())
+        queries_path = os.path.join(project_root, "src/cfb/data/sql_queries")
+    if not os.path.isdir(queries_path):
+        return []
+    files = set(file for file in os.listdir(queries_path) if file.endswith(".sql"))
+    ordered = [file for file in SCHEMA_SCRIPTS if file in files]
+    ordered += sorted(files - set(SCHEMA_SCRIPTS))
+    return [os.path.join(queries_path, file) for file in ordered]
+
+
+def make_schemas_tables(queries_path: Optional[str] = None) -> None:
+    """
+    Generates all the schemas and tables, if they don't already exist, in dependency order.
+
+    Args:
+        queries_path (Optional[str], optional): Directory of the DDL. Defaults to src/cfb/data/sql_queries.
+    """
+    for script_path in schema_script_paths(queries_path):
+        execute_sql_script(script_path)
@@ -70,6 +70,6 @@ CREATE TABLE IF NOT EXISTS cfb.advanced_game_stats (
     defense_ppa                            FLOAT,
     defense_drives                         INT,
     defense_plays                          INT,
-    PRIMARY KEY (game_id, team)
+    PRIMARY KEY (game_id, team),
     FOREIGN KEY (game_id) REFERENCES cfb.games(id) ON DELETE SET NULL
 );
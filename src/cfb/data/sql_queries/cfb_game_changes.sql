@@ -0,0 +1,77 @@
+-- Games whose joined row changed, one entry per game per writing statement, so DataPrep can
+-- rebuild only the games changed since it last read. A null game_id marks a TRUNCATE.
+CREATE TABLE IF NOT EXISTS cfb.game_changes (
+    seq        BIGSERIAL PRIMARY KEY,
+    game_id    INT,
+    changed_at TIMESTAMP NOT NULL DEFAULT now()
+);
+
+-- Writing transaction of each entry. Sequences are handed out before commit, so an entry can
+-- become visible after a higher seq was read; DataPrep watermarks on the oldest transaction still
+-- running instead, below which every entry is visible.
+ALTER TABLE cfb.game_changes ADD COLUMN IF NOT EXISTS xact_id XID8 NOT NULL DEFAULT pg_current_xact_id();
+CREATE INDEX IF NOT EXISTS game_changes_xact_id_idx ON cfb.game_changes (xact_id);
+
+-- Logs the games of the rows a statement wrote, read from its transition table. Venues log the
+-- games played there, other tables the game id column passed as the trigger's argument.
+CREATE OR REPLACE FUNCTION cfb.log_game_changes() RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'TRUNCATE' THEN
+        INSERT INTO cfb.game_changes (game_id) VALUES (NULL);
+    ELSIF TG_TABLE_NAME = 'venues' THEN
+        INSERT INTO cfb.game_changes (game_id)
+        SELECT g.id FROM cfb.games AS g WHERE g.venue_id IN (SELECT id FROM changed_rows);
+    ELSE
+        EXECUTE format(
+            'INSERT INTO cfb.game_changes (game_id) SELECT DISTINCT %I FROM changed_rows WHERE %I IS NOT NULL',
+            TG_ARGV[0],
+            TG_ARGV[0]
+        );
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DO $$
+DECLARE
+    tbl TEXT;
+    game_id_col TEXT;
+BEGIN
+    FOR tbl, game_id_col IN
+        SELECT * FROM (VALUES
+            ('venues', 'id'),
+            ('games', 'id'),
+            ('lines', 'id'),
+            ('game_team_stats', 'game_id'),
+            ('advanced_game_stats', 'game_id'),
+            ('pbp_explosive_plays', 'game_id')
+        ) AS logged (tbl, game_id_col)
+    LOOP
+        IF to_regclass('cfb.' || tbl) IS NOT NULL THEN
+            EXECUTE format('DROP TRIGGER IF EXISTS log_game_inserts ON cfb.%I', tbl);
+            EXECUTE format('DROP TRIGGER IF EXISTS log_game_updates ON cfb.%I', tbl);
+            EXECUTE format('DROP TRIGGER IF EXISTS log_game_deletes ON cfb.%I', tbl);
+            EXECUTE format('DROP TRIGGER IF EXISTS log_game_truncates ON cfb.%I', tbl);
+            EXECUTE format(
+                'CREATE TRIGGER log_game_inserts AFTER INSERT ON cfb.%I REFERENCING NEW TABLE AS changed_rows '
+                'FOR EACH STATEMENT EXECUTE FUNCTION cfb.log_game_changes(%L)',
+                tbl, game_id_col
+            );
+            EXECUTE format(
+                'CREATE TRIGGER log_game_updates AFTER UPDATE ON cfb.%I REFERENCING NEW TABLE AS changed_rows '
+                'FOR EACH STATEMENT EXECUTE FUNCTION cfb.log_game_changes(%L)',
+                tbl, game_id_col
+            );
+            EXECUTE format(
+                'CREATE TRIGGER log_game_deletes AFTER DELETE ON cfb.%I REFERENCING OLD TABLE AS changed_rows '
+                'FOR EACH STATEMENT EXECUTE FUNCTION cfb.log_game_changes(%L)',
+                tbl, game_id_col
+            );
+            EXECUTE format(
+                'CREATE TRIGGER log_game_truncates AFTER TRUNCATE ON cfb.%I '
+                'FOR EACH STATEMENT EXECUTE FUNCTION cfb.log_game_changes(%L)',
+                tbl, game_id_col
+            );
+        END IF;
+    END LOOP;
+END $$;
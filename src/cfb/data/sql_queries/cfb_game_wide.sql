@@ -0,0 +1,91 @@
+-- One row per game with its venue, line range, and both sides' box score, explosive plays, and
+-- advanced stats, named as DataPrep.load_data names them. Built from the tables' current columns,
+-- so rerunning this script picks up DDL changes. Bump GAME_WIDE_VERSION in data_prep.py with it.
+CREATE INDEX IF NOT EXISTS games_season_week_idx ON cfb.games (season, week);
+
+DO $$
+DECLARE
+    select_list TEXT;
+    side TEXT;
+    alias TEXT;
+BEGIN
+    SELECT string_agg(format('g.%I', column_name), ', ' ORDER BY ordinal_position)
+    INTO select_list
+    FROM information_schema.columns
+    WHERE table_schema = 'cfb' AND table_name = 'games';
+
+    -- Venue columns clashing with game columns take a _venue suffix, i.e. id_venue
+    SELECT select_list || ', ' || string_agg(
+        CASE
+            WHEN column_name IN (
+                SELECT column_name FROM information_schema.columns
+                WHERE table_schema = 'cfb' AND table_name = 'games'
+            ) THEN format('v.%I AS %I', column_name, column_name || '_venue')
+            ELSE format('v.%I', column_name)
+        END,
+        ', ' ORDER BY ordinal_position
+    )
+    INTO select_list
+    FROM information_schema.columns
+    WHERE table_schema = 'cfb' AND table_name = 'venues';
+
+    select_list := select_list || ', l.min_ou, l.max_ou, l.min_spread, l.max_spread';
+
+    FOREACH side IN ARRAY ARRAY['home', 'away'] LOOP
+        alias := left(side, 1) || 'g';
+        SELECT select_list || ', ' || string_agg(
+            format('%I.%I AS %I', alias, column_name, side || '_' || column_name),
+            ', ' ORDER BY ordinal_position
+        )
+        INTO select_list
+        FROM information_schema.columns
+        WHERE table_schema = 'cfb' AND table_name = 'game_team_stats' AND column_name <> 'team';
+    END LOOP;
+
+    FOREACH side IN ARRAY ARRAY['home', 'away'] LOOP
+        alias := left(side, 1) || 'p';
+        SELECT select_list || ', ' || string_agg(
+            format('%I.%I AS %I', alias, column_name, side || '_' || column_name),
+            ', ' ORDER BY ordinal_position
+        )
+        INTO select_list
+        FROM information_schema.columns
+        WHERE table_schema = 'cfb' AND table_name = 'pbp_explosive_plays'
+            AND column_name NOT IN ('game_id', 'team');
+    END LOOP;
+
+    FOREACH side IN ARRAY ARRAY['home', 'away'] LOOP
+        alias := left(side, 1) || 'a';
+        SELECT select_list || ', ' || string_agg(
+            format('%I.%I AS %I', alias, column_name, side || '_' || column_name),
+            ', ' ORDER BY ordinal_position
+        )
+        INTO select_list
+        FROM information_schema.columns
+        WHERE table_schema = 'cfb' AND table_name = 'advanced_game_stats'
+            AND column_name NOT IN ('game_id', 'team', 'opponent', 'season', 'week');
+    END LOOP;
+
+    DROP VIEW IF EXISTS cfb.game_wide;
+    EXECUTE 'CREATE VIEW cfb.game_wide AS SELECT ' || select_list || '
+        FROM cfb.games AS g
+        LEFT JOIN cfb.venues AS v ON v.id = g.venue_id AND v.name = g.venue
+        LEFT JOIN LATERAL (
+            SELECT
+                MIN(over_under) AS min_ou,
+                MAX(over_under) AS max_ou,
+                MIN(spread) AS min_spread,
+                MAX(spread) AS max_spread
+            FROM cfb.lines
+            WHERE lines.id = g.id
+        ) AS l ON TRUE
+        LEFT JOIN cfb.game_team_stats AS hg
+            ON hg.game_id = g.id AND hg.team_id = g.home_id AND hg.team = g.home_team
+        LEFT JOIN cfb.game_team_stats AS ag
+            ON ag.game_id = g.id AND ag.team_id = g.away_id AND ag.team = g.away_team
+        LEFT JOIN cfb.pbp_explosive_plays AS hp ON hp.game_id = g.id AND hp.team = g.home_team
+        LEFT JOIN cfb.pbp_explosive_plays AS ap ON ap.game_id = g.id AND ap.team = g.away_team
+        LEFT JOIN cfb.advanced_game_stats AS ha ON ha.game_id = g.id AND ha.team = g.home_team
+        LEFT JOIN cfb.advanced_game_stats AS aa ON aa.game_id = g.id AND aa.team = g.away_team';
+    COMMENT ON VIEW cfb.game_wide IS 'version 1';
+END $$;
@@ -0,0 +1,7 @@
+-- Inputs checksum of each completed ingest node, so reruns skip nodes whose inputs are unchanged
+CREATE TABLE IF NOT EXISTS cfb.ingest_checksums (
+    node         VARCHAR(50) PRIMARY KEY,
+    checksum     VARCHAR(64) NOT NULL,
+    completed_at TIMESTAMP NOT NULL DEFAULT now(),
+    seconds      FLOAT
+);
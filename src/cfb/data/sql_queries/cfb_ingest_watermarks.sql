@@ -0,0 +1,8 @@
+-- Last season and week ingested per raw dataset, so in-season refreshes only re-pull trailing weeks
+CREATE TABLE IF NOT EXISTS cfb.ingest_watermarks (
+    dataset     VARCHAR(50) PRIMARY KEY,
+    season      INT,
+    week        INT,
+    fetched_at  TIMESTAMP NOT NULL DEFAULT now(),
+    rows_merged INT NOT NULL DEFAULT 0
+);
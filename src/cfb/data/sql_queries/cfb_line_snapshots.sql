@@ -0,0 +1,115 @@
+-- Line history, one row per (game, provider) each time a fetch sees its line change, partitioned by
+-- season so old seasons can be scanned, detached, or dropped on their own. Times are UTC.
+CREATE TABLE IF NOT EXISTS cfb.line_snapshots (
+    season         INT NOT NULL,
+    id             INT NOT NULL,
+    provider       VARCHAR(50) NOT NULL,
+    captured_at    TIMESTAMP NOT NULL,
+    week           INT,
+    kickoff        TIMESTAMP,
+    spread         DECIMAL(4, 1),
+    over_under     DECIMAL(4, 1),
+    home_moneyline DECIMAL(7, 1),
+    away_moneyline DECIMAL(7, 1),
+    -- Serves opening (first), closing and as-of (last at or before a time) lookups per line
+    PRIMARY KEY (season, id, provider, captured_at)
+) PARTITION BY LIST (season);
+
+-- Creates the partition of a season, called before appending its snapshots
+CREATE OR REPLACE FUNCTION cfb.ensure_line_snapshot_partition(partition_season INT) RETURNS VOID AS $$
+BEGIN
+    EXECUTE format(
+        'CREATE TABLE IF NOT EXISTS cfb.%I PARTITION OF cfb.line_snapshots FOR VALUES IN (%s)',
+        'line_snapshots_' || partition_season,
+        partition_season
+    );
+END;
+$$ LANGUAGE plpgsql;
+
+-- Opening, closing (last before kickoff), and as-of lines of every game and provider, in one pass
+-- over the selected seasons' partitions. Lines first seen after at_time have null as-of values.
+CREATE OR REPLACE FUNCTION cfb.line_movement(
+    at_time TIMESTAMP DEFAULT NULL,
+    movement_seasons INT[] DEFAULT NULL
+) RETURNS TABLE (
+    season              INT,
+    id                  INT,
+    provider            VARCHAR(50),
+    week                INT,
+    kickoff             TIMESTAMP,
+    snapshots           BIGINT,
+    opened_at           TIMESTAMP,
+    spread_open         DECIMAL(4, 1),
+    over_under_open     DECIMAL(4, 1),
+    closed_at           TIMESTAMP,
+    spread_close        DECIMAL(4, 1),
+    over_under_close    DECIMAL(4, 1),
+    home_moneyline_close DECIMAL(7, 1),
+    away_moneyline_close DECIMAL(7, 1),
+    as_of               TIMESTAMP,
+    spread_at           DECIMAL(4, 1),
+    over_under_at       DECIMAL(4, 1)
+) AS $$
+    WITH ranked AS (
+        SELECT
+            s.*,
+            ROW_NUMBER() OVER line_order AS opening_rank,
+            LAST_VALUE(s.kickoff) OVER (
+                line_order ROWS BETWEEN UNBOUNDED PRECEDING AND UNBOUNDED FOLLOWING
+            ) AS latest_kickoff,
+            COUNT(*) OVER (PARTITION BY s.season, s.id, s.provider) AS snapshots
+        FROM
+            cfb.line_snapshots AS s
+        WHERE
+            movement_seasons IS NULL
+            OR s.season = ANY(movement_seasons)
+        WINDOW line_order AS (PARTITION BY s.season, s.id, s.provider ORDER BY s.captured_at)
+    ),
+    closing AS (
+        SELECT DISTINCT ON (r.season, r.id, r.provider)
+            r.season, r.id, r.provider, r.captured_at, r.spread, r.over_under,
+            r.home_moneyline, r.away_moneyline
+        FROM
+            ranked AS r
+        WHERE
+            r.latest_kickoff IS NULL
+            OR r.captured_at <= r.latest_kickoff
+        ORDER BY
+            r.season, r.id, r.provider, r.captured_at DESC
+    ),
+    as_of AS (
+        SELECT DISTINCT ON (r.season, r.id, r.provider)
+            r.season, r.id, r.provider, r.captured_at, r.spread, r.over_under
+        FROM
+            ranked AS r
+        WHERE
+            at_time IS NOT NULL
+            AND r.captured_at <= at_time
+        ORDER BY
+            r.season, r.id, r.provider, r.captured_at DESC
+    )
+    SELECT
+        o.season,
+        o.id,
+        o.provider,
+        o.week,
+        o.latest_kickoff,
+        o.snapshots,
+        o.captured_at,
+        o.spread,
+        o.over_under,
+        c.captured_at,
+        c.spread,
+        c.over_under,
+        c.home_moneyline,
+        c.away_moneyline,
+        a.captured_at,
+        a.spread,
+        a.over_under
+    FROM
+        ranked AS o
+        LEFT JOIN closing AS c USING (season, id, provider)
+        LEFT JOIN as_of AS a USING (season, id, provider)
+    WHERE
+        o.opening_rank = 1
+$$ LANGUAGE sql STABLE;
@@ -0,0 +1,84 @@
+-- Per team-game aggregates of play-by-play, kept as tables rather than materialized views so they
+-- can be refreshed for only the games an upload touched
+CREATE INDEX IF NOT EXISTS play_by_play_game_id_offense_idx ON cfb.play_by_play (game_id, offense);
+
+CREATE TABLE IF NOT EXISTS cfb.pbp_explosive_plays (
+    game_id       INT,
+    team          VARCHAR(50),
+    plays_30_plus INT,
+    plays_35_plus INT,
+    plays_40_plus INT,
+    PRIMARY KEY (game_id, team)
+);
+
+CREATE TABLE IF NOT EXISTS cfb.pbp_down_distance_success (
+    game_id         INT,
+    team            VARCHAR(50),
+    down            INT,
+    distance_bucket VARCHAR(10),
+    plays           INT,
+    successes       INT,
+    PRIMARY KEY (game_id, team, down, distance_bucket)
+);
+
+-- Recomputes the aggregates of the given games, or of every game when passed NULL
+CREATE OR REPLACE FUNCTION cfb.refresh_pbp_aggregates(refresh_game_ids INT[]) RETURNS VOID AS $$
+BEGIN
+    DELETE FROM cfb.pbp_explosive_plays
+    WHERE refresh_game_ids IS NULL OR game_id = ANY(refresh_game_ids);
+    INSERT INTO cfb.pbp_explosive_plays
+    SELECT
+        game_id,
+        offense,
+        COUNT(CASE WHEN yards_gained >= 30 THEN 1 END),
+        COUNT(CASE WHEN yards_gained >= 35 THEN 1 END),
+        COUNT(CASE WHEN yards_gained >= 40 THEN 1 END)
+    FROM
+        cfb.play_by_play
+    WHERE
+        game_id IS NOT NULL
+        AND offense IS NOT NULL
+        AND (refresh_game_ids IS NULL OR game_id = ANY(refresh_game_ids))
+    GROUP BY
+        game_id,
+        offense;
+
+    -- Success is 50% of the distance on first down, 70% on second, all of it on third and fourth
+    DELETE FROM cfb.pbp_down_distance_success
+    WHERE refresh_game_ids IS NULL OR game_id = ANY(refresh_game_ids);
+    INSERT INTO cfb.pbp_down_distance_success
+    SELECT
+        game_id,
+        offense,
+        down,
+        CASE WHEN distance <= 3 THEN 'short' WHEN distance <= 7 THEN 'medium' ELSE 'long' END,
+        COUNT(*),
+        COUNT(
+            CASE
+                WHEN yards_gained >= distance * CASE down WHEN 1 THEN 0.5 WHEN 2 THEN 0.7 ELSE 1 END
+                THEN 1
+            END
+        )
+    FROM
+        cfb.play_by_play
+    WHERE
+        game_id IS NOT NULL
+        AND offense IS NOT NULL
+        AND down BETWEEN 1 AND 4
+        AND distance IS NOT NULL
+        AND play_type NOT IN ('Penalty', 'Timeout')
+        AND play_type NOT LIKE 'End %'
+        AND play_type NOT LIKE 'Kickoff%'
+        AND (refresh_game_ids IS NULL OR game_id = ANY(refresh_game_ids))
+    GROUP BY
+        1, 2, 3, 4;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Backfill once, later uploads refresh only their own games
+DO $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM cfb.pbp_explosive_plays) THEN
+        PERFORM cfb.refresh_pbp_aggregates(NULL);
+    END IF;
+END $$;
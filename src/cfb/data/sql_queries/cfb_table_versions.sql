@@ -0,0 +1,32 @@
+CREATE TABLE IF NOT EXISTS cfb.table_versions (
+    table_name VARCHAR(100) PRIMARY KEY,
+    version    BIGINT NOT NULL DEFAULT 0,
+    changed_at TIMESTAMP NOT NULL DEFAULT now()
+);
+
+-- Bumped once per writing statement, so readers can cheaply tell whether a table changed
+CREATE OR REPLACE FUNCTION cfb.bump_table_version() RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO cfb.table_versions (table_name, version, changed_at)
+    VALUES (TG_TABLE_NAME, 1, now())
+    ON CONFLICT (table_name)
+    DO UPDATE SET version = cfb.table_versions.version + 1, changed_at = now();
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DO $$
+DECLARE
+    tbl TEXT;
+BEGIN
+    FOREACH tbl IN ARRAY ARRAY['venues', 'games', 'lines', 'game_team_stats', 'play_by_play', 'advanced_game_stats', 'pbp_explosive_plays', 'pbp_down_distance_success'] LOOP
+        IF to_regclass('cfb.' || tbl) IS NOT NULL THEN
+            EXECUTE format('DROP TRIGGER IF EXISTS bump_table_version ON cfb.%I', tbl);
+            EXECUTE format(
+                'CREATE TRIGGER bump_table_version AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON cfb.%I '
+                'FOR EACH STATEMENT EXECUTE FUNCTION cfb.bump_table_version()',
+                tbl
+            );
+        END IF;
+    END LOOP;
+END $$;
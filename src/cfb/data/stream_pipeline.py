@@ -0,0 +1,152 @@
+import queue
+import threading
+import time
+from typing import Any, Callable, Iterable
+
+import pandas as pd
+
+# Marks the end of a stream between stages
+_DONE = object()
+
+
+def _batch_rows(batch: Any) -> int:
+    """
+    Counts the rows of a batch, i.e. a pyarrow RecordBatch or a DataFrame.
+
+    Args:
+        batch (Any): Batch passed between stages.
+
+    Returns:
+        int: Rows, 1 for batches without a length.
+    """
+    if hasattr(batch, "num_rows"):
+        return batch.num_rows
+    if hasattr(batch, "__len__"):
+        return len(batch)
+    return 1
+
+
+def run_stream(
+    source: Iterable,
+    stages: list[tuple[str, Callable[[Any], Any]]],
+    max_pending: int = 2,
+    name: str = "stream",
+) -> pd.DataFrame:
+    """
+    Runs batches from a source through a chain of stages, each stage on its own thread. Stages are
+    joined by queues of at most max_pending batches, so a slow stage blocks the ones before it and
+    at most (stages + 1) * (max_pending + 1) batches are held at once, whatever the source's size.
+    The last stage is the sink, its results are discarded.
+
+    Args:
+        source (Iterable): Batches, read lazily on the first thread.
+        stages (list[tuple[str, Callable[[Any], Any]]]): Name and work of each stage, in order.
+        max_pending (int, optional): Batches queued between two stages. Defaults to 2.
+        name (str, optional): Name of the stream, for messages. Defaults to "stream".
+
+    Raises:
+        Exception: A stage failed, after the other stages have stopped.
+
+    Returns:
+        pd.DataFrame: Per stage, batches, rows, seconds working, seconds starved waiting on the
+            stage before, seconds blocked by the stage after, and rows per working second.
+    """
+    names = ["source"] + [stage_name for stage_name, _ in stages]
+    metrics = {
+        stage_name: {
+            "batches": 0,
+            "rows": 0,
+            "busy_s": 0.0,
+            "starved_s": 0.0,
+            "blocked_s": 0.0,
+        }
+        for stage_name in names
+    }
+    queues = [queue.Queue(maxsize=max(1, max_pending)) for _ in stages]
+    stop = threading.Event()
+    errors = []
+
+    def put(out_queue: queue.Queue, item: Any, stage_name: str) -> bool:
+        wait_start = time.perf_counter()
+        while not stop.is_set():
+            try:
+                out_queue.put(item, timeout=0.1)
+                metrics[stage_name]["blocked_s"] += time.perf_counter() - wait_start
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def get(in_queue: queue.Queue, stage_name: str) -> Any:
+        wait_start = time.perf_counter()
+        while not stop.is_set():
+            try:
+                item = in_queue.get(timeout=0.1)
+                metrics[stage_name]["starved_s"] += time.perf_counter() - wait_start
+                return item
+            except queue.Empty:
+                continue
+        return _DONE
+
+    def read_source() -> None:
+        try:
+            batches = iter(source)
+            while not stop.is_set():
+                work_start = time.perf_counter()
+                batch = next(batches, _DONE)
+                if batch is _DONE:
+                    break
+                metrics["source"]["busy_s"] += time.perf_counter() - work_start
+                metrics["source"]["batches"] += 1
+                metrics["source"]["rows"] += _batch_rows(batch)
+                if not put(queues[0], batch, "source"):
+                    return
+        except Exception as e:
+            errors.append(("source", e))
+            stop.set()
+            return
+        put(queues[0], _DONE, "source")
+
+    def run_stage(index: int) -> None:
+        stage_name, work = stages[index]
+        is_sink = index == len(stages) - 1
+        try:
+            while True:
+                batch = get(queues[index], stage_name)
+                if batch is _DONE:
+                    break
+                work_start = time.perf_counter()
+                result = work(batch)
+                metrics[stage_name]["busy_s"] += time.perf_counter() - work_start
+                metrics[stage_name]["batches"] += 1
+                metrics[stage_name]["rows"] += _batch_rows(batch if is_sink else result)
+                if not is_sink and not put(queues[index + 1], result, stage_name):
+                    return
+        except Exception as e:
+            errors.append((stage_name, e))
+            stop.set()
+            return
+        if not is_sink:
+            put(queues[index + 1], _DONE, stage_name)
+
+    start_time = time.time()
+    threads = [threading.Thread(target=read_source, name=f"{name}-source")]
+    threads += [
+        threading.Thread(target=run_stage, args=(index,), name=f"{name}-{stage_name}")
+        for index, (stage_name, _) in enumerate(stages)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    total_s = time.time() - start_time
+
+    summary = pd.DataFrame.from_dict(metrics, orient="index").loc[names]
+    summary["rows_per_s"] = summary["rows"] / summary["busy_s"].clip(lower=1e-9)
+    summary.index.name = "stage"
+    print(f"Streamed {name} in {total_s:.1f} seconds.")
+    print(summary.round(2))
+    if errors:
+        stage_name, e = errors[0]
+        raise Exception(f"{name} failed in stage {stage_name}: {e}") from e
+    return summary
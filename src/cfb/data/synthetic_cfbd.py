@@ -0,0 +1,387 @@
+import datetime as dt
+import random
+
+from cfbd.models.advanced_game_stat import AdvancedGameStat
+from cfbd.models.betting_game import BettingGame
+from cfbd.models.game import Game
+from cfbd.models.game_team_stats import GameTeamStats
+from cfbd.models.play import Play
+from cfbd.models.venue import Venue
+
+TEAMS = [f"Team {i}" for i in range(130)]
+CONFERENCES = ["ACC", "Big 12", "Big Ten", "SEC", "Pac-12", "Mountain West"]
+PROVIDERS = ["consensus", "Bovada", "ESPN Bet", "DraftKings"]
+# Optional categories are only reported by some games
+REQUIRED_STATS = [
+    "completionAttempts",
+    "firstDowns",
+    "fourthDownEff",
+    "fumblesLost",
+    "fumblesRecovered",
+    "interceptions",
+    "kickReturnTDs",
+    "kickReturnYards",
+    "kickReturns",
+    "kickingPoints",
+    "netPassingYards",
+    "passingTDs",
+    "possessionTime",
+    "rushingAttempts",
+    "rushingTDs",
+    "rushingYards",
+    "thirdDownEff",
+    "totalPenaltiesYards",
+    "totalYards",
+    "turnovers",
+    "yardsPerPass",
+    "yardsPerRushAttempt",
+]
+OPTIONAL_STATS = [
+    "interceptionTDs",
+    "interceptionYards",
+    "passesIntercepted",
+    "puntReturnTDs",
+    "puntReturnYards",
+    "puntReturns",
+]
+PLAY_TYPES = ["Rush", "Pass Reception", "Pass Incompletion", "Punt", "Penalty"]
+
+
+def _team_pair(rng: random.Random) -> tuple[str, str]:
+    """Picks two distinct teams."""
+    home, away = rng.sample(TEAMS, 2)
+    return home, away
+
+
+def synthetic_venues(n: int = 800, seed: int = 0) -> list[Venue]:
+    """
+    Generates venues shaped like the CFBD API's.
+
+    Args:
+        n (int, optional): Number of venues. Defaults to 800.
+        seed (int, optional): Random seed. Defaults to 0.
+
+    Returns:
+        list[Venue]: Synthetic venues.
+    """
+    rng = random.Random(seed)
+    return [
+        Venue.from_dict(
+            {
+                "id": i,
+                "name": f"Stadium {i}",
+                "city": f"City {i}",
+                "state": "TX",
+                "zip": f"{rng.randint(10000, 99999)}",
+                "countryCode": "US",
+                "timezone": "America/Chicago",
+                "latitude": rng.uniform(25, 48),
+                "longitude": rng.uniform(-124, -70),
+                "elevation": f"{rng.uniform(0, 2000):.1f}",
+                "capacity": rng.randint(5000, 110000),
+                "constructionYear": rng.randint(1900, 2020),
+                "grass": rng.random() < 0.5,
+                "dome": rng.random() < 0.1,
+            }
+        )
+        for i in range(n)
+    ]
+
+
+def synthetic_games(year: int, n: int = 3800, seed: int = 0) -> list[Game]:
+    """
+    Generates a season of games shaped like the CFBD API's.
+
+    Args:
+        year (int): Season.
+        n (int, optional): Number of games. Defaults to 3800.
+        seed (int, optional): Random seed. Defaults to 0.
+
+    Returns:
+        list[Game]: Synthetic games.
+    """
+    rng = random.Random(seed)
+    games = []
+    for i in range(n):
+        home, away = _team_pair(rng)
+        week = i * 15 // n + 1
+        games.append(
+            Game.from_dict(
+                {
+                    "id": year * 10000 + i,
+                    "season": year,
+                    "week": week,
+                    "seasonType": "regular",
+                    "startDate": dt.datetime(year, 8, 30) + dt.timedelta(weeks=week),
+                    "startTimeTBD": False,
+                    "completed": True,
+                    "neutralSite": rng.random() < 0.05,
+                    "conferenceGame": rng.random() < 0.6,
+                    "attendance": rng.choice([None, rng.randint(5000, 100000)]),
+                    "venueId": rng.randint(0, 799),
+                    "venue": "Stadium",
+                    "homeId": TEAMS.index(home),
+                    "homeTeam": home,
+                    "homeConference": rng.choice(CONFERENCES),
+                    "homeClassification": "fbs",
+                    "homePoints": rng.randint(0, 60),
+                    "homeLineScores": [rng.randint(0, 21) for _ in range(4)],
+                    "homePostgameWinProbability": rng.random(),
+                    "homePregameElo": rng.randint(1000, 2200),
+                    "homePostgameElo": rng.randint(1000, 2200),
+                    "awayId": TEAMS.index(away),
+                    "awayTeam": away,
+                    "awayConference": rng.choice(CONFERENCES),
+                    "awayClassification": "fbs",
+                    "awayPoints": rng.randint(0, 60),
+                    "awayLineScores": [rng.randint(0, 21) for _ in range(4)],
+                    "awayPostgameWinProbability": rng.random(),
+                    "awayPregameElo": rng.randint(1000, 2200),
+                    "awayPostgameElo": rng.randint(1000, 2200),
+                    "excitementIndex": rng.uniform(0, 10),
+                    "highlights": None,
+                    "notes": None,
+                }
+            )
+        )
+    return games
+
+
+def synthetic_betting_games(
+    year: int, n: int = 900, seed: int = 0
+) -> list[BettingGame]:
+    """
+    Generates a season of betting games, each with a line per provider.
+
+    Args:
+        year (int): Season.
+        n (int, optional): Number of games. Defaults to 900.
+        seed (int, optional): Random seed. Defaults to 0.
+
+    Returns:
+        list[BettingGame]: Synthetic betting games.
+    """
+    rng = random.Random(seed)
+    betting_games = []
+    for i in range(n):
+        home, away = _team_pair(rng)
+        lines = []
+        for provider in rng.sample(PROVIDERS, rng.randint(0, len(PROVIDERS))):
+            spread = rng.randint(-60, 60) / 2
+            lines.append(
+                {
+                    "provider": provider,
+                    "spread": spread,
+                    "formattedSpread": f"{home} {spread}",
+                    "spreadOpen": spread + rng.choice([-1, 0, 1]),
+                    "overUnder": rng.randint(80, 160) / 2,
+                    "overUnderOpen": rng.randint(80, 160) / 2,
+                    "homeMoneyline": rng.choice([None, rng.randint(-1000, 1000)]),
+                    "awayMoneyline": rng.choice([None, rng.randint(-1000, 1000)]),
+                }
+            )
+        betting_games.append(
+            BettingGame.from_dict(
+                {
+                    "id": year * 10000 + i,
+                    "season": year,
+                    "seasonType": "regular",
+                    "week": i * 15 // n + 1,
+                    "startDate": dt.datetime(year, 9, 1),
+                    "homeTeam": home,
+                    "homeConference": rng.choice(CONFERENCES),
+                    "homeClassification": "fbs",
+                    "homeScore": rng.randint(0, 60),
+                    "awayTeam": away,
+                    "awayConference": rng.choice(CONFERENCES),
+                    "awayClassification": "fbs",
+                    "awayScore": rng.randint(0, 60),
+                    "lines": lines,
+                }
+            )
+        )
+    return betting_games
+
+
+def _stat_value(rng: random.Random, category: str) -> str:
+    """Formats a box score stat as the API does, always as text."""
+    if category in ["completionAttempts", "fourthDownEff", "thirdDownEff"]:
+        return f"{rng.randint(0, 20)}-{rng.randint(20, 40)}"
+    if category == "totalPenaltiesYards":
+        return f"{rng.randint(0, 15)}-{rng.randint(0, 120)}"
+    if category == "possessionTime":
+        return f"{rng.randint(20, 40)}:{rng.randint(0, 59):02d}"
+    if category.startswith("yardsPer"):
+        return f"{rng.uniform(0, 12):.1f}"
+    return str(rng.randint(0, 400))
+
+
+def synthetic_game_team_stats(
+    year: int, n: int = 60, seed: int = 0
+) -> list[GameTeamStats]:
+    """
+    Generates a week of box scores, each game with both teams' stats by category.
+
+    Args:
+        year (int): Season.
+        n (int, optional): Number of games. Defaults to 60.
+        seed (int, optional): Random seed. Defaults to 0.
+
+    Returns:
+        list[GameTeamStats]: Synthetic game team stats.
+    """
+    rng = random.Random(seed)
+    game_team_stats = []
+    for i in range(n):
+        teams = []
+        for home_away, team in zip(["home", "away"], _team_pair(rng)):
+            categories = REQUIRED_STATS + [
+                category for category in OPTIONAL_STATS if rng.random() < 0.3
+            ]
+            teams.append(
+                {
+                    "teamId": TEAMS.index(team),
+                    "team": team,
+                    "conference": rng.choice(CONFERENCES),
+                    "homeAway": home_away,
+                    "points": rng.randint(0, 60),
+                    "stats": [
+                        {"category": category, "stat": _stat_value(rng, category)}
+                        for category in categories
+                    ],
+                }
+            )
+        game_team_stats.append(
+            GameTeamStats.from_dict({"id": year * 10000 + i, "teams": teams})
+        )
+    return game_team_stats
+
+
+def _advanced_side(rng: random.Random) -> dict:
+    """Generates one side's advanced stats, nested as the API returns them."""
+
+    def plays() -> dict:
+        return {
+            "explosiveness": rng.random(),
+            "successRate": rng.random(),
+            "totalPPA": rng.uniform(-10, 30),
+            "ppa": rng.uniform(-1, 1),
+        }
+
+    def downs() -> dict:
+        return {
+            "explosiveness": rng.random(),
+            "successRate": rng.random(),
+            "ppa": rng.uniform(-1, 1),
+        }
+
+    return {
+        "passingPlays": plays(),
+        "rushingPlays": plays(),
+        "passingDowns": downs(),
+        "standardDowns": downs(),
+        "openFieldYardsTotal": rng.randint(0, 100),
+        "openFieldYards": rng.random(),
+        "secondLevelYardsTotal": rng.randint(0, 100),
+        "secondLevelYards": rng.random(),
+        "lineYardsTotal": rng.randint(0, 200),
+        "lineYards": rng.uniform(0, 5),
+        "stuffRate": rng.random(),
+        "powerSuccess": rng.random(),
+        "explosiveness": rng.random(),
+        "successRate": rng.random(),
+        "totalPPA": rng.uniform(-10, 30),
+        "ppa": rng.uniform(-1, 1),
+        "drives": rng.randint(8, 16),
+        "plays": rng.randint(50, 90),
+    }
+
+
+def synthetic_advanced_game_stats(
+    year: int, n: int = 1700, seed: int = 0
+) -> list[AdvancedGameStat]:
+    """
+    Generates a season of advanced game stats, one per team-game.
+
+    Args:
+        year (int): Season.
+        n (int, optional): Number of team-games. Defaults to 1700.
+        seed (int, optional): Random seed. Defaults to 0.
+
+    Returns:
+        list[AdvancedGameStat]: Synthetic advanced game stats.
+    """
+    rng = random.Random(seed)
+    advanced_game_stats = []
+    for i in range(n):
+        team, opponent = _team_pair(rng)
+        advanced_game_stats.append(
+            AdvancedGameStat.from_dict(
+                {
+                    "gameId": year * 10000 + i // 2,
+                    "season": year,
+                    "week": i * 15 // n + 1,
+                    "team": team,
+                    "opponent": opponent,
+                    "offense": _advanced_side(rng),
+                    "defense": _advanced_side(rng),
+                }
+            )
+        )
+    return advanced_game_stats
+
+
+def synthetic_plays(year: int, week: int, n: int = 12000, seed: int = 0) -> list[Play]:
+    """
+    Generates a week of play-by-play.
+
+    Args:
+        year (int): Season.
+        week (int): Week.
+        n (int, optional): Number of plays. Defaults to 12000.
+        seed (int, optional): Random seed. Defaults to 0.
+
+    Returns:
+        list[Play]: Synthetic plays.
+    """
+    rng = random.Random(seed)
+    plays = []
+    for i in range(n):
+        offense, defense = _team_pair(rng)
+        plays.append(
+            Play.from_dict(
+                {
+                    "id": str(year * 10**8 + week * 10**6 + i),
+                    "driveId": str(year * 10**7 + week * 10**5 + i // 6),
+                    "gameId": year * 10000 + week * 100 + i // 150,
+                    "driveNumber": i % 150 // 6 + 1,
+                    "playNumber": i % 6 + 1,
+                    "offense": offense,
+                    "offenseConference": rng.choice(CONFERENCES),
+                    "offenseScore": rng.randint(0, 50),
+                    "defense": defense,
+                    "home": offense,
+                    "away": defense,
+                    "defenseConference": rng.choice(CONFERENCES),
+                    "defenseScore": rng.randint(0, 50),
+                    "period": rng.randint(1, 4),
+                    "clock": {
+                        "minutes": rng.randint(0, 14),
+                        "seconds": rng.randint(0, 59),
+                    },
+                    "offenseTimeouts": rng.randint(0, 3),
+                    "defenseTimeouts": rng.randint(0, 3),
+                    "yardline": rng.randint(1, 99),
+                    "yardsToGoal": rng.randint(1, 99),
+                    "down": rng.randint(1, 4),
+                    "distance": rng.randint(1, 20),
+                    "yardsGained": rng.randint(-10, 60),
+                    "scoring": rng.random() < 0.05,
+                    "playType": rng.choice(PLAY_TYPES),
+                    "playText": "Synthetic play",
+                    "ppa": rng.choice([None, rng.uniform(-3, 5)]),
+                    "wallclock": f"{year}-09-0{week % 9 + 1}T18:00:00.000Z",
+                }
+            )
+        )
+    return plays
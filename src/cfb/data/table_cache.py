@@ -0,0 +1,209 @@
+import glob
+import hashlib
+import json
+import os
+from typing import Callable, Optional
+
+import pandas as pd
+import pyarrow as pa
+from psycopg2 import sql
+
+from db_utils import SCHEMA_TABLES, get_connection
+
+
+class TableCache:
+    """
+    Local on-disk snapshot cache of database reads, stored as uncompressed Arrow IPC files and read
+    back into pandas frames, which own their data. Each entry is keyed by table, a hash of what was
+    read, and a cheap fingerprint of the table's current data, so any ingest into the table
+    invalidates it.
+    """
+
+    def __init__(self, cache_dir: str = None, enabled: bool = True):
+        """
+        Initializes the cache directory.
+
+        Args:
+            cache_dir (str, optional): Directory of the cache files. Defaults to src/cfb/data/cache_files.
+            enabled (bool, optional): Whether to use the cache at all. Defaults to True.
+        """
+        self.project_root = os.getenv("PROJECT_ROOT", os.getcwd())
+        self.cache_dir = cache_dir or os.path.join(
+            self.project_root, "src/cfb/data/cache_files"
+        )
+        self.enabled = enabled
+
+    def fingerprint(self, schema: str, table: str) -> str:
+        """
+        Computes a data-version fingerprint from the row count, the max key, and the version kept
+        by the triggers in cfb_table_versions.sql when installed.
+
+        Args:
+            schema (str): Schema of the table.
+            table (str): Table to fingerprint.
+
+        Returns:
+            str: Fingerprint of the table's current contents.
+        """
+        key_col = SCHEMA_TABLES[schema].get(table) or "id"
+        with get_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute(
+                    sql.SQL("SELECT COUNT(*), MAX({}) FROM {}").format(
+                        sql.Identifier(key_col), sql.Identifier(schema, table)
+                    )
+                )
+                row_count, max_key = cursor.fetchone()
+                cursor.execute("SELECT to_regclass(%s)", (f"{schema}.table_versions",))
+                version = None
+                if cursor.fetchone()[0] is not None:
+                    cursor.execute(
+                        sql.SQL(
+                            "SELECT version, changed_at FROM {} WHERE table_name = %s"
+                        ).format(sql.Identifier(schema, "table_versions")),
+                        (table,),
+                    )
+                    version = cursor.fetchone()
+        return hashlib.md5(f"{row_count}|{max_key}|{version}".encode()).hexdigest()
+
+    def _entry_prefix(self, schema: str, table: str, spec: str) -> str:
+        """
+        Path prefix shared by all versions of one cached read.
+
+        Args:
+            schema (str): Schema of the table.
+            table (str): Table read.
+            spec (str): Description of the read, i.e. the query or its filters.
+
+        Returns:
+            str: Path prefix of the entry.
+        """
+        spec_hash = hashlib.md5(spec.encode()).hexdigest()[:12]
+        return os.path.join(self.cache_dir, f"{schema}.{table}-{spec_hash}")
+
+    def _read(self, path: str) -> pd.DataFrame:
+        """
+        Reads a cache file. The file is mapped rather than read into a buffer, but converting to
+        pandas copies the columns, so the frame can be modified and outlives the map.
+
+        Args:
+            path (str): Arrow IPC file.
+
+        Returns:
+            pd.DataFrame: Cached frame.
+        """
+        with pa.memory_map(path, "r") as source:
+            table = pa.ipc.open_file(source).read_all()
+        df = table.to_pandas()
+        # Arrow hands lists back as arrays, downstream expects Python lists (i.e. line scores)
+        for field in table.schema:
+            if pa.types.is_list(field.type):
+                df[field.name] = table.column(field.name).to_pylist()
+        return df
+
+    def _write(self, path: str, df: pd.DataFrame) -> None:
+        """
+        Writes a frame to a cache file, atomically so readers never see a partial file.
+
+        Args:
+            path (str): Arrow IPC file.
+            df (pd.DataFrame): Frame to cache.
+        """
+        os.makedirs(self.cache_dir, exist_ok=True)
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        tmp_path = f"{path}.tmp"
+        with pa.OSFile(tmp_path, "wb") as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        os.replace(tmp_path, path)
+
+    def get_or_load(
+        self,
+        schema: str,
+        table: str,
+        loader: Callable[[], pd.DataFrame],
+        spec: str = "",
+        depends_on: Optional[list[str]] = None,
+    ) -> pd.DataFrame:
+        """
+        Returns the cached read if the table is unchanged, otherwise loads and caches it.
+
+        Args:
+            schema (str): Schema of the table.
+            table (str): Table the read depends on.
+            loader (Callable[[], pd.DataFrame]): Reads from the database on a miss.
+            spec (str, optional): Description of the read, i.e. the query or its filters. Defaults to "".
+            depends_on (Optional[list[str]], optional): Tables fingerprinted together in place of table, i.e. those under a view. Defaults to None.
+
+        Returns:
+            pd.DataFrame: Data read.
+        """
+        if not self.enabled:
+            return loader()
+
+        prefix = self._entry_prefix(schema, table, spec)
+        fingerprint = "|".join(
+            self.fingerprint(schema, dependency) for dependency in depends_on or [table]
+        )
+        path = f"{prefix}-{hashlib.md5(fingerprint.encode()).hexdigest()[:12]}.arrow"
+        if os.path.isfile(path):
+            return self._read(path)
+
+        df = loader()
+        if df is None:
+            return df
+        for stale_path in glob.glob(f"{prefix}-*.arrow"):
+            os.remove(stale_path)
+        try:
+            self._write(path, df)
+        except (pa.ArrowInvalid, pa.ArrowTypeError) as e:
+            print(f"Unable to cache {schema}.{table}: {e}")
+        return df
+
+    def read_frame(self, name: str) -> Optional[tuple[pd.DataFrame, dict]]:
+        """
+        Reads a frame persisted with write_frame, whether or not caching is enabled.
+
+        Args:
+            name (str): Name of the frame, i.e. "cfb.master".
+
+        Returns:
+            Optional[tuple[pd.DataFrame, dict]]: Frame and its metadata, None if missing.
+        """
+        path = os.path.join(self.cache_dir, f"{name}.arrow")
+        meta_path = os.path.join(self.cache_dir, f"{name}.json")
+        if not os.path.isfile(path) or not os.path.isfile(meta_path):
+            return None
+        with open(meta_path, "r") as file:
+            meta = json.load(file)
+        return self._read(path), meta
+
+    def write_frame(self, name: str, df: pd.DataFrame, meta: dict) -> None:
+        """
+        Persists a frame and its metadata, i.e. a watermark, the metadata last so that a frame
+        is never read back with the metadata of an older one.
+
+        Args:
+            name (str): Name of the frame, i.e. "cfb.master".
+            df (pd.DataFrame): Frame to persist.
+            meta (dict): JSON-serializable metadata.
+        """
+        meta_path = os.path.join(self.cache_dir, f"{name}.json")
+        if os.path.isfile(meta_path):
+            os.remove(meta_path)
+        self._write(os.path.join(self.cache_dir, f"{name}.arrow"), df)
+        tmp_path = f"{meta_path}.tmp"
+        with open(tmp_path, "w") as file:
+            json.dump(meta, file)
+        os.replace(tmp_path, meta_path)
+
+    def invalidate(self, table: str = None) -> None:
+        """
+        Removes cached entries of a table, or of everything.
+
+        Args:
+            table (str, optional): Schema-qualified table, i.e. "cfb.games". Defaults to all tables.
+        """
+        pattern = f"{table}-*.arrow" if table else "*.arrow"
+        for path in glob.glob(os.path.join(self.cache_dir, pattern)):
+            os.remove(path)
@@ -0,0 +1,135 @@
+import multiprocessing
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Iterable, Optional
+
+import pandas as pd
+
+from db_utils import copy_data_to_db
+
+# Loaders built once per worker process, see _load_partition
+_worker_loaders = {}
+
+
+def _load_partition(
+    loader_cls: type, method: str, partition: tuple
+) -> tuple[pd.DataFrame, float]:
+    """
+    Loads one partition in a worker process, reusing the worker's loader across partitions.
+
+    Args:
+        loader_cls (type): Loader class, i.e. CFBPlayByPlayData.
+        method (str): Loader method returning the partition's rows, i.e. "load_play_by_play_from_raw_at_year_week".
+        partition (tuple): Arguments of the method, i.e. (year, week).
+
+    Returns:
+        tuple[pd.DataFrame, float]: Rows of the partition and seconds spent loading them.
+    """
+    start_time = time.perf_counter()
+    if loader_cls not in _worker_loaders:
+        _worker_loaders[loader_cls] = loader_cls()
+    data = getattr(_worker_loaders[loader_cls], method)(*partition)
+    return data, time.perf_counter() - start_time
+
+
+def pipelined_upload(
+    table: str,
+    loader_cls: type,
+    method: str,
+    partitions: Iterable[tuple],
+    processes: Optional[int] = None,
+    max_pending: Optional[int] = None,
+    on_conflict: str = "nothing",
+    on_written: Optional[Callable[[tuple, pd.DataFrame], None]] = None,
+) -> dict:
+    """
+    Uploads partitions with a pool of processes loading and reshaping them in parallel, while this
+    process alone writes the finished frames to the database. At most max_pending partitions are in
+    flight, bounding memory, and partitions are committed one at a time in the order given, so a
+    rerun after a failure resumes cleanly under ON CONFLICT.
+
+    Args:
+        table (str): Schema-qualified target table, i.e. "cfb.play_by_play".
+        loader_cls (type): Loader class, built once per worker. Partitions should already be fetched.
+        method (str): Loader method returning a partition's rows, in table column order.
+        partitions (Iterable[tuple]): Arguments of the method per partition, i.e. [(2024, 1), (2024, 2)].
+        processes (Optional[int], optional): Worker processes. Defaults to the number of CPUs.
+        max_pending (Optional[int], optional): Partitions loaded or loading, not yet written. Defaults to twice the processes.
+        on_conflict (str, optional): Conflict handling of copy_data_to_db. Defaults to "nothing".
+        on_written (Optional[Callable[[tuple, pd.DataFrame], None]], optional): Called with each partition once written. Defaults to None.
+
+    Raises:
+        Exception: Some partitions failed to load or write, once every other partition is written.
+
+    Returns:
+        dict: Partitions, failures, rows copied and merged, and load, write, and total seconds.
+    """
+    processes = processes or os.cpu_count() or 1
+    max_pending = max(1, max_pending or 2 * processes)
+    partitions = iter(partitions)
+    summary = {"partitions": 0, "failed": [], "rows": 0, "merged": 0}
+    summary.update(load_s=0.0, write_s=0.0)
+    start_time = time.time()
+
+    # Spawned rather than forked, as uploads may run alongside other threads, see ingest.py
+    with ProcessPoolExecutor(
+        max_workers=processes, mp_context=multiprocessing.get_context("spawn")
+    ) as executor:
+        pending = deque()
+
+        def submit_next() -> None:
+            partition = next(partitions, None)
+            if partition is not None:
+                pending.append(
+                    (
+                        partition,
+                        executor.submit(_load_partition, loader_cls, method, partition),
+                    )
+                )
+
+        for _ in range(max_pending):
+            submit_next()
+        while pending:
+            partition, future = pending.popleft()
+            try:
+                data, load_s = future.result()
+            except Exception as e:
+                summary["failed"].append(partition)
+                print(f"Failed loading {partition}: {e}")
+                submit_next()
+                continue
+            # Keep the workers busy while this partition is written
+            submit_next()
+
+            write_start = time.perf_counter()
+            try:
+                merged = copy_data_to_db(table, data, on_conflict=on_conflict)
+            except Exception as e:
+                summary["failed"].append(partition)
+                print(f"Failed writing {partition}: {e}")
+                continue
+            finally:
+                summary["write_s"] += time.perf_counter() - write_start
+            summary["load_s"] += load_s
+            summary["partitions"] += 1
+            summary["rows"] += len(data)
+            summary["merged"] += merged
+            if on_written is not None:
+                on_written(partition, data)
+
+    summary["total_s"] = time.time() - start_time
+    print(
+        f"Uploaded {summary['rows']:,} rows ({summary['merged']:,} merged) into {table} from "
+        f"{summary['partitions']} partitions in {summary['total_s']:.1f} seconds "
+        f"({summary['rows'] / max(summary['total_s'], 1e-9):,.0f} rows/s), "
+        f"{summary['load_s']:.1f} seconds loading over {processes} processes, "
+        f"{summary['write_s']:.1f} seconds writing, {len(summary['failed'])} failed."
+    )
+    if summary["failed"]:
+        raise Exception(
+            f"Failed loading or writing {len(summary['failed'])} partitions of {table}, rerun to resume: "
+            f"{summary['failed']}"
+        )
+    return summary
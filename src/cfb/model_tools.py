@@ -58,17 +58,20 @@ def load_pkl_if_exists(
     return result
 
 
-def get_transformed_data(target_col: str = "home_away_spread") -> pd.DataFrame:
+def get_transformed_data(
+    target_col: str = "home_away_spread", use_cache: bool = True
+) -> pd.DataFrame:
     """
     Helper function to get the transformed data.
 
     Args:
         target_col (str, optional): Target column to drop from X. Defaults to "home_away_spread".
+        use_cache (bool, optional): Whether to read through the local table cache. Defaults to True.
 
     Returns:
         pd.DataFrame: Finalized DataFrame through pipeline.
     """
-    data_prep = DataPrep(dataset="cfb")
+    data_prep = DataPrep(dataset="cfb", use_cache=use_cache)
     raw_data = data_prep.get_data()
     preprocessed_data = get_preprocess_pipeline().fit_transform(raw_data)
     target_line_dict = {
@@ -0,0 +1,227 @@
+import argparse
+import time
+from typing import Iterable, Optional
+
+import pandas as pd
+from data.data_prep import DataPrep
+from pipelines.pipeline import get_features_and_model_pipeline
+from pipelines.preprocessing import get_preprocess_pipeline
+from sklearn.compose import ColumnTransformer
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import FunctionTransformer
+
+# Attributes of the custom transformers naming the columns they read
+COLUMN_ATTRIBUTES = [
+    "home_col",
+    "away_col",
+    "home_cols",
+    "away_cols",
+    "success_col",
+    "count_col",
+    "group_col",
+]
+# Columns read by transformers that hard-code them, by class
+FIXED_INPUT_COLUMNS = {
+    "TeamGameIndexTransformer": ["start_date", "home_team", "away_team"],
+    "DaysSinceLastGameTransformer": ["start_date", "home_team", "away_team"],
+    "RollingTransformer": ["start_date", "home_team", "away_team"],
+    "KalmanTransformer": ["start_date", "home_team", "away_team"],
+    "QuartersTotalTransformer": [
+        "home_line_scores",
+        "away_line_scores",
+        "home_points",
+        "away_points",
+    ],
+    "SpreadTransformer": ["home_points", "away_points"],
+    "ExpandEfficiencyTransformer": [
+        f"{side}_{col}"
+        for side in ["home", "away"]
+        for col in [
+            "third_down_eff",
+            "fourth_down_eff",
+            "completion_attempts",
+            "total_penalties_yards",
+        ]
+    ],
+}
+# Columns read by FunctionTransformer steps, by step name, as their functions can't be inspected
+FUNCTION_STEP_COLUMNS = {
+    "set_id_index": ["id"],
+    "remove_nans": ["home_line_scores", "away_line_scores"],
+}
+# Columns read outside the pipelines, i.e. the target, the lines, and the seasons of the CV split
+EXTERNAL_COLUMNS = [
+    "season",
+    "home_points",
+    "away_points",
+    "min_ou",
+    "max_ou",
+    "min_spread",
+    "max_spread",
+]
+
+
+def _walk(estimator, name: str, usage: dict, scoped: bool = False) -> None:
+    """
+    Records the columns an estimator reads and drops, recursing into pipelines and column
+    transformers. Estimators outside the pipelines package read whatever they are given, which is
+    covered by what passes through to them.
+
+    Args:
+        estimator: Step of a pipeline.
+        name (str): Name of the step.
+        usage (dict): Sets of read and dropped columns, and the steps that can't be analyzed.
+        scoped (bool, optional): Whether the estimator only sees the columns a ColumnTransformer lists. Defaults to False.
+    """
+    if isinstance(estimator, Pipeline):
+        for step_name, step in estimator.steps:
+            _walk(step, step_name, usage, scoped)
+    elif isinstance(estimator, ColumnTransformer):
+        if estimator.remainder != "passthrough":
+            usage["opaque"].append(f"{name} (remainder={estimator.remainder})")
+        for transformer_name, transformer, columns in estimator.transformers:
+            if callable(columns):
+                # Selectors listing their columns, i.e. PresentColumns
+                if not hasattr(columns, "columns"):
+                    usage["opaque"].append(f"{transformer_name} (column selector)")
+                    continue
+                columns = columns.columns
+            columns = [columns] if isinstance(columns, str) else list(columns)
+            if isinstance(transformer, str) and transformer == "drop":
+                usage["drops"].update(columns)
+                continue
+            usage["reads"].update(columns)
+            if not isinstance(transformer, str):
+                _walk(transformer, transformer_name, usage, scoped=True)
+    elif isinstance(estimator, FunctionTransformer):
+        if name in FUNCTION_STEP_COLUMNS:
+            usage["reads"].update(FUNCTION_STEP_COLUMNS[name])
+        elif not scoped:
+            usage["opaque"].append(name)
+    else:
+        class_name = type(estimator).__name__
+        known = class_name in FIXED_INPUT_COLUMNS
+        usage["reads"].update(FIXED_INPUT_COLUMNS.get(class_name, []))
+        for attribute in COLUMN_ATTRIBUTES:
+            columns = getattr(estimator, attribute, None)
+            if columns is not None:
+                known = True
+                columns = [columns] if isinstance(columns, str) else columns
+                usage["reads"].update(columns)
+        custom = type(estimator).__module__.startswith("pipelines.")
+        if not known and custom and not scoped:
+            usage["opaque"].append(f"{name} ({class_name})")
+
+
+def analyze_column_usage(pipelines: Optional[list[Pipeline]] = None) -> dict:
+    """
+    Walks the pipelines for the columns their steps read and the ones they drop.
+
+    Args:
+        pipelines (Optional[list[Pipeline]], optional): Pipelines run on the loaded data, in order. Defaults to preprocessing, then features and model.
+
+    Returns:
+        dict: Read and dropped columns, and the steps whose columns can't be known.
+    """
+    if pipelines is None:
+        pipelines = [get_preprocess_pipeline(), get_features_and_model_pipeline()]
+    usage = {"reads": set(), "drops": set(), "opaque": []}
+    for pipeline in pipelines:
+        _walk(pipeline, type(pipeline).__name__, usage)
+    usage["reads"].update(EXTERNAL_COLUMNS)
+    return usage
+
+
+def minimal_input_columns(
+    available: Iterable[str], pipelines: Optional[list[Pipeline]] = None
+) -> list[str]:
+    """
+    Finds the loaded columns the pipelines need, i.e. those a step reads, and those passing
+    through to the model because no step drops them.
+
+    Args:
+        available (Iterable[str]): Columns DataPrep.get_data returns, see DataPrep.output_columns.
+        pipelines (Optional[list[Pipeline]], optional): Pipelines run on the loaded data, in order. Defaults to preprocessing, then features and model.
+
+    Returns:
+        list[str]: Columns to load, in the order of available. All of them if a step can't be analyzed.
+    """
+    usage = analyze_column_usage(pipelines)
+    available = list(available)
+    if usage["opaque"]:
+        print(f"Unable to tell the columns read by {usage['opaque']}, keeping all.")
+        return available
+    return [
+        col for col in available if col in usage["reads"] or col not in usage["drops"]
+    ]
+
+
+def _model_inputs(raw_df: pd.DataFrame) -> pd.DataFrame:
+    """Runs loaded data through preprocessing, features, and the drops, as backtest.py does."""
+    preprocessed_df = get_preprocess_pipeline().fit_transform(raw_df)
+    X = preprocessed_df.drop(
+        columns=["home_away_spread", "min_ou", "max_ou", "min_spread", "max_spread"]
+    )
+    return Pipeline(get_features_and_model_pipeline().steps[:2]).fit_transform(X)
+
+
+def report_savings(
+    seasons: Optional[Iterable[int]] = None, check: bool = True
+) -> pd.DataFrame:
+    """
+    Loads the data in full and pruned to the minimal input columns, uncached, and compares their
+    memory and load time. Optionally checks that both give the model the same inputs.
+
+    Args:
+        seasons (Optional[Iterable[int]], optional): Seasons to load. Defaults to all.
+        check (bool, optional): Whether to run both through the pipelines and compare. Defaults to True.
+
+    Returns:
+        pd.DataFrame: Columns, MB, and seconds of each load, and the reduction.
+    """
+    load_kwargs = {} if seasons is None else {"seasons": list(seasons)}
+    data_prep = DataPrep(use_cache=False)
+    available = data_prep.output_columns()
+    columns = minimal_input_columns(available)
+    print(f"Pipelines need {len(columns)} of {len(available)} loaded columns.")
+
+    results, frames = {}, {}
+    for load, load_columns in [("full", None), ("pruned", columns)]:
+        start_time = time.perf_counter()
+        frames[load] = DataPrep(use_cache=False).get_data(
+            columns=load_columns, **load_kwargs
+        )
+        results[load] = {
+            "columns": frames[load].shape[1],
+            "mb": frames[load].memory_usage(deep=True).sum() / 2**20,
+            "seconds": time.perf_counter() - start_time,
+        }
+    results = pd.DataFrame(results).T
+    results["reduction"] = 1 - results["mb"] / results.loc["full", "mb"]
+
+    if check:
+        pd.testing.assert_frame_equal(
+            _model_inputs(frames["full"]), _model_inputs(frames["pruned"])
+        )
+        print("The pruned load gives the model the same inputs.")
+    return results.round(3)
+
+
+if __name__ == "__main__":
+    # python src/cfb/pipelines/column_usage.py --seasons 2022 2023
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--seasons", type=int, nargs="*", default=None, help="Seasons to load."
+    )
+    parser.add_argument(
+        "--no_check",
+        action="store_true",
+        help="Skip running both loads through the pipelines.",
+    )
+    parser.add_argument(
+        "--list", action="store_true", help="Print the minimal input columns."
+    )
+    args = parser.parse_args()
+    if args.list:
+        print(minimal_input_columns(DataPrep().output_columns()))
+    print(report_savings(args.seasons, not args.no_check))
@@ -1,6 +1,5 @@
-import datetime as dt
-
 import pandas as pd
+from pipelines.team_game_index import TeamGameIndex
 from sklearn.base import BaseEstimator, TransformerMixin
 
 
@@ -22,37 +21,15 @@ class DaysSinceLastGameTransformer(BaseEstimator, TransformerMixin):
             pd.DataFrame: Dataframe with imputed values.
         """
         X_ = X.copy()
-        df_home = X_[["start_date", "home_team"]].rename(columns={"home_team": "team"})
-        df_away = X_[["start_date", "away_team"]].rename(columns={"away_team": "team"})
-        df_combined = pd.concat([df_home, df_away]).sort_values(
-            by=["team", "start_date"]
-        )
-        df_combined["previous_game"] = df_combined.groupby("team")["start_date"].shift(
-            1
+        X_["start_date"] = pd.to_datetime(X_["start_date"])
+        index = TeamGameIndex.of(X_)
+        previous_game = index.shift(index.games["start_date"])
+        home_previous, away_previous = index.to_sides(
+            previous_game.fillna(pd.Timestamp(2000, 1, 1))
         )
+        # Columns the former merges left behind, kept so the features stay the same
         X_["previous_game"] = None
-        for side in ["home", "away"]:
-            # Maintain the original index through merge by resetting, and then setting again
-            X_ = (
-                X_.reset_index()
-                .merge(
-                    df_combined[["team", "start_date", "previous_game"]],
-                    left_on=[f"{side}_team", "start_date"],
-                    right_on=["team", "start_date"],
-                    how="left",
-                    suffixes=("", f"_{side}"),
-                )
-                .set_index(X_.index.name)
-            )
-            X_[f"previous_game_{side}"] = X_[f"previous_game_{side}"].fillna(
-                dt.date(2000, 1, 1)
-            )
-            X_[f"{side}_days_since_last_game"] = (
-                X_["start_date"] - X_[f"previous_game_{side}"]
-            ).apply(lambda x: x.days)
-        X_.drop(
-            columns=["team", "previous_game_home", "previous_game_away"],
-            inplace=True,
-            errors="ignore",
-        )
+        X_["home_days_since_last_game"] = (X_["start_date"] - home_previous).dt.days
+        X_["team_away"] = X_["away_team"]
+        X_["away_days_since_last_game"] = (X_["start_date"] - away_previous).dt.days
         return X_
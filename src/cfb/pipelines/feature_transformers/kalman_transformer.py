@@ -2,6 +2,7 @@ import numpy as np
 import pandas as pd
 from filterpy.common import Q_discrete_white_noise
 from filterpy.kalman import KalmanFilter
+from pipelines.team_game_index import TeamGameIndex
 from sklearn.base import BaseEstimator, TransformerMixin
 
 
@@ -78,53 +79,22 @@ class KalmanTransformer(BaseEstimator, TransformerMixin):
             pd.DataFrame: Dataframe with filtered values.
         """
         X_ = X.copy()
-
-        # Prepare data for Kalman filtering
-        home_df = X_[["start_date", "home_team", self.home_col]].rename(
-            columns={"home_team": "team", self.home_col: self.new_col}
-        )
-        away_df = X_[["start_date", "away_team", self.away_col]].rename(
-            columns={"away_team": "team", self.away_col: self.new_col}
-        )
-
-        game_df = pd.concat([home_df, away_df])
-        game_df.sort_values(by=["team", "start_date"], inplace=True)
-        game_df.drop_duplicates(
-            subset=["start_date", "team"], keep="last", inplace=True
-        )
+        index = TeamGameIndex.of(X_)
+        values = index.values(X_, self.home_col, self.away_col)
 
         # Maintain kalman somewhere in name
         if self.new_col.startswith("kalman"):
             kalman_col_name = self.new_col
         else:
             kalman_col_name = f"kalman_{self.new_col}"
-        game_df[kalman_col_name] = game_df.groupby("team")[self.new_col].transform(
-            self._apply_kalman_filter
-        )
-
-        X_ = (
-            X_.reset_index()
-            .merge(
-                game_df[["start_date", "team", kalman_col_name]],
-                left_on=["start_date", "home_team"],
-                right_on=["start_date", "team"],
-                how="left",
-            )
-            .rename(columns={kalman_col_name: f"home_{kalman_col_name}"})
-            .drop(columns=["team"])
-            .set_index(X_.index.name)
-        )
-
-        X_ = (
-            X_.reset_index()
-            .merge(
-                game_df[["start_date", "team", kalman_col_name]],
-                left_on=["start_date", "away_team"],
-                right_on=["start_date", "team"],
-                how="left",
-            )
-            .rename(columns={kalman_col_name: f"away_{kalman_col_name}"})
-            .drop(columns=["team"])
-            .set_index(X_.index.name)
+        # Filters each team's games in order, games without a team stay missing
+        filtered = np.full(len(values), np.nan)
+        for team_games in index.team_slices():
+            filtered[team_games] = self._apply_kalman_filter(
+                values.iloc[team_games]
+            ).to_numpy()
+
+        X_[f"home_{kalman_col_name}"], X_[f"away_{kalman_col_name}"] = index.to_sides(
+            pd.Series(filtered)
         )
         return X_
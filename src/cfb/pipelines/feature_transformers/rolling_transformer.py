@@ -1,6 +1,7 @@
 from typing import List
 
 import pandas as pd
+from pipelines.team_game_index import TeamGameIndex
 from sklearn.base import BaseEstimator, TransformerMixin
 
 
@@ -49,33 +50,11 @@ class RollingTransformer(BaseEstimator, TransformerMixin):
             pd.DataFrame: Dataframe with rolled values.
         """
         X_ = X.copy()
+        index = TeamGameIndex.of(X_)
+        # Values of each team's previous game, rolled over the sorted team games
+        previous = index.shift(index.values(X_, self.home_col, self.away_col))
 
-        # Separately treats home and away, combines into game_df
-        home_df = X_[
-            [
-                "start_date",
-                "home_team",
-                self.home_col,
-            ]
-        ].rename(
-            columns={
-                "home_team": "team",
-                self.home_col: self.new_col,
-            }
-        )
-        away_df = X_[["start_date", "away_team", self.away_col]].rename(
-            columns={
-                "away_team": "team",
-                self.away_col: self.new_col,
-            }
-        )
-        game_df = pd.concat([home_df, away_df])
-        game_df.sort_values(by=["team", "start_date"], inplace=True)
-        game_df.drop_duplicates(
-            subset=["start_date", "team"], keep="last", inplace=True
-        )
-
-        # Create game_df rolling_column according to specs
+        # Create rolling_column according to specs
         func_map = {
             "mean": lambda x: x.mean(),
             "sum": lambda x: x.sum(),
@@ -91,38 +70,12 @@ class RollingTransformer(BaseEstimator, TransformerMixin):
                 rolling_col_name = (
                     f"rolling_{window_size}_{self.agg_func}_{self.new_col}"
                 )
-            game_df[rolling_col_name] = (
-                game_df.groupby("team")[self.new_col]
-                .shift(1)
-                .rolling(window=window_size, min_periods=self.min_periods)
+            rolled = (
+                previous.rolling(window=window_size, min_periods=self.min_periods)
                 .apply(func_map[self.agg_func], raw=True)
                 .fillna(0)
             )
-            # Merge X_ with game_df, starting with home then away, retaining original index
-            X_ = (
-                X_.reset_index()
-                .merge(
-                    game_df[["start_date", "team", rolling_col_name]],
-                    left_on=["start_date", "home_team"],
-                    right_on=["start_date", "team"],
-                    how="left",
-                )
-                .set_index(X_.index.name)
-            )
-            X_ = X_.rename(columns={rolling_col_name: f"home_{rolling_col_name}"}).drop(
-                columns=["team"]
-            )
-            X_ = (
-                X_.reset_index()
-                .merge(
-                    game_df[["start_date", "team", rolling_col_name]],
-                    left_on=["start_date", "away_team"],
-                    right_on=["start_date", "team"],
-                    how="left",
-                )
-                .set_index(X_.index.name)
-            )
-            X_ = X_.rename(columns={rolling_col_name: f"away_{rolling_col_name}"}).drop(
-                columns=["team"]
+            X_[f"home_{rolling_col_name}"], X_[f"away_{rolling_col_name}"] = (
+                index.to_sides(rolled)
             )
         return X_
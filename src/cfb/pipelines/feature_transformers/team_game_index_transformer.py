@@ -0,0 +1,37 @@
+import pandas as pd
+from pipelines.team_game_index import TEAM_GAME_INDEX_ATTR, TeamGameIndex
+from sklearn.base import BaseEstimator, TransformerMixin
+
+
+class TeamGameIndexTransformer(BaseEstimator, TransformerMixin):
+    """Builds the TeamGameIndex of the games once for the temporal transformers after it, or drops it after them."""
+
+    def __init__(self, drop: bool = False):
+        """
+        Initializes class to build or drop the index.
+
+        Args:
+            drop (bool, optional): Whether to drop the index instead, so it doesn't outlive the features. Defaults to False.
+        """
+        self.drop = drop
+
+    def fit(self, X, y=None):
+        """Dummy for inheritance."""
+        return self
+
+    def transform(self, X: pd.DataFrame) -> pd.DataFrame:
+        """
+        Stores the TeamGameIndex of the games in the DataFrame's attrs, or removes it.
+
+        Args:
+            X (pd.DataFrame): Input DataFrame.
+
+        Returns:
+            pd.DataFrame: Dataframe carrying its index, or without one.
+        """
+        X_ = X.copy()
+        if self.drop:
+            X_.attrs.pop(TEAM_GAME_INDEX_ATTR, None)
+        else:
+            X_.attrs[TEAM_GAME_INDEX_ATTR] = TeamGameIndex(X_)
+        return X_
@@ -4,6 +4,9 @@ from pipelines.feature_transformers.days_since_last_game_transformer import (
 from pipelines.feature_transformers.kalman_transformer import KalmanTransformer
 from pipelines.feature_transformers.net_transformer import NetTransformer
 from pipelines.feature_transformers.rolling_transformer import RollingTransformer
+from pipelines.feature_transformers.team_game_index_transformer import (
+    TeamGameIndexTransformer,
+)
 from sklearn import set_config
 from sklearn.pipeline import Pipeline
 
@@ -341,6 +344,7 @@ def feature_pipeline() -> Pipeline:
     """
     pipeline = Pipeline(
         [
+            ("team_game_index", TeamGameIndexTransformer()),
             ("days_since", DaysSinceLastGameTransformer()),
             ("offense_pipeline", offense_pipeline()),
             ("defense_pipeline", defense_pipeline()),
@@ -359,6 +363,7 @@ def feature_pipeline() -> Pipeline:
                     "net_5_mean_rolling_ppa",
                 ),
             ),
+            ("drop_team_game_index", TeamGameIndexTransformer(drop=True)),
         ]
     )
     return pipeline
@@ -0,0 +1,59 @@
+from typing import Optional
+
+from pipelines.feature_transformers.days_since_last_game_transformer import (
+    DaysSinceLastGameTransformer,
+)
+from pipelines.feature_transformers.kalman_transformer import KalmanTransformer
+from pipelines.feature_transformers.rolling_transformer import RollingTransformer
+from pipelines.features import feature_pipeline
+from sklearn.compose import ColumnTransformer
+from sklearn.pipeline import Pipeline
+
+# Prior games a Kalman filter is given to settle, as it runs over a team's whole history. Three
+# seasons bring its estimates within about 0.1 of a run over every season
+KALMAN_WARMUP_GAMES = 36
+
+
+def _history_games(estimator) -> int:
+    """
+    Prior games of each team an estimator reads to compute the features of a game.
+
+    Args:
+        estimator: Step of a pipeline.
+
+    Returns:
+        int: Games of history needed, 0 for steps looking at one game at a time.
+    """
+    if isinstance(estimator, Pipeline):
+        return max([_history_games(step) for _, step in estimator.steps], default=0)
+    if isinstance(estimator, ColumnTransformer):
+        return max(
+            [
+                _history_games(transformer)
+                for _, transformer, _ in estimator.transformers
+                if not isinstance(transformer, str)
+            ],
+            default=0,
+        )
+    if isinstance(estimator, RollingTransformer):
+        # Windows are shifted by one game, so each covers the games before
+        return max(estimator.window_sizes)
+    if isinstance(estimator, KalmanTransformer):
+        return KALMAN_WARMUP_GAMES
+    if isinstance(estimator, DaysSinceLastGameTransformer):
+        return 1
+    return 0
+
+
+def required_history_games(pipeline: Optional[Pipeline] = None) -> int:
+    """
+    Finds how many prior games of each team the temporal features need, from the largest rolling
+    window and the Kalman warm-up, so that loads of a few seasons can bring enough history.
+
+    Args:
+        pipeline (Optional[Pipeline], optional): Feature pipeline. Defaults to feature_pipeline().
+
+    Returns:
+        int: Prior games needed per team.
+    """
+    return _history_games(feature_pipeline() if pipeline is None else pipeline)
@@ -1,3 +1,4 @@
+import pandas as pd
 from lightgbm.sklearn import LGBMRegressor
 from pipelines.feature_transformers.print_transformer import PrintTransformer
 from pipelines.features import feature_pipeline
@@ -6,6 +7,34 @@ from sklearn.feature_selection import RFECV, VarianceThreshold
 from sklearn.pipeline import Pipeline
 
 
+class PresentColumns:
+    """
+    Column selector of the listed columns a frame has, so that loads pruned to the columns the
+    pipelines need, see column_usage.py, can leave out columns that are only dropped.
+    """
+
+    def __init__(self, columns: list[str]):
+        """
+        Initializes with the columns to select.
+
+        Args:
+            columns (list[str]): Columns to select, where present.
+        """
+        self.columns = columns
+
+    def __call__(self, X: pd.DataFrame) -> list[str]:
+        """
+        Selects the columns.
+
+        Args:
+            X (pd.DataFrame): Input DataFrame.
+
+        Returns:
+            list[str]: Listed columns present in X.
+        """
+        return [col for col in self.columns if col in X.columns]
+
+
 def get_features_and_model_pipeline() -> Pipeline:
     """
     Final composition that takes preprocessed data and feature engineers into a model.
@@ -266,7 +295,7 @@ def get_features_and_model_pipeline() -> Pipeline:
 
     drop_transformer = ColumnTransformer(
         transformers=[
-            ("drop_columns", "drop", columns_to_drop),
+            ("drop_columns", "drop", PresentColumns(columns_to_drop)),
         ],
         remainder="passthrough",
         verbose_feature_names_out=False,
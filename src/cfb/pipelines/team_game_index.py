@@ -0,0 +1,121 @@
+from typing import Iterator
+
+import numpy as np
+import pandas as pd
+
+# Key of the TeamGameIndex in DataFrame.attrs, set by TeamGameIndexTransformer
+TEAM_GAME_INDEX_ATTR = "team_game_index"
+
+
+class TeamGameIndex:
+    """
+    Long format of a games frame, one row per team per game sorted by team and start date, with
+    each team's rows contiguous and the rows of each game's home and away team. Temporal
+    transformers read a column of both sides into it, compute per team, and map the results back,
+    instead of concatenating, sorting, and merging the frame themselves.
+    """
+
+    def __init__(self, X: pd.DataFrame):
+        """
+        Builds the index of a games frame.
+
+        Args:
+            X (pd.DataFrame): Games with start_date, home_team, and away_team.
+        """
+        start_date = pd.to_datetime(X["start_date"])
+        long_df = pd.DataFrame(
+            {
+                "team": pd.concat([X["home_team"], X["away_team"]], ignore_index=True),
+                "start_date": pd.concat([start_date, start_date], ignore_index=True),
+            }
+        ).sort_values(by=["team", "start_date"])
+        # A team listed twice on a date keeps its last listing, away over home
+        kept = ~long_df.duplicated(subset=["start_date", "team"], keep="last")
+        game_rows = np.empty(len(long_df), dtype=np.int64)
+        game_rows[long_df.index] = kept.cumsum().to_numpy() - kept.to_numpy()
+
+        self.index = X.index
+        self.games = long_df[kept].reset_index(drop=True)
+        self.positions = long_df.index[kept].to_numpy()
+        self.home_rows = game_rows[: len(X)]
+        self.away_rows = game_rows[len(X) :]
+        team_codes, _ = pd.factorize(self.games["team"])
+        # Rows starting a team's games, and rows without a team, have no previous game
+        self.first_games = (team_codes == -1) | (team_codes != np.roll(team_codes, 1))
+        if len(team_codes):
+            self.first_games[0] = True
+        self.team_starts = np.flatnonzero(self.first_games & (team_codes != -1))
+        self.team_stops = np.append(self.team_starts[1:], (team_codes != -1).sum())
+
+    def __deepcopy__(self, memo: dict) -> "TeamGameIndex":
+        """Shares the index, which is never modified, between the frames pandas copies attrs to."""
+        return self
+
+    @classmethod
+    def of(cls, X: pd.DataFrame) -> "TeamGameIndex":
+        """
+        Gets the index a pipeline stored in the frame's attrs, or builds one if it has none or
+        the frame's rows changed since.
+
+        Args:
+            X (pd.DataFrame): Games with start_date, home_team, and away_team.
+
+        Returns:
+            TeamGameIndex: Index of the frame.
+        """
+        index = X.attrs.get(TEAM_GAME_INDEX_ATTR)
+        if isinstance(index, cls) and index.index.equals(X.index):
+            return index
+        return cls(X)
+
+    def values(self, X: pd.DataFrame, home_col: str, away_col: str) -> pd.Series:
+        """
+        Reads a column of both sides into the long format.
+
+        Args:
+            X (pd.DataFrame): Frame the index was built from.
+            home_col (str): Column of the home team.
+            away_col (str): Column of the away team.
+
+        Returns:
+            pd.Series: Values per team game, in the index's order.
+        """
+        values = pd.concat([X[home_col], X[away_col]], ignore_index=True)
+        return values.iloc[self.positions].reset_index(drop=True)
+
+    def shift(self, values: pd.Series) -> pd.Series:
+        """
+        Gives each team game the value of the team's previous game.
+
+        Args:
+            values (pd.Series): Values per team game.
+
+        Returns:
+            pd.Series: Previous values, missing for each team's first game.
+        """
+        return values.shift(1).mask(self.first_games)
+
+    def team_slices(self) -> Iterator[slice]:
+        """
+        Iterates over the rows of each team, skipping rows without a team.
+
+        Yields:
+            slice: Rows of a team's games.
+        """
+        for start, stop in zip(self.team_starts, self.team_stops):
+            yield slice(start, stop)
+
+    def to_sides(self, values: pd.Series) -> tuple[pd.Series, pd.Series]:
+        """
+        Maps values per team game back to the games frame.
+
+        Args:
+            values (pd.Series): Values per team game.
+
+        Returns:
+            tuple[pd.Series, pd.Series]: Values of the home and away team, on the frame's index.
+        """
+        return (
+            values.iloc[self.home_rows].set_axis(self.index),
+            values.iloc[self.away_rows].set_axis(self.index),
+        )
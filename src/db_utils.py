@@ -1,22 +1,52 @@
+import atexit
+import datetime as dt
+import hashlib
+import io
+import json
 import os
+import struct
+import threading
+import time
+import uuid
 import warnings
-from typing import Optional
+from contextlib import contextmanager
+from enum import Enum
+from functools import lru_cache
+from typing import Any, Callable, Iterable, Iterator, Optional, Union
 
+import numpy as np
 import pandas as pd
 import psycopg2
 import psycopg2.extras
+import psycopg2.pool
 import yaml
 from dotenv import load_dotenv
+from psycopg2 import sql
 
 load_dotenv()
 PROJECT_ROOT = os.getenv("PROJECT_ROOT", os.getcwd())
 
+# Defaults for the optional `pool` section of config.yaml
+DEFAULT_POOL_CONFIG = {"minconn": 1, "maxconn": 8, "health_check": True}
 
+_pool = None
+_pool_pid = None
+_pool_config = dict(DEFAULT_POOL_CONFIG)
+_pool_slots = None
+_pool_lock = threading.Lock()
+
+# In-process query profiler, off by default, see enable_profiling
+_profiler = {"enabled": False, "explain": False}
+_profile_records = []
+_profile_lock = threading.Lock()
+
+
+@lru_cache(maxsize=None)
 def load_config(
     config_path: str = os.path.join(PROJECT_ROOT, "config/config.yaml")
 ) -> dict[str]:
     """
-    Loads config file.
+    Loads config file. Parsed once per path and cached for the life of the process.
 
     Args:
         config_path(str): Path of the config.
@@ -29,92 +59,616 @@ def load_config(
     return config
 
 
+def get_pool() -> psycopg2.pool.ThreadedConnectionPool:
+    """
+    Returns the process-wide connection pool, creating it on first use. Sizing is read from the
+    optional `pool` section of the config. A forked child gets its own pool rather than sharing
+    the parent's sockets.
+
+    Returns:
+        psycopg2.pool.ThreadedConnectionPool: Thread-safe pool of database connections.
+    """
+    global _pool, _pool_pid, _pool_config, _pool_slots
+    with _pool_lock:
+        if _pool is None or _pool.closed or _pool_pid != os.getpid():
+            config = load_config()
+            _pool_config = {**DEFAULT_POOL_CONFIG, **(config.get("pool") or {})}
+            _pool = psycopg2.pool.ThreadedConnectionPool(
+                _pool_config["minconn"], _pool_config["maxconn"], **config["database"]
+            )
+            # psycopg2 raises once maxconn is reached, so callers queue on a semaphore instead
+            _pool_slots = threading.BoundedSemaphore(_pool_config["maxconn"])
+            _pool_pid = os.getpid()
+        return _pool
+
+
+def close_pool() -> None:
+    """Closes every connection in the pool. The next checkout builds a fresh pool."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None and not _pool.closed and _pool_pid == os.getpid():
+            _pool.closeall()
+        _pool = None
+
+
+atexit.register(close_pool)
+
+
+def _is_healthy(conn) -> bool:
+    """
+    Checks that a pooled connection is still usable, i.e. the server has not dropped the socket.
+
+    Args:
+        conn: psycopg2 connection.
+
+    Returns:
+        bool: Whether the connection answered a trivial query.
+    """
+    if conn.closed:
+        return False
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT 1")
+        conn.rollback()
+        return True
+    except (psycopg2.OperationalError, psycopg2.InterfaceError):
+        return False
+
+
+@contextmanager
+def get_connection() -> Iterator:
+    """
+    Checks a connection out of the pool and returns it when done. Stale connections are discarded
+    and replaced. Commits on success, rolls back on error.
+
+    Yields:
+        psycopg2 connection.
+    """
+    pool = get_pool()
+    slots = _pool_slots
+    slots.acquire()
+    try:
+        conn = pool.getconn()
+        if _pool_config["health_check"] and not _is_healthy(conn):
+            pool.putconn(conn, close=True)
+            conn = pool.getconn()
+        try:
+            yield conn
+            if not conn.closed:
+                conn.commit()
+        except Exception:
+            if not conn.closed:
+                conn.rollback()
+            raise
+        finally:
+            if not pool.closed:
+                pool.putconn(conn, close=bool(conn.closed))
+    finally:
+        slots.release()
+
+
+def enable_profiling(explain: bool = False) -> None:
+    """
+    Starts recording every database call made through this module.
+
+    Args:
+        explain (bool, optional): Whether to also capture EXPLAIN (ANALYZE, BUFFERS) for reads. Runs each read twice. Defaults to False.
+    """
+    _profiler.update(enabled=True, explain=explain)
+
+
+def disable_profiling() -> None:
+    """Stops recording database calls. Recorded calls are kept until reset_profile."""
+    _profiler.update(enabled=False, explain=False)
+
+
+def reset_profile() -> None:
+    """Clears the recorded database calls."""
+    with _profile_lock:
+        _profile_records.clear()
+
+
+def get_profile_records() -> list[dict]:
+    """
+    Returns the recorded database calls.
+
+    Returns:
+        list[dict]: One record per call, with operation, query hash, wall time, rows, and bytes.
+    """
+    with _profile_lock:
+        return list(_profile_records)
+
+
+@contextmanager
+def _profiled(operation: str) -> Iterator[Optional[dict]]:
+    """
+    Times a database call into the profile. A no-op when profiling is disabled.
+
+    Args:
+        operation (str): Name of the calling function.
+
+    Yields:
+        Optional[dict]: Record for the caller to fill in, None when disabled.
+    """
+    if not _profiler["enabled"]:
+        yield None
+        return
+    record = {"operation": operation, "query_hash": None, "query": None}
+    record.update(rows=0, bytes=0, server_s=None, explain=None)
+    start_time = time.perf_counter()
+    try:
+        yield record
+    finally:
+        record["wall_s"] = time.perf_counter() - start_time
+        with _profile_lock:
+            _profile_records.append(record)
+
+
+def _record_query(record: dict, query: str) -> None:
+    """
+    Stores the query text and a hash of it, whitespace-normalised so reformatting keeps the hash.
+
+    Args:
+        record (dict): Profile record.
+        query (str): Query text.
+    """
+    normalised = " ".join(query.split())
+    record["query_hash"] = hashlib.md5(normalised.encode()).hexdigest()[:12]
+    record["query"] = normalised[:200]
+
+
+def _explain(conn, query: str, params: Optional[dict], record: dict) -> None:
+    """
+    Captures the plan of a read with EXPLAIN (ANALYZE, BUFFERS), along with its server-side time.
+
+    Args:
+        conn: psycopg2 connection.
+        query (str): Query to explain.
+        params (Optional[dict]): Params for query.
+        record (dict): Profile record.
+    """
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute(
+                "EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) " + query.strip().rstrip(";"),
+                params,
+            )
+            plan = cursor.fetchone()[0][0]
+        record["explain"] = plan
+        record["server_s"] = (
+            plan.get("Planning Time", 0) + plan.get("Execution Time", 0)
+        ) / 1000
+    except psycopg2.Error as e:
+        conn.rollback()
+        record["explain"] = {"error": str(e).strip()}
+
+
+def profile_summary() -> pd.DataFrame:
+    """
+    Summarises the recorded database calls per operation and query, slowest first.
+
+    Returns:
+        pd.DataFrame: Calls, total and mean wall time, server time, rows, and MB per query.
+    """
+    records = get_profile_records()
+    if not records:
+        return pd.DataFrame()
+    df = pd.DataFrame(records)
+    df["mb"] = df["bytes"] / 2**20
+    summary = df.groupby(["operation", "query_hash"], dropna=False).agg(
+        calls=("wall_s", "size"),
+        total_s=("wall_s", "sum"),
+        mean_s=("wall_s", "mean"),
+        server_s=("server_s", "sum"),
+        rows=("rows", "sum"),
+        mb=("mb", "sum"),
+        query=("query", "first"),
+    )
+    return summary.sort_values("total_s", ascending=False).round(3)
+
+
+def dump_profile(path: str = None) -> str:
+    """
+    Serialises the recorded database calls to JSON.
+
+    Args:
+        path (str, optional): File to write the JSON to. Defaults to only returning it.
+
+    Returns:
+        str: Records as JSON.
+    """
+    profile_json = json.dumps(get_profile_records(), indent=2, default=str)
+    if path is not None:
+        with open(path, "w") as file:
+            file.write(profile_json)
+    return profile_json
+
+
 def execute_sql_script(sql_file_path: str) -> None:
     """
     Takes in a .sql file and creates the table or schema as desired.
 
     Args:
         sql_file_path (str): Sql file path of the desired query.
+
+    Raises:
+        psycopg2.Error: The script failed, after its transaction is rolled back.
     """
     assert os.path.exists(sql_file_path), "Sql file path does not exist"
-    config = load_config()
-    db_config = config["database"]
-    conn = psycopg2.connect(**db_config)
-    try:
-        with open(sql_file_path, "r") as file:
-            sql_commands = file.read()
+    with open(sql_file_path, "r") as file:
+        sql_commands = file.read()
 
-        with conn.cursor() as cursor:
-            cursor.execute(sql_commands)
-            conn.commit()
-    except Exception as e:
-        conn.rollback()
-        print(e)
+    try:
+        with _profiled("execute_sql_script") as record, get_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute(sql_commands)
+                if record is not None:
+                    _record_query(record, sql_commands)
+                    record.update(rows=max(cursor.rowcount, 0), bytes=len(sql_commands))
+    except psycopg2.Error as e:
+        print(f"Failed running {os.path.basename(sql_file_path)}: {e}")
+        raise
     return None
 
 
-def pull_from_db(query: str, params: Optional[dict] = None) -> Optional[pd.DataFrame]:
+def pull_from_db(
+    query: Union[str, sql.Composable], params: Optional[dict] = None
+) -> Optional[pd.DataFrame]:
     """
     Wrapper for pulling from the database given a query.
 
     Args:
-        query (str): Query for the database.
+        query (Union[str, sql.Composable]): Query for the database.
         params Optional[dict]: Params for query.
 
     Returns:
         Optional[pd.DataFrame]: Data if available from database.
     """
-    config = load_config()
-    db_config = config["database"]
+    data = None
     try:
-        conn = psycopg2.connect(**db_config)
+        with _profiled("pull_from_db") as record, get_connection() as conn:
+            if isinstance(query, sql.Composable):
+                query = query.as_string(conn)
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore")
+                data = pd.read_sql_query(query, conn, params=params)
+            if record is not None:
+                _record_query(record, query)
+                record.update(
+                    rows=len(data), bytes=int(data.memory_usage(deep=True).sum())
+                )
+                if _profiler["explain"]:
+                    _explain(conn, query, params, record)
     except psycopg2.OperationalError as e:
         print("Failure to connect to database:", e)
-        return None
-
-    data = None
-    try:
-        with warnings.catch_warnings():
-            warnings.simplefilter("ignore")
-            data = pd.read_sql_query(query, conn, params)
     except psycopg2.Error as e:
         print("Error executing query:", e)
+    return data
+
+
+def pull_required_from_db(
+    query: Union[str, sql.Composable], params: Optional[dict] = None
+) -> pd.DataFrame:
+    """
+    Pulls from the database like pull_from_db, for internal queries the caller can't go on
+    without, i.e. metadata lookups.
+
+    Args:
+        query (Union[str, sql.Composable]): Query for the database.
+        params Optional[dict]: Params for query.
+
+    Raises:
+        Exception: The query failed, after pull_from_db reports why.
 
-    # Close the cursor and connection
-    conn.close()
+    Returns:
+        pd.DataFrame: Data from the database.
+    """
+    data = pull_from_db(query, params)
+    if data is None:
+        raise Exception("Failed pulling required data from the database.")
     return data
 
 
-def retrieve_data(schema: str, table: str) -> pd.DataFrame:
+# Pandas dtypes for streamed chunks, keyed by Postgres type OID, so every chunk has the same schema
+PG_OID_DTYPES = {
+    16: "boolean",
+    20: "Int64",
+    21: "Int16",
+    23: "Int32",
+    700: "float32",
+    701: "float64",
+    1700: "float64",
+    1082: "datetime64[ns]",
+    1114: "datetime64[ns]",
+}
+
+
+def _typed_chunk(
+    rows: list[tuple], description: tuple, dtypes: Optional[dict[str, str]] = None
+) -> pd.DataFrame:
+    """
+    Builds a DataFrame from fetched rows, casting columns by their Postgres type.
+
+    Args:
+        rows (list[tuple]): Fetched rows.
+        description (tuple): Cursor description of the result.
+        dtypes (Optional[dict[str, str]], optional): Overrides of the column dtypes. Defaults to None.
+
+    Returns:
+        pd.DataFrame: Typed chunk.
+    """
+    columns = [col.name for col in description]
+    chunk = pd.DataFrame.from_records(rows, columns=columns)
+    col_dtypes = {
+        col.name: PG_OID_DTYPES[col.type_code]
+        for col in description
+        if col.type_code in PG_OID_DTYPES
+    }
+    col_dtypes.update(dtypes or {})
+    for col, dtype in col_dtypes.items():
+        if dtype.startswith("datetime64"):
+            chunk[col] = pd.to_datetime(chunk[col])
+        else:
+            chunk[col] = chunk[col].astype(dtype)
+    return chunk
+
+
+def stream_from_db(
+    query: Union[str, sql.Composable],
+    params: Optional[dict] = None,
+    chunk_size: int = 50_000,
+    dtypes: Optional[dict[str, str]] = None,
+) -> Iterator[pd.DataFrame]:
     """
-    Helper function to get data. Pass in a schema, table to get all the data from PostgreSQL.
+    Streams a query in typed DataFrame chunks through a server-side cursor, so only one chunk is
+    held in client memory at a time. The pooled connection is held until the iterator is exhausted
+    or closed.
+
+    Args:
+        query (Union[str, sql.Composable]): Query for the database.
+        params (Optional[dict], optional): Params for query. Defaults to None.
+        chunk_size (int, optional): Rows per chunk. Defaults to 50_000.
+        dtypes (Optional[dict[str, str]], optional): Overrides of the column dtypes. Defaults to None.
+
+    Yields:
+        pd.DataFrame: Next chunk of the result.
+    """
+    with get_connection() as conn:
+        with conn.cursor(name=f"stream_{uuid.uuid4().hex}") as cursor:
+            cursor.itersize = chunk_size
+            cursor.execute(query, params)
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                yield _typed_chunk(rows, cursor.description, dtypes)
+
+
+def reduce_from_db(
+    query: Union[str, sql.Composable],
+    reducer: Callable[[Any, pd.DataFrame], Any],
+    initial: Any = None,
+    params: Optional[dict] = None,
+    chunk_size: int = 50_000,
+    dtypes: Optional[dict[str, str]] = None,
+) -> Any:
+    """
+    Folds a streamed query with a reducer, i.e. a running groupby, with bounded memory.
+
+    Args:
+        query (Union[str, sql.Composable]): Query for the database.
+        reducer (Callable[[Any, pd.DataFrame], Any]): Takes the accumulator and the next chunk, returns the new accumulator.
+        initial (Any, optional): Starting accumulator. Defaults to None.
+        params (Optional[dict], optional): Params for query. Defaults to None.
+        chunk_size (int, optional): Rows per chunk. Defaults to 50_000.
+        dtypes (Optional[dict[str, str]], optional): Overrides of the column dtypes. Defaults to None.
+
+    Returns:
+        Any: Final accumulator.
+    """
+    result = initial
+    for chunk in stream_from_db(query, params, chunk_size, dtypes):
+        result = reducer(result, chunk)
+    return result
+
+
+# Whitelist of readable tables, mapped to the column holding the game id, if any
+SCHEMA_TABLES = {
+    "cfb": {
+        "games": "id",
+        "venues": None,
+        "lines": "id",
+        "line_snapshots": "id",
+        "game_team_stats": "game_id",
+        "play_by_play": "game_id",
+        "advanced_game_stats": "game_id",
+        "pbp_explosive_plays": "game_id",
+        "pbp_down_distance_success": "game_id",
+        "game_wide": "id",
+    }
+}
+
+
+def build_filter_clauses(
+    schema: str,
+    table: str,
+    seasons: Optional[Iterable[int]] = None,
+    weeks: Optional[Iterable[int]] = None,
+    game_ids: Optional[Iterable[int]] = None,
+    through: Optional[tuple[int, int]] = None,
+) -> tuple[list[sql.Composable], dict]:
+    """
+    Builds parameterized WHERE clauses restricting a table to given seasons, weeks, or games.
+    Tables without a season column are filtered through their games.
+
+    Args:
+        schema (str): Schema of the table.
+        table (str): Table to filter.
+        seasons (Optional[Iterable[int]], optional): Seasons to keep. Defaults to all.
+        weeks (Optional[Iterable[int]], optional): Weeks to keep. Defaults to all.
+        game_ids (Optional[Iterable[int]], optional): Games to keep. Defaults to all.
+        through (Optional[tuple[int, int]], optional): Last season and regular-season week to keep, i.e. (2025, 6). Defaults to all.
+
+    Returns:
+        tuple[list[sql.Composable], dict]: Clauses to AND together and their params.
+    """
+    game_filters, params = [], {}
+    for name, values in [("season", seasons), ("week", weeks), ("id", game_ids)]:
+        if values is not None:
+            params[f"{name}_filter"] = [int(value) for value in values]
+            game_filters.append(
+                sql.SQL("{} = ANY(%({})s)").format(
+                    sql.Identifier(name), sql.SQL(f"{name}_filter")
+                )
+            )
+    if through is not None:
+        params["through_season"], params["through_week"] = map(int, through)
+        game_filters.append(
+            sql.SQL(
+                "(season < %(through_season)s OR (season = %(through_season)s "
+                "AND week <= %(through_week)s AND season_type IS DISTINCT FROM 'postseason'))"
+            )
+        )
+    if not game_filters:
+        return [], params
+
+    game_id_col = SCHEMA_TABLES[schema][table]
+    games = sql.Identifier(schema, "games")
+    if table in ("games", "game_wide"):
+        # The view carries the games columns, filtering it directly reaches the season index
+        return game_filters, params
+    if game_id_col is None:
+        # Venues are restricted to where the selected games were played
+        return [
+            sql.SQL("id IN (SELECT venue_id FROM {} WHERE {})").format(
+                games, sql.SQL(" AND ").join(game_filters)
+            )
+        ], params
+    return [
+        sql.SQL("{} IN (SELECT id FROM {} WHERE {})").format(
+            sql.Identifier(game_id_col), games, sql.SQL(" AND ").join(game_filters)
+        )
+    ], params
+
+
+def retrieve_data(
+    schema: str,
+    table: str,
+    columns: Optional[list[str]] = None,
+    seasons: Optional[Iterable[int]] = None,
+    weeks: Optional[Iterable[int]] = None,
+    game_ids: Optional[Iterable[int]] = None,
+    through: Optional[tuple[int, int]] = None,
+) -> pd.DataFrame:
+    """
+    Helper function to get data. Pass in a schema, table to get the data from PostgreSQL. Columns
+    and season, week, or game filters are pushed down into the query.
 
     Args:
         schema (str): Schema to insert into. In this case, the market.
         table (str): Table within the schema to insert into.
+        columns (Optional[list[str]], optional): Columns to select. Defaults to all.
+        seasons (Optional[Iterable[int]], optional): Seasons to keep, i.e. range(2020, 2025). Defaults to all.
+        weeks (Optional[Iterable[int]], optional): Weeks to keep. Defaults to all.
+        game_ids (Optional[Iterable[int]], optional): Games to keep. Defaults to all.
+        through (Optional[tuple[int, int]], optional): Last season and regular-season week to keep, i.e. (2025, 6). Defaults to all.
 
     Returns:
         pd.DataFrame: Desired data queried.
     """
-    schema_tables = {
-        "cfb": [
-            "games",
-            "venues",
-            "lines",
-            "game_team_stats",
-            "play_by_play",
-            "advanced_game_stats",
-        ]
-    }
-    if schema not in schema_tables.keys():
-        raise Exception(f"Select a schema in {schema_tables.keys()}")
-    if table not in schema_tables[schema]:
-        raise Exception(f"Select a table in {schema_tables[schema]}")
-    query = f"""SELECT * FROM {schema}.{table}"""
-    data = pull_from_db(query)
+    if schema not in SCHEMA_TABLES.keys():
+        raise Exception(f"Select a schema in {SCHEMA_TABLES.keys()}")
+    if table not in SCHEMA_TABLES[schema]:
+        raise Exception(f"Select a table in {list(SCHEMA_TABLES[schema].keys())}")
+
+    query = sql.SQL("SELECT {} FROM {}").format(
+        (sql.SQL(", ").join(map(sql.Identifier, columns)) if columns else sql.SQL("*")),
+        sql.Identifier(schema, table),
+    )
+    where, params = build_filter_clauses(
+        schema, table, seasons, weeks, game_ids, through
+    )
+    if where:
+        query += sql.SQL(" WHERE ") + sql.SQL(" AND ").join(where)
+    data = pull_from_db(query, params)
     return data
 
 
+def get_watermark(dataset: str) -> Optional[dict]:
+    """
+    Reads the ingestion watermark of a raw dataset, see cfb_ingest_watermarks.sql.
+
+    Args:
+        dataset (str): Raw dataset, i.e. "play_by_play".
+
+    Returns:
+        Optional[dict]: Season, week, fetched_at, and rows_merged, None if never ingested.
+    """
+    data = pull_from_db(
+        "SELECT season, week, fetched_at, rows_merged FROM cfb.ingest_watermarks WHERE dataset = %(dataset)s",
+        {"dataset": dataset},
+    )
+    if data is None or data.empty:
+        return None
+    watermark = data.iloc[0].to_dict()
+    for key in ["season", "week"]:
+        watermark[key] = None if pd.isna(watermark[key]) else int(watermark[key])
+    return watermark
+
+
+def update_watermark(
+    dataset: str,
+    season: Optional[int] = None,
+    week: Optional[int] = None,
+    rows_merged: int = 0,
+) -> None:
+    """
+    Records an ingestion of a raw dataset. The season and week only move forward, so refreshing
+    past weeks keeps the watermark, while the fetch time always updates.
+
+    Args:
+        dataset (str): Raw dataset, i.e. "play_by_play".
+        season (Optional[int], optional): Latest season ingested. Defaults to None.
+        week (Optional[int], optional): Latest week ingested within the season. Defaults to None.
+        rows_merged (int, optional): Rows inserted or updated by the ingestion. Defaults to 0.
+
+    Raises:
+        psycopg2.Error: The watermark failed to update, after its transaction is rolled back.
+    """
+    query = """
+        INSERT INTO cfb.ingest_watermarks AS w (dataset, season, week, fetched_at, rows_merged)
+        VALUES (%(dataset)s, %(season)s, %(week)s, now(), %(rows_merged)s)
+        ON CONFLICT (dataset) DO UPDATE SET
+            (season, week) = (
+                SELECT CASE WHEN advanced THEN EXCLUDED.season ELSE w.season END,
+                    CASE WHEN advanced THEN EXCLUDED.week ELSE w.week END
+                FROM (
+                    SELECT w.season IS NULL
+                        OR (EXCLUDED.season, COALESCE(EXCLUDED.week, 0))
+                        >= (w.season, COALESCE(w.week, 0)) AS advanced
+                ) AS progress
+            ),
+            fetched_at = now(),
+            rows_merged = EXCLUDED.rows_merged
+    """
+    params = {
+        "dataset": dataset,
+        "season": None if season is None else int(season),
+        "week": None if week is None else int(week),
+        "rows_merged": int(rows_merged),
+    }
+    try:
+        with _profiled("update_watermark") as record, get_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute(query, params)
+                if record is not None:
+                    _record_query(record, query)
+                    record.update(rows=cursor.rowcount, bytes=0)
+    except psycopg2.Error as e:
+        print(f"Error updating the {dataset} watermark: {e}")
+        raise
+
+
 def insert_data_to_db(query: str, data: pd.DataFrame) -> None:
     """
     Wrapper for inserting data in the correct format into the database.
@@ -123,19 +677,457 @@ def insert_data_to_db(query: str, data: pd.DataFrame) -> None:
         query (str): Query to insert, inclusive of where the data is going.
         data (pd.DataFrame): Data to insert.
     """
-    config = load_config()
-    db_config = config["database"]
+    row_tuples = [tuple(row) for row in data.values]
     try:
-        conn = psycopg2.connect(**db_config)
-    except:
-        print("Failure to connect to database.")
+        with _profiled("insert_data_to_db") as record, get_connection() as conn:
+            with conn.cursor() as cursor:
+                psycopg2.extras.execute_values(cursor, query, row_tuples)
+            if record is not None:
+                _record_query(record, query)
+                record.update(
+                    rows=len(data), bytes=int(data.memory_usage(deep=True).sum())
+                )
+        print("Successfully inserted data.")
+    except psycopg2.OperationalError as e:
+        print("Failure to connect to database:", e)
+    except Exception as e:
+        print(e)
 
-    row_tuples = [tuple(row) for row in data.values]
-    with conn.cursor() as cursor:
-        try:
-            psycopg2.extras.execute_values(cursor, query, row_tuples)
-            print("Successfully inserted data.")
-        except Exception as e:
-            print(e)
-    conn.commit()
-    conn.close()
+
+def _table_columns(cursor, table: str) -> list[tuple[str, str]]:
+    """
+    Looks up the columns of a table in order, along with their Postgres types.
+
+    Args:
+        cursor: psycopg2 cursor.
+        table (str): Schema-qualified table, i.e. "cfb.games".
+
+    Returns:
+        list[tuple[str, str]]: (column name, formatted type) pairs in table order.
+    """
+    cursor.execute(
+        """
+        SELECT attname, format_type(atttypid, atttypmod)
+        FROM pg_attribute
+        WHERE attrelid = %s::regclass AND attnum > 0 AND NOT attisdropped
+        ORDER BY attnum
+        """,
+        (table,),
+    )
+    return cursor.fetchall()
+
+
+def _primary_key(cursor, table: str) -> list[str]:
+    """
+    Looks up the primary key columns of a table.
+
+    Args:
+        cursor: psycopg2 cursor.
+        table (str): Schema-qualified table, i.e. "cfb.games".
+
+    Returns:
+        list[str]: Primary key columns in key order.
+    """
+    cursor.execute(
+        """
+        SELECT a.attname
+        FROM pg_index i
+        JOIN pg_attribute a ON a.attrelid = i.indrelid AND a.attnum = ANY(i.indkey)
+        WHERE i.indrelid = %s::regclass AND i.indisprimary
+        ORDER BY array_position(i.indkey::int2[], a.attnum)
+        """,
+        (table,),
+    )
+    return [row[0] for row in cursor.fetchall()]
+
+
+def _table_identifier(table: str) -> sql.Identifier:
+    """
+    Safely quotes a possibly schema-qualified table name.
+
+    Args:
+        table (str): Table name, i.e. "cfb.games".
+
+    Returns:
+        sql.Identifier: Quoted identifier.
+    """
+    return sql.Identifier(*table.split("."))
+
+
+def _copy_text_value(value: Any) -> str:
+    """
+    Formats one non-null value for COPY text format.
+
+    Args:
+        value (Any): Cell value.
+
+    Returns:
+        str: Escaped text representation.
+    """
+    # cfbd enums subclass str, but format as their member name
+    if isinstance(value, Enum):
+        value = value.value
+    if isinstance(value, (bool, np.bool_)):
+        return "t" if value else "f"
+    if isinstance(value, (list, tuple, np.ndarray)):
+        elements = ["NULL" if pd.isna(v) else _copy_text_value(v) for v in value]
+        return "{" + ",".join(elements) + "}"
+    if isinstance(value, (dt.date, dt.datetime)):
+        return value.isoformat()
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace("\t", "\\t")
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+    )
+
+
+def _to_copy_text(data: pd.DataFrame) -> io.StringIO:
+    """
+    Serializes a DataFrame to the Postgres COPY text format, with \\N for nulls.
+
+    Args:
+        data (pd.DataFrame): Data to serialize, columns in table order.
+
+    Returns:
+        io.StringIO: Buffer ready for COPY ... FROM STDIN.
+    """
+    columns = []
+    for col in data.columns:
+        series = data[col]
+        null_mask = series.isna().to_numpy()
+        if pd.api.types.is_integer_dtype(series) or pd.api.types.is_float_dtype(series):
+            values = series.astype(object).map(_copy_text_value).to_numpy()
+        else:
+            values = np.array(
+                [
+                    None if null else _copy_text_value(v)
+                    for v, null in zip(series, null_mask)
+                ],
+                dtype=object,
+            )
+        values[null_mask] = "\\N"
+        columns.append(values)
+    buffer = io.StringIO()
+    buffer.writelines("\t".join(row) + "\n" for row in zip(*columns))
+    buffer.seek(0)
+    return buffer
+
+
+# Binary COPY encoders, keyed by the staging column type
+_PG_EPOCH = pd.Timestamp(2000, 1, 1)
+
+
+def _wall_clock(value: Any) -> pd.Timestamp:
+    """
+    Converts a date-like value to a naive timestamp, keeping wall-clock time like the text
+    format does for offsets.
+
+    Args:
+        value (Any): Date, datetime, or string.
+
+    Returns:
+        pd.Timestamp: Naive timestamp.
+    """
+    ts = pd.Timestamp(value)
+    return ts.tz_localize(None) if ts.tzinfo is not None else ts
+
+
+_BINARY_ENCODERS = {
+    "boolean": lambda v: struct.pack(">?", bool(v)),
+    "smallint": lambda v: struct.pack(">h", int(v)),
+    "integer": lambda v: struct.pack(">i", int(v)),
+    "bigint": lambda v: struct.pack(">q", int(v)),
+    "real": lambda v: struct.pack(">f", float(v)),
+    "double precision": lambda v: struct.pack(">d", float(v)),
+    "text": lambda v: str(v.value if isinstance(v, Enum) else v).encode("utf-8"),
+    "date": lambda v: struct.pack(">i", (_wall_clock(v).normalize() - _PG_EPOCH).days),
+    "timestamp without time zone": lambda v: struct.pack(
+        ">q", (_wall_clock(v) - _PG_EPOCH) // pd.Timedelta(microseconds=1)
+    ),
+    "timestamp with time zone": lambda v: struct.pack(
+        ">q",
+        (pd.Timestamp(v).tz_convert("UTC").tz_localize(None) - _PG_EPOCH)
+        // pd.Timedelta(microseconds=1),
+    ),
+}
+# Element type OIDs for binary array encoding
+_BINARY_ARRAY_OIDS = {"integer": 23, "bigint": 20, "double precision": 701}
+
+
+def _is_tz_aware(series: pd.Series) -> bool:
+    """
+    Checks whether a column holds timezone-aware datetimes, i.e. kickoffs read from the raw store.
+
+    Args:
+        series (pd.Series): Column to check.
+
+    Returns:
+        bool: Whether every non-null value carries a timezone.
+    """
+    if isinstance(series.dtype, pd.DatetimeTZDtype):
+        return True
+    if series.dtype != object:
+        return False
+    values = series.dropna()
+    return len(values) > 0 and all(
+        isinstance(v, dt.datetime) and v.tzinfo is not None for v in values
+    )
+
+
+# Staging types of the columns whose timezone-aware values are cast in the session timezone
+_ZONED_TYPES = ["date", "timestamp without time zone"]
+
+
+def _binary_staging_type(pg_type: str) -> str:
+    """
+    Maps a table column type to the type used in the binary staging table. Numerics are staged
+    as double precision and cast back on merge; character types are staged as text; timestamps
+    keep whether they carry a time zone.
+
+    Args:
+        pg_type (str): Formatted Postgres type.
+
+    Returns:
+        str: Staging column type.
+    """
+    is_array = pg_type.endswith("[]")
+    base = pg_type.removesuffix("[]").split("(")[0].strip()
+    if base.startswith("numeric"):
+        base = "double precision"
+    elif base.startswith("character"):
+        base = "text"
+    elif base.startswith("timestamp"):
+        base = (
+            "timestamp without time zone"
+            if "without time zone" in pg_type or "with time zone" not in pg_type
+            else "timestamp with time zone"
+        )
+    return f"{base}[]" if is_array else base
+
+
+def _binary_array_encoder(element_type: str) -> Callable[[Any], bytes]:
+    """
+    Builds an encoder for one-dimensional arrays of a fixed-width element type.
+
+    Args:
+        element_type (str): Staging type of the array elements.
+
+    Returns:
+        Callable[[Any], bytes]: Encoder for a list-like value.
+    """
+    encode_element = _BINARY_ENCODERS[element_type]
+    element_oid = _BINARY_ARRAY_OIDS[element_type]
+
+    def encode(value: Any) -> bytes:
+        elements = list(value)
+        has_null = any(pd.isna(v) for v in elements)
+        parts = [struct.pack(">iiiii", 1, int(has_null), element_oid, len(elements), 1)]
+        for element in elements:
+            if pd.isna(element):
+                parts.append(struct.pack(">i", -1))
+            else:
+                encoded = encode_element(element)
+                parts.append(struct.pack(">i", len(encoded)) + encoded)
+        return b"".join(parts)
+
+    return encode
+
+
+def _to_copy_binary(data: pd.DataFrame, staging_types: list[str]) -> io.BytesIO:
+    """
+    Serializes a DataFrame to the Postgres COPY binary format.
+
+    Args:
+        data (pd.DataFrame): Data to serialize, columns in table order.
+        staging_types (list[str]): Staging column type for each column.
+
+    Returns:
+        io.BytesIO: Buffer ready for COPY ... FROM STDIN (FORMAT binary).
+    """
+    null_field = struct.pack(">i", -1)
+    columns = []
+    for col, staging_type in zip(data.columns, staging_types):
+        if staging_type.endswith("[]"):
+            encode = _binary_array_encoder(staging_type[:-2])
+        else:
+            encode = _BINARY_ENCODERS[staging_type]
+        fields = []
+        for value in data[col].astype(object):
+            if value is None or (
+                not isinstance(value, (list, np.ndarray)) and pd.isna(value)
+            ):
+                fields.append(null_field)
+            else:
+                encoded = encode(value)
+                fields.append(struct.pack(">i", len(encoded)) + encoded)
+        columns.append(fields)
+
+    field_count = struct.pack(">h", len(columns))
+    buffer = io.BytesIO()
+    buffer.write(b"PGCOPY\n\xff\r\n\x00" + struct.pack(">ii", 0, 0))
+    buffer.writelines(field_count + b"".join(row) for row in zip(*columns))
+    buffer.write(struct.pack(">h", -1))
+    buffer.seek(0)
+    return buffer
+
+
+def copy_data_to_db(
+    table: str,
+    data: pd.DataFrame,
+    on_conflict: str = "nothing",
+    copy_format: str = "text",
+) -> int:
+    """
+    Bulk loads a DataFrame by streaming it with COPY into a temporary staging table, then merging
+    into the target. Much faster than insert_data_to_db for large frames.
+
+    Args:
+        table (str): Schema-qualified target table, i.e. "cfb.play_by_play".
+        data (pd.DataFrame): Data to load, columns in the same order as the table.
+        on_conflict (str, optional): "nothing" to skip existing keys, "update" to upsert changed rows. Defaults to "nothing".
+        copy_format (str, optional): COPY format, "text" or "binary". Defaults to "text".
+
+    Raises:
+        Exception: The COPY or merge failed, after its transaction is rolled back.
+
+    Returns:
+        int: Number of rows inserted or updated in the target.
+    """
+    assert on_conflict in [
+        "nothing",
+        "update",
+    ], "Pick on_conflict in 'nothing', 'update'"
+    assert copy_format in ["text", "binary"], "Pick copy_format in 'text', 'binary'"
+    if data is None or data.empty:
+        print(f"No data to copy into {table}.")
+        return 0
+
+    start_time = time.time()
+    target = _table_identifier(table)
+    staging = sql.Identifier(f"staging_{table.replace('.', '_')}")
+    try:
+        with _profiled("copy_data_to_db") as record, get_connection() as conn:
+            with conn.cursor() as cursor:
+                table_columns = _table_columns(cursor, table)
+                if len(table_columns) != len(data.columns):
+                    raise Exception(
+                        f"{table} has {len(table_columns)} columns, data has {len(data.columns)}"
+                    )
+                col_names = [name for name, _ in table_columns]
+                col_list = sql.SQL(", ").join(map(sql.Identifier, col_names))
+                # Timezone-aware values of date and timestamp columns are staged as timestamptz
+                # and cast on merge, so they are taken in the session timezone rather than as
+                # their UTC wall clock, as the former INSERT path did
+                tz_aware = {
+                    name: _is_tz_aware(data[col])
+                    for (name, pg_type), col in zip(table_columns, data.columns)
+                    if pg_type == "date" or pg_type.startswith("timestamp")
+                }
+                zoned = [
+                    name
+                    for name, pg_type in table_columns
+                    if tz_aware.get(name)
+                    and _binary_staging_type(pg_type) in _ZONED_TYPES
+                ]
+                select_list = sql.SQL(", ").join(
+                    (
+                        sql.SQL("{}::{}").format(sql.Identifier(name), sql.SQL(pg_type))
+                        if name in zoned
+                        else sql.Identifier(name)
+                    )
+                    for name, pg_type in table_columns
+                )
+
+                if copy_format == "text":
+                    cursor.execute(
+                        sql.SQL("CREATE TEMP TABLE {} (LIKE {}) ON COMMIT DROP").format(
+                            staging, target
+                        )
+                    )
+                    for name in zoned:
+                        cursor.execute(
+                            sql.SQL(
+                                "ALTER TABLE {} ALTER COLUMN {} TYPE timestamp with time zone"
+                            ).format(staging, sql.Identifier(name))
+                        )
+                    buffer = _to_copy_text(data)
+                else:
+                    staging_types = []
+                    for name, pg_type in table_columns:
+                        staging_type = _binary_staging_type(pg_type)
+                        if name in zoned:
+                            staging_type = "timestamp with time zone"
+                        elif (
+                            staging_type == "timestamp with time zone"
+                            and not tz_aware[name]
+                        ):
+                            # Naive values are cast to timestamptz on merge in the session
+                            # timezone, as the text format parses them
+                            staging_type = "timestamp without time zone"
+                        staging_types.append(staging_type)
+                    col_defs = sql.SQL(", ").join(
+                        sql.SQL("{} {}").format(sql.Identifier(name), sql.SQL(pg_type))
+                        for name, pg_type in zip(col_names, staging_types)
+                    )
+                    cursor.execute(
+                        sql.SQL("CREATE TEMP TABLE {} ({}) ON COMMIT DROP").format(
+                            staging, col_defs
+                        )
+                    )
+                    buffer = _to_copy_binary(data, staging_types)
+
+                cursor.copy_expert(
+                    sql.SQL("COPY {} FROM STDIN WITH (FORMAT {})")
+                    .format(staging, sql.SQL(copy_format))
+                    .as_string(conn),
+                    buffer,
+                )
+
+                merge = sql.SQL("INSERT INTO {} ({}) SELECT {} FROM {}").format(
+                    target, col_list, select_list, staging
+                )
+                key_cols = _primary_key(cursor, table)
+                if on_conflict == "update" and key_cols:
+                    update_cols = [col for col in col_names if col not in key_cols]
+                    merge += sql.SQL(
+                        " ON CONFLICT ({}) DO UPDATE SET ({}) = ({}) WHERE ({}) IS DISTINCT FROM ({})"
+                    ).format(
+                        sql.SQL(", ").join(map(sql.Identifier, key_cols)),
+                        sql.SQL(", ").join(map(sql.Identifier, update_cols)),
+                        sql.SQL(", ").join(
+                            sql.SQL("EXCLUDED.{}").format(sql.Identifier(col))
+                            for col in update_cols
+                        ),
+                        sql.SQL(", ").join(
+                            sql.SQL("{}.{}").format(target, sql.Identifier(col))
+                            for col in update_cols
+                        ),
+                        sql.SQL(", ").join(
+                            sql.SQL("EXCLUDED.{}").format(sql.Identifier(col))
+                            for col in update_cols
+                        ),
+                    )
+                else:
+                    merge += sql.SQL(" ON CONFLICT DO NOTHING")
+                cursor.execute(merge)
+                merged_rows = cursor.rowcount
+                if record is not None:
+                    _record_query(record, merge.as_string(conn))
+                    record.update(rows=len(data), bytes=buffer.tell())
+    except psycopg2.OperationalError as e:
+        print("Failure to connect to database:", e)
+        raise
+    except Exception as e:
+        print(f"Failed copying {len(data)} rows into {table}: {e}")
+        raise
+
+    elapsed = time.time() - start_time
+    print(
+        f"Successfully copied {len(data)} rows into {table}, {merged_rows} merged "
+        f"({len(data) / max(elapsed, 1e-9):,.0f} rows/s)."
+    )
+    return merged_rows